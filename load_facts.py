@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Bulk load curated facts (CSV or JSONL) into the facts table
+
+CSV files need a header with claim,truth columns, JSONL files one {"claim": ..., "truth": ...} per line.
+Usage: python load_facts.py facts.csv [--format csv|jsonl] [--chunk-size 50000] [--properties config.properties] [--build-index]
+"""
+
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from source.services.lib.DB import Database
+from source.services.lib.Logger import Logger
+from source.services.lib.readProperties import PropertiesReader
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load facts into the Fact Checker database.")
+    parser.add_argument("file_path", help="CSV or JSONL file with claim and truth values")
+    parser.add_argument("--format", dest="file_format", choices=["csv", "jsonl"], default=None,
+                        help="File format, derived from the file extension when omitted")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per executemany/transaction")
+    parser.add_argument("--properties", default=None, help="Path to the properties file")
+    parser.add_argument("--build-index", action="store_true", help="Rebuild the semantic fact index after loading")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file_path):
+        print(f"❌ File not found: {args.file_path}")
+        sys.exit(1)
+
+    logger = Logger().get_logger()
+    properties = PropertiesReader(file_path=args.properties, kwargs={"logger": logger})
+    db = Database(kwargs={"logger": logger, "properties": properties})
+
+    print(f"🚀 Loading facts from {args.file_path}...")
+    stats = db.bulk_load_facts(db.iter_facts_file(args.file_path, args.file_format), chunk_size=args.chunk_size)
+
+    print(f"✅ Read {stats['rows_read']} rows ({stats['rows_skipped']} skipped) in {stats['seconds']}s "
+          f"- {stats['rows_per_second']} rows/second")
+    print(f"   {stats['facts_inserted']} facts inserted, {stats['facts_updated']} facts updated")
+
+    if args.build_index:
+        from source.services.SemanticFactIndex import SemanticFactIndex
+        print("🚀 Building semantic fact index...")
+        semantic_index = SemanticFactIndex(kwargs={"logger": logger, "properties": properties, "db": db})
+        indexed = semantic_index.build()
+        print(f"✅ Indexed {indexed} facts in {semantic_index.index_directory}")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
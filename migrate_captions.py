@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Import the legacy <id>.txt caption files into the caption store
+
+Every .txt file of [folders] captions_directory that is not indexed yet is written to the
+content addressed store (compressed per [captions] compression) and added to caption_index.
+Usage: python migrate_captions.py [--properties config.properties] [--batch-size 1000] [--remove]
+"""
+
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from source.services.lib.CaptionStore import CaptionStore
+from source.services.lib.Logger import Logger
+from source.services.lib.readProperties import PropertiesReader
+
+def main():
+    parser = argparse.ArgumentParser(description="Import legacy caption .txt files into the caption store.")
+    parser.add_argument("--properties", default=None, help="Path to the properties file")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Files per caption index transaction")
+    parser.add_argument("--remove", action="store_true", help="Delete the .txt files once they are indexed")
+    args = parser.parse_args()
+
+    logger = Logger().get_logger()
+    properties = PropertiesReader(file_path=args.properties, kwargs={"logger": logger})
+    caption_store = CaptionStore(kwargs={"logger": logger, "properties": properties})
+
+    print(f"🚀 Importing captions from {caption_store.captions_directory} into {caption_store.store_directory} "
+          f"(compression: {caption_store.compression})...")
+    stats = caption_store.migrate_legacy_files(remove=args.remove, batch_size=args.batch_size)
+
+    print(f"✅ {stats['files']} files in {stats['seconds']}s - {stats['imported']} imported, "
+          f"{stats['skipped']} already indexed, {stats['failed']} failed")
+    print(f"   {stats['text_bytes']} bytes of text stored in {stats['stored_bytes']} bytes")
+    store_stats = caption_store.stats()
+    print(f"   Caption store: {store_stats['captions']} captions in {store_stats['blobs']} blobs")
+    if stats["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Startup import-time profiler
+
+Imports each module in a fresh interpreter with python -X importtime (background warm-up
+disabled) and prints the total import time, the slowest imports and any heavy package
+(torch, transformers, yt_dlp, ...) that was imported at startup.
+Usage: python profile_imports.py [source.views server.fastmcp_server] [--top 25] [--budget 2.0]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+DEFAULT_MODULES = ["source.views", "server.fastmcp_server"]
+
+# Printed by the child interpreter after the import, on stdout
+HEAVY_MODULES_MARKER = "HEAVY_MODULES:"
+
+def profile_imports(module_name):
+    '''
+        Import module_name in a new interpreter and return
+        {"module", "total_seconds", "imports": [(name, self seconds, cumulative seconds, depth)], "heavy_modules", "error"}
+    '''
+    code = (f"import {module_name}\n"
+            f"from source.services.lib.LazyImport import loaded_heavy_modules\n"
+            f"import json\n"
+            f"print({HEAVY_MODULES_MARKER!r} + json.dumps(loaded_heavy_modules()))")
+    env = dict(os.environ, FACT_CHECKER_WARMUP="false",
+               PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get("PYTHONPATH")])))
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=PROJECT_ROOT, env=env,
+                               capture_output=True, text=True)
+
+    imports = []
+    other_stderr = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            other_stderr.append(line)
+            continue
+        # import time:       self [us] |  cumulative | imported package
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6, depth))
+
+    heavy_modules = []
+    for line in completed.stdout.splitlines():
+        if line.startswith(HEAVY_MODULES_MARKER):
+            heavy_modules = json.loads(line[len(HEAVY_MODULES_MARKER):])
+
+    # Top level imports (depth 0) add up to the time spent importing module_name and its dependencies
+    total_seconds = sum(cumulative for _, _, cumulative, depth in imports if depth == 0)
+    error = None
+    if completed.returncode != 0:
+        error = "\n".join(other_stderr[-5:])
+    return {"module": module_name, "total_seconds": round(total_seconds, 4), "imports": imports,
+            "heavy_modules": heavy_modules, "error": error}
+
+def print_profile(profile, top=25):
+    print(f"\n📦 {profile['module']}: {profile['total_seconds']:.3f}s")
+    if profile["error"]:
+        print(f"❌ Import failed:\n{profile['error']}")
+
+    print(f"\n  Slowest top level imports (cumulative):")
+    top_level = sorted((row for row in profile["imports"] if row[3] == 0), key=lambda row: row[2], reverse=True)
+    for name, _, cumulative, _ in top_level[:top]:
+        print(f"  {cumulative * 1000:10.1f} ms  {name}")
+
+    print(f"\n  Slowest modules (self):")
+    for name, self_seconds, _, _ in sorted(profile["imports"], key=lambda row: row[1], reverse=True)[:top]:
+        print(f"  {self_seconds * 1000:10.1f} ms  {name}")
+
+    if profile["heavy_modules"]:
+        print(f"\n  ⚠️  Heavy packages imported at startup: {', '.join(profile['heavy_modules'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a per-module import time breakdown of the Fact Checker entry points.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to profile")
+    parser.add_argument("--top", type=int, default=25, help="Number of modules to list")
+    parser.add_argument("--budget", type=float, default=None, help="Exit with an error if a module takes longer (seconds)")
+    args = parser.parse_args()
+
+    over_budget = False
+    for module_name in args.modules:
+        profile = profile_imports(module_name)
+        print_profile(profile, args.top)
+        if profile["error"] or (args.budget is not None and profile["total_seconds"] > args.budget):
+            over_budget = True
+
+    if over_budget:
+        print(f"\n❌ An import failed or exceeded the import budget")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ Much simpler implementation using FastMCP framework
 import sys
 import os
 import json
-from typing import Optional
+from typing import List, Optional
 
 # Add the project root to sys.path to allow for absolute imports from 'source'
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -20,14 +20,11 @@ from fastmcp import FastMCP
 
 # Import Fact Checker components
 from source.services.lib.DB import Database
+from source.services.lib.ModelRegistry import ModelRegistry
+from source.services.lib.LazyService import LazyService
 from source.services.lib.Logger import Logger
 from source.services.lib.readProperties import PropertiesReader
 from source.services.lib.utils import Utils, SourceTypes, CaptionSources, SummarizationTypes, TextToAudioSources, AvailableLanguages, AvailableCountryCodes
-from source.services.CaptionDerivation import CaptionDerivation
-from source.services.StatementDerivation import StatementDerivation
-from source.services.SummarizedStatementDerivation import SummarizedStatementDerivation
-from source.services.FactDerivation import FactDerivation
-from source.services.TextToAudio import TextToAudio
 
 class Services:
     """A container for initialized services to reduce boilerplate."""
@@ -42,12 +39,40 @@ class Services:
             "utils": self.utils
         }
         
-        self.db = Database(kwargs={**common_kwargs, "utils": self.utils})
-        self.captionDerivation = CaptionDerivation(kwargs=common_kwargs)
-        self.statementDerivation = StatementDerivation(kwargs=common_kwargs)
-        self.summarizedStatementDerivation = SummarizedStatementDerivation(kwargs=common_kwargs)
-        self.factDerivation = FactDerivation(kwargs=common_kwargs)
-        self.textToAudio = TextToAudio(kwargs=common_kwargs)
+        self.db = Database(kwargs=common_kwargs)
+        # Share a single Database instance across all services
+        common_kwargs["db"] = self.db
+        # Services are built (and their models loaded) on first use or by warm_up()
+        self.captionDerivation = LazyService.for_class("captionDerivation", "source.services.CaptionDerivation", "CaptionDerivation", common_kwargs)
+        self.statementDerivation = LazyService.for_class("statementDerivation", "source.services.StatementDerivation", "StatementDerivation", common_kwargs)
+        self.summarizedStatementDerivation = LazyService.for_class("summarizedStatementDerivation", "source.services.SummarizedStatementDerivation", "SummarizedStatementDerivation", common_kwargs)
+        self.factDerivation = LazyService.for_class("factDerivation", "source.services.FactDerivation", "FactDerivation", common_kwargs)
+        self.semanticFactIndex = LazyService.for_class("semanticFactIndex", "source.services.SemanticFactIndex", "SemanticFactIndex", common_kwargs)
+        self.textToAudio = LazyService.for_class("textToAudio", "source.services.TextToAudio", "TextToAudio", common_kwargs)
+        self.nlp = LazyService("nlp", lambda: ModelRegistry.get_pipeline("text-classification", "bert-base-uncased"))
+        self.warmup_complete = False
+        # get_ready waits for these (the fact checking services) when they are warmed up
+        self.ready_services = []
+
+    def get_lazy_services(self):
+        return {
+            "factDerivation": self.factDerivation,
+            "semanticFactIndex": self.semanticFactIndex,
+            "nlp": self.nlp,
+            "statementDerivation": self.statementDerivation,
+            "summarizedStatementDerivation": self.summarizedStatementDerivation,
+            "captionDerivation": self.captionDerivation,
+            "textToAudio": self.textToAudio,
+        }
+
+    def warm_up(self):
+        if os.environ.get("FACT_CHECKER_WARMUP", self.properties.get_property("startup", "warmup", "true")).lower() == "true":
+            self.ready_services = [name.strip() for name in self.properties.get_property("startup", "ready_services", "factDerivation,semanticFactIndex,nlp").split(",")
+                                   if name.strip() in self.get_lazy_services()]
+            LazyService.warm_up(self.get_lazy_services(), on_complete=lambda: setattr(self, "warmup_complete", True))
+        else:
+            # Nothing is warmed up, the services load on first use
+            self.warmup_complete = True
 
 # Initialize FastMCP server
 mcp = FastMCP("fact-checker-fastmcp")
@@ -181,14 +206,28 @@ def get_statements(
     
     services.logger.info("FastMCP get_statements: Processing statements")
     
-    content = _get_content_from_source(
-        youtube_video_url, video_url, audio_url, podcast_url, web_url, raw_text
-    )
+    # Video and audio transcripts keep their segment timestamps, so statements can be traced back to them
+    transcript = None
+    if youtube_video_url or video_url or audio_url or podcast_url:
+        if youtube_video_url or video_url:
+            source_type = SourceTypes.YOUTUBE if youtube_video_url else SourceTypes.VIDEO
+        else:
+            source_type = SourceTypes.AUDIO if audio_url else SourceTypes.PODCAST
+        transcript = services.captionDerivation.get_transcript(
+            source_path=youtube_video_url or video_url or audio_url or podcast_url,
+            source_type=source_type,
+            caption_source=CaptionSources.ALL
+        )
+        content = transcript.text
+    else:
+        content = _get_content_from_source(
+            youtube_video_url, video_url, audio_url, podcast_url, web_url, raw_text
+        )
     
     if not content:
         return json.dumps({"error": "Not able to get captions/transcript for Factual Statements"}, indent=2)
     
-    factual_statements = services.statementDerivation.get_factual_statements(content, "nltk")
+    factual_statements = services.statementDerivation.get_factual_statements(content, "nltk", transcript=transcript)
     
     return json.dumps({"factual_statements": factual_statements}, indent=2)
 
@@ -199,33 +238,20 @@ def fact_check(claim: str) -> str:
         return json.dumps({"error": "No claim provided"}, indent=2)
     
     services.logger.info(f"FastMCP fact_check: Checking claim: {claim}")
+    result = services.factDerivation.check_claim(claim, nlp, semantic_index=services.semanticFactIndex)
+    return json.dumps(result, indent=2)
+
+@mcp.tool()
+def fact_check_batch(claims: List[str]) -> str:
+    """Check the veracity of a list of claims in one call, e.g. the factual_statements from get_statements."""
+    error = services.factDerivation.validate_claims_batch(claims)
+    if error:
+        return json.dumps({"error": error}, indent=2)
     
-    # Check cache first
-    cached_result = services.db.get_cached_result(claim)
-    if cached_result:
-        services.logger.info("FastMCP fact_check: Cache hit")
-        return json.dumps({"claim": claim, "result": cached_result}, indent=2)
-    
-    # Check database
-    result = services.db.check_fact_db(claim)
-    if result is not None:
-        services.logger.info("FastMCP fact_check: Database hit")
-        services.db.cache_result(claim, str(bool(result)))
-        return json.dumps({"claim": claim, "truth": bool(result)}, indent=2)
-    
-    # Check external API
-    external_result = services.factDerivation.check_external_api(claim)
-    if external_result != "Unknown":
-        services.logger.info("FastMCP fact_check: External API hit")
-        services.db.cache_result(claim, external_result)
-        return json.dumps({"claim": claim, "external_result": external_result}, indent=2)
-    
-    # Perform NLP analysis
-    services.logger.info("FastMCP fact_check: Performing NLP analysis")
-    analysis = nlp(claim)
-    services.db.cache_result(claim, str(analysis))
+    services.logger.info(f"FastMCP fact_check_batch: Checking {len(claims)} claims")
+    results = services.factDerivation.check_claims_batch(claims, nlp, semantic_index=services.semanticFactIndex)
     
-    return json.dumps({"claim": claim, "analysis": analysis}, indent=2)
+    return json.dumps({"results": results}, indent=2)
 
 @mcp.tool()
 def text_to_speech(text: str, action: Optional[str] = None) -> str:
@@ -250,15 +276,31 @@ def text_to_speech(text: str, action: Optional[str] = None) -> str:
     
     return json.dumps({"speech_path": speech_path}, indent=2)
 
+@mcp.tool()
+def get_cache_stats() -> str:
+    """Get hit/miss counters of the in-memory and SQLite claim caches."""
+    return json.dumps(services.db.get_cache_stats(), indent=2)
+
+@mcp.tool()
+def get_caption_stats() -> str:
+    """Get per-source caption latency metrics, single-flight counters and caption store sizes."""
+    return json.dumps(services.captionDerivation.get_caption_stats(), indent=2)
+
 @mcp.tool()
 def get_status() -> str:
     """Get the status of the FastMCP Fact Checker server."""
     return "Server Running" 
 
+@mcp.tool()
+def get_ready() -> str:
+    """Get whether the services and models finished loading, with the load status of each."""
+    readiness = LazyService.get_readiness(services.get_lazy_services(), services.ready_services, services.warmup_complete)
+    return json.dumps(readiness, indent=2)
+
 
-# Load NLP model after all tools are defined to avoid initialization conflicts
-from transformers import pipeline
-nlp = pipeline("text-classification", model="bert-base-uncased")
+# NLP model is loaded on first use or by the warm-up
+nlp = services.nlp
+services.warm_up()
 
 if __name__ == "__main__":
     import sys
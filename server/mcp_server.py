@@ -24,7 +24,8 @@ from mcp.types import (
 )
 
 # Import Flask app and dependencies
-from source.views import app, db, captionDerivation, statementDerivation, summarizedStatementDerivation, factDerivation, textToAudio, authorization, logger
+from source.views import app, db, captionDerivation, statementDerivation, summarizedStatementDerivation, factDerivation, semanticFactIndex, textToAudio, authorization, logger
+from source.services.lib.ModelRegistry import ModelRegistry
 from source.services.lib.utils import SourceTypes, CaptionSources, SummarizationTypes, TextToAudioSources, AvailableLanguages, AvailableCountryCodes
 
 # Create MCP server instance
@@ -215,6 +216,29 @@ async def handle_list_tools() -> ListToolsResult:
                 "required": ["claim"]
             }
         ),
+        Tool(
+            name="fact_check_batch",
+            description="Check the veracity of a list of claims in one call, e.g. the factual_statements from get_statements",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "claims": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "The claims to fact-check"
+                    }
+                },
+                "required": ["claims"]
+            }
+        ),
+        Tool(
+            name="get_cache_stats",
+            description="Get hit/miss counters of the in-memory and SQLite claim caches",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
         Tool(
             name="text_to_speech",
             description="Convert text to speech audio file",
@@ -495,41 +519,35 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
             
             logger.info(f"MCP fact_check: Checking claim: {claim}")
             
-            # Check cache first
-            cached_result = db.get_cached_result(claim)
-            if cached_result:
-                logger.info("MCP fact_check: Cache hit")
-                return CallToolResult(
-                    content=[TextContent(type="text", text=json.dumps({"claim": claim, "result": cached_result}, indent=2))]
-                )
+            # The classifier is only loaded when no earlier stage answers the claim
+            def nlp(text):
+                return ModelRegistry.get_pipeline("text-classification", "bert-base-uncased")(text)
+            result = factDerivation.check_claim(claim, nlp, semantic_index=semanticFactIndex)
             
-            # Check database
-            result = db.check_fact_db(claim)
-            if result is not None:
-                logger.info("MCP fact_check: Database hit")
-                db.cache_result(claim, str(bool(result)))
-                return CallToolResult(
-                    content=[TextContent(type="text", text=json.dumps({"claim": claim, "truth": bool(result)}, indent=2))]
-                )
+            return CallToolResult(
+                content=[TextContent(type="text", text=json.dumps(result, indent=2))]
+            )
+        
+        elif name == "fact_check_batch":
+            claims = arguments.get("claims")
             
-            # Check external API
-            external_result = factDerivation.check_external_api(claim)
-            if external_result != "Unknown":
-                logger.info("MCP fact_check: External API hit")
-                db.cache_result(claim, external_result)
+            error = factDerivation.validate_claims_batch(claims)
+            if error:
                 return CallToolResult(
-                    content=[TextContent(type="text", text=json.dumps({"claim": claim, "external_result": external_result}, indent=2))]
+                    content=[TextContent(type="text", text=f"Error: {error}")]
                 )
             
-            # Perform NLP analysis
-            logger.info("MCP fact_check: Performing NLP analysis")
-            from transformers import pipeline
-            nlp = pipeline("text-classification", model="bert-base-uncased")
-            analysis = nlp(claim)
-            db.cache_result(claim, str(analysis))
+            logger.info(f"MCP fact_check_batch: Checking {len(claims)} claims")
+            nlp = ModelRegistry.get_pipeline("text-classification", "bert-base-uncased")
+            results = factDerivation.check_claims_batch(claims, nlp, semantic_index=semanticFactIndex)
             
             return CallToolResult(
-                content=[TextContent(type="text", text=json.dumps({"claim": claim, "analysis": analysis}, indent=2))]
+                content=[TextContent(type="text", text=json.dumps({"results": results}, indent=2))]
+            )
+        
+        elif name == "get_cache_stats":
+            return CallToolResult(
+                content=[TextContent(type="text", text=json.dumps(db.get_cache_stats(), indent=2))]
             )
         
         elif name == "text_to_speech":
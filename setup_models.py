@@ -1,8 +1,9 @@
+import argparse
 import spacy
 import nltk
+from source.services.lib.utils import NLTK_RESOURCES, bundle_nltk_resources
 
 MODELS_TO_DOWNLOAD = ["en_core_web_sm"]
-NLTK_PACKAGES = ["punkt", "wordnet", "stopwords", "averaged_perceptron_tagger"]
 
 def download_spacy_models():
     """Downloads all specified spaCy models."""
@@ -17,19 +18,32 @@ def download_spacy_models():
 
 def download_nltk_packages():
     """Downloads all specified NLTK packages."""
-    for package in NLTK_PACKAGES:
+    for resource_path, packages in NLTK_RESOURCES:
         try:
             # Check if the package is already available
-            nltk.data.find(f'tokenizers/{package}' if package == 'punkt' else f'corpora/{package}' if package in ['wordnet', 'stopwords'] else f'taggers/{package}')
-            print(f"NLTK package '{package}' already installed.")
+            nltk.data.find(resource_path)
+            print(f"NLTK package '{resource_path}' already installed.")
         except LookupError:
-            print(f"Downloading NLTK package: {package}")
-            nltk.download(package)
-            print(f"NLTK package '{package}' downloaded successfully.")
+            for package in packages:
+                print(f"Downloading NLTK package: {package}")
+                nltk.download(package)
+                print(f"NLTK package '{package}' downloaded successfully.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download the NLP models and NLTK packages used by the Fact Checker.")
+    parser.add_argument("--nltk-data-dir", default=None,
+                        help="Bundle every NLTK resource into this directory for offline use (set [nltk] data_dir or NLTK_DATA to it)")
+    args = parser.parse_args()
+
     print("--- Setting up NLP models ---")
     download_spacy_models()
     print("\n--- Setting up NLTK packages ---")
-    download_nltk_packages()
+    if args.nltk_data_dir:
+        failed = bundle_nltk_resources(args.nltk_data_dir)
+        if failed:
+            print(f"❌ Failed to download NLTK packages: {failed}")
+        else:
+            print(f"✅ NLTK resources bundled in {args.nltk_data_dir}")
+    else:
+        download_nltk_packages()
     print("\n--- Model setup complete! ---")
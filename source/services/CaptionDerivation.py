@@ -3,17 +3,26 @@ from source.services.CaptionDerivationVideo import CaptionDerivationVideo
 from source.services.CaptionDerivationAudio import CaptionDerivationAudio
 from source.services.lib.readProperties import PropertiesReader
 from source.services.lib.DB import Database
+from source.services.lib.CaptionStore import CaptionStore
+from source.services.lib.SingleFlight import SingleFlight
+from source.services.lib.Transcript import Transcript
 from source.services.lib.Logger import Logger 
 from source.services.lib.utils import Utils, SourceTypes, CaptionSources
+from source.services.lib.LazyImport import lazy_import
 
 import os
-import wikipedia
-from bs4 import *
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 # Added on 11/23/2025 - Pushkar
 from urllib.request import Request, urlopen
 from flask import jsonify
-from readability import Document # <-- Import readability
+
+# Heavy packages are imported on first use
+wikipedia = lazy_import("wikipedia")
+bs4 = lazy_import("bs4")
+readability = lazy_import("readability")
 
 # Configure logging
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -22,6 +31,10 @@ class CaptionDerivation:
     """
     A class to derive captions from a given video.
     """
+    # Per caption source latency and outcome counters, shared by the process
+    _source_metrics = {}
+    _source_metrics_lock = threading.Lock()
+
     def __init__(self, kwargs=None):
         if 'logger' in kwargs:
             self.logger = kwargs['logger']
@@ -39,15 +52,40 @@ class CaptionDerivation:
         else:
             self.utils = Utils(kwargs={"logger":self.logger, "properties":self.properties})
 
-        self.db = Database(kwargs={"logger":self.logger})
-        self.video_captions = CaptionDerivationVideo(kwargs={"properties":self.properties, "logger":self.logger})
-        self.audio_captions = CaptionDerivationAudio(kwargs={"properties":self.properties, "logger":self.logger})
+        if 'db' in kwargs:
+            self.db = kwargs['db']
+        else:
+            self.db = Database(kwargs={"logger":self.logger, "properties":self.properties, "utils":self.utils})
+        self.video_captions = CaptionDerivationVideo(kwargs={"properties":self.properties, "logger":self.logger, "utils":self.utils, "db":self.db})
+        self.audio_captions = CaptionDerivationAudio(kwargs={"properties":self.properties, "logger":self.logger, "utils":self.utils, "db":self.db})
         self.captions_directory = self.properties.get_property("folders", "captions_directory")
         if not self.captions_directory:
             self.captions_directory = os.path.join(os.getcwd(), 'captionsDirectory')
         if not os.path.exists(self.captions_directory):
             os.makedirs(self.captions_directory)
 
+        if 'caption_store' in kwargs:
+            self.caption_store = kwargs['caption_store']
+        else:
+            self.caption_store = CaptionStore(kwargs={"logger":self.logger, "properties":self.properties, "utils":self.utils, "db":self.db})
+
+        # Concurrent requests for the same caption id run one derivation, the others wait for it.
+        # single_flight = file also serializes the derivation across worker processes.
+        lock_directory = None
+        if self.properties.get_property("captions", "single_flight", "process").lower() == "file":
+            lock_directory = self.properties.get_property("captions", "lock_directory")
+            if not lock_directory:
+                lock_directory = os.path.join(self.captions_directory, 'locks')
+        self.single_flight = SingleFlight.get_group(f"captions:{os.path.abspath(self.captions_directory)}",
+                                                    lock_directory=lock_directory,
+                                                    lock_timeout_seconds=self.properties.get_property_int("captions", "lock_timeout_seconds", 600),
+                                                    logger=self.logger)
+
+        # CaptionSources.ALL: the cheap sources are raced on threads of their own, audio download + ASR is the fallback
+        self.race_timeout_seconds = self.properties.get_property_int("captions", "race_timeout_seconds", 60)
+        # How long a successful source waits for the higher priority sources still running
+        self.race_priority_wait_ms = self.properties.get_property_int("captions", "race_priority_wait_ms", 2000)
+
     def __str__(self):
         return f"{CaptionDerivation.__name__}"
     
@@ -64,23 +102,46 @@ class CaptionDerivation:
             return self.get_audio_captions(source_path, caption_source)
         if source_type == SourceTypes.WIKI:
             return self.get_wiki_captions(source_path)
-        
+
+    def get_transcript(self, source_path, source_type=SourceTypes.YOUTUBE, caption_source=CaptionSources.ALL):
+        '''
+            Transcript of the source, with segment timestamps when the captions have them
+            (third party video captions and audio transcribed by ASR).
+        '''
+        if source_type == SourceTypes.YOUTUBE or source_type == SourceTypes.VIDEO:
+            return self.get_video_transcript(source_path, caption_source)
+        if source_type == SourceTypes.PODCAST or source_type == SourceTypes.AUDIO:
+            return self.get_audio_transcript(source_path, caption_source)
+        return Transcript.from_text(self.get_captions(source_path, source_type, caption_source))
+
     def get_video_captions(self, video_path, caption_source=CaptionSources.ALL):
         '''
             Get captions from the video.
         '''
+        return self.get_video_transcript(video_path, caption_source).text
+
+    def get_video_transcript(self, video_path, caption_source=CaptionSources.ALL):
+        '''
+            Get the timestamped transcript of the video.
+        '''
         self.logger.info(f"\n*********************************************************\n"
                         f"get_video_captions: Getting captions from {video_path} using {caption_source}"
                         f"\n*********************************************************\n")
 
         video_id = self.video_captions.get_video_id(video_path)
-        file_path = self.captions_directory
 
         # Check If captions are already available
-        file_content = self.utils.getFile(file_path, video_id);
-        if (not file_content.startswith("Error")):
-            return file_content
-            
+        stored_transcript = self.caption_store.get_transcript(video_id)
+        if stored_transcript is not None:
+            return stored_transcript
+
+        return self.single_flight.do(video_id, lambda: self.derive_video_captions(video_path, video_id, caption_source),
+                                     check=lambda: self.caption_store.get_transcript(video_id))
+
+    def derive_video_captions(self, video_path, video_id, caption_source=CaptionSources.ALL):
+        '''
+            Derive the transcript of the video from caption_source and save it in the caption store.
+        '''
         # Temporarily disable cache
         # cached_result = self.db.get_captions_cached_result(video_id)
         # if cached_result:
@@ -91,6 +152,7 @@ class CaptionDerivation:
         google_captions = None
         downloaded_captions = None
         final_captions = ""
+        final_source = caption_source
 
         if caption_source == CaptionSources.NLP:
             nlp_captions = self.video_captions.get_captions_nlp(video_path)
@@ -99,12 +161,7 @@ class CaptionDerivation:
 
             final_captions = nlp_captions
         elif caption_source == CaptionSources.THIRD_PARTY:
-            tp_captions = self.video_captions.get_captions_thirdparty(video_path)
-            final_tp_captions = ""
-            for data in tp_captions:
-                final_tp_captions += data.get("text", "")
-                final_tp_captions += ""
-            tp_captions = final_tp_captions
+            tp_captions = self.get_thirdparty_captions(video_path)
             
             # Temp Comment
             # if tp_captions:
@@ -132,103 +189,185 @@ class CaptionDerivation:
 
             final_captions = downloaded_captions
         else:
-            try:
-                nlp_captions = self.video_captions.get_captions_nlp(video_path)
-            except Exception as e:
-                self.logger.error(f"Error getting captions get_captions_nlp: {e}")
-            
-            if not nlp_captions:
-                try:
-                    tp_captions = self.video_captions.get_captions_thirdparty(video_path)
-                    # tp_captions = [{'text': 'this is ritesh srinivasana and welcome', 'start': 0.179, 'duration': 4.681}, 
-                    #                {'text': "to my channel in this video let's look", 'start': 2.22, 'duration': 5.76}]
-            
-                    final_tp_captions = ""
-                    for data in tp_captions:
-                        final_tp_captions += data.get("text", "")
-                        final_tp_captions += ""
-                    tp_captions = final_tp_captions
-                except Exception as e:
-                    self.logger.error(f"get_video_captions: Error getting captions get_captions_thirdparty: {e}")
-                
-            # if not tp_captions:
-            # This is allowed only for content owners
-            # try:
-            #     google_captions = self.video_captions.get_captions_google(video_path)
-            # except Exception as e:
-            #     self.logger.error(f"get_video_captions: Error getting captions: {e}")
-
-            if not tp_captions:
-                try:
-                    downloaded_captions = self.video_captions.get_captions_downloadCaptions(video_path)
-                except Exception as e:
-                    self.logger.error(f"get_video_captions: Error getting captions get_captions_downloadCaptions: {e}")
-            
-                if not downloaded_captions:
-                    try:
-                        downloaded_captions = self.video_captions.get_captions_downloadAudio(video_path)
-                    except Exception as e:
-                        self.logger.error(f"get_video_captions: Error getting captions get_captions_downloadAudio: {e}")
-
-            self.logger.info(f"get_video_captions: Captions: nlp_captions: {nlp_captions}, \n tp_captions: {tp_captions}, \n google_captions: {google_captions}, \n downloaded_captions: {downloaded_captions}")
-            if nlp_captions:
-                final_captions = nlp_captions
-            elif tp_captions:
-                final_captions = tp_captions
-            elif google_captions:
-                final_captions = google_captions
-            elif downloaded_captions:
-                final_captions = downloaded_captions
-            else:
-                final_captions = ""
-
-            self.logger.info(f"get_video_captions: Captions: {final_captions}")
+            final_captions, final_source = self.race_video_captions(video_path)
+            if not final_captions:
+                # Every cheap source failed, download the audio and transcribe it
+                downloaded_captions = self.timed_source(CaptionSources.GOOGLE, self.video_captions.get_captions_downloadAudio, video_path)
+                final_captions, final_source = downloaded_captions or "", CaptionSources.GOOGLE
+
+            self.logger.info("get_video_captions: Captions: %d chars from %s", len(str(final_captions or "")), final_source)
+            self.logger.debug("get_video_captions: Captions: %s", final_captions)
             # if final_captions != "":
             #     self.db.insert_captions_cache(video_id, final_captions)
-        
+
+        # Third party and audio transcripts have segment timestamps, the other sources are plain text
+        transcript = final_captions if isinstance(final_captions, Transcript) else Transcript.from_text(final_captions)
+
         # Save captions for future reference
-        if (final_captions):
-            saveFileResult = self.utils.saveFile(file_path, video_id, final_captions)
-            if (saveFileResult):
-                self.logger.info(f"get_video_captions: Caption for {video_id} are saved at {file_path}")
+        if (transcript):
+            if self.caption_store.put_transcript(video_id, transcript, source=final_source):
+                self.logger.info(f"get_video_captions: Caption for {video_id} are saved")
             else:
-                self.logger.info(f"get_video_captions: Caption for {video_id} are not saved at {file_path}")
+                self.logger.info(f"get_video_captions: Caption for {video_id} are not saved")
 
         # will be changed later to return only one caption
-        return final_captions
+        return transcript
         # return {"nlp": nlp_captions, \
         #         "thirdparty": tp_captions, \
         #         "google": google_captions
         #         }
 
+    def get_thirdparty_captions(self, video_path):
+        '''
+            Timestamped transcript of the third party captions of the video, None if there are none.
+        '''
+        tp_captions = Transcript.from_segments(self.video_captions.get_captions_thirdparty(video_path))
+        return tp_captions if tp_captions else None
+
+    def race_video_captions(self, video_path):
+        '''
+            Run the cheap caption sources concurrently and return (captions, source) of the
+            first successful source by priority (NLP, third party transcript, yt-dlp subtitles),
+            or (None, None) when none succeeds within race_timeout_seconds.
+            Once a source succeeds, higher priority sources still running get race_priority_wait_ms
+            to finish. Each race runs on its own executor, one thread per source, so losers still
+            running finish in the background (their result is dropped) without holding up the
+            next races or the shared WorkerPool.
+        '''
+        sources = [(CaptionSources.NLP, self.video_captions.get_captions_nlp),
+                   (CaptionSources.THIRD_PARTY, self.get_thirdparty_captions),
+                   (CaptionSources.DOWNLOAD, self.video_captions.get_captions_downloadCaptions)]
+        priority = [source for source, _ in sources]
+        executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="caption-race")
+        futures = {executor.submit(self.timed_source, source, function, video_path): source for source, function in sources}
+        # Threads exit when their source returns, the race doesn't wait for them
+        executor.shutdown(wait=False)
+
+        results = {}    # source -> captions, None when the source failed
+        pending = set(futures)
+        deadline = time.monotonic() + self.race_timeout_seconds
+        priority_deadline = None
+        winner = None
+        while pending:
+            timeout = deadline - time.monotonic()
+            if priority_deadline is not None:
+                timeout = min(timeout, priority_deadline - time.monotonic())
+            if timeout <= 0:
+                break
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]] = future.result()
+
+            winner = None
+            for source in priority:
+                if source not in results:
+                    break    # a higher priority source is still running
+                if results[source]:
+                    winner = source
+                    break
+            if winner is not None:
+                break
+            if priority_deadline is None and any(results.values()):
+                priority_deadline = time.monotonic() + self.race_priority_wait_ms / 1000
+
+        if winner is None:
+            # Timed out: best finished source, if any
+            winner = next((source for source in priority if results.get(source)), None)
+        for future in pending:
+            if future.cancel():
+                self.record_source_metric(futures[future], "cancelled")
+
+        self.logger.info(f"race_video_captions: {winner or 'no source'} won for {video_path}, "
+                         f"finished: {sorted(results)}, still running: {sorted(futures[future] for future in pending if future.running())}")
+        if winner is None:
+            return None, None
+        self.record_source_metric(winner, "wins")
+        return results[winner], winner
+
+    def timed_source(self, source, function, *args):
+        '''
+            Call a caption source, record its latency and outcome, None if it fails.
+        '''
+        start_time = time.perf_counter()
+        try:
+            captions = function(*args)
+            outcome = "successes" if captions else "empty"
+        except Exception as e:
+            self.logger.error(f"timed_source: Error getting captions from {source}: {e}")
+            captions = None
+            outcome = "errors"
+        self.record_source_metric(source, outcome, time.perf_counter() - start_time)
+        return captions
+
+    def record_source_metric(self, source, outcome, seconds=None):
+        with CaptionDerivation._source_metrics_lock:
+            metrics = CaptionDerivation._source_metrics.setdefault(source, {
+                "calls": 0, "successes": 0, "empty": 0, "errors": 0, "cancelled": 0, "wins": 0,
+                "total_seconds": 0.0, "max_seconds": 0.0, "last_seconds": None})
+            metrics[outcome] += 1
+            if seconds is not None:
+                metrics["calls"] += 1
+                metrics["total_seconds"] += seconds
+                metrics["max_seconds"] = max(metrics["max_seconds"], seconds)
+                metrics["last_seconds"] = round(seconds, 4)
+
+    def get_source_metrics(self):
+        '''
+            Latency and outcome counters per caption source for this process
+        '''
+        with CaptionDerivation._source_metrics_lock:
+            source_metrics = {source: dict(metrics) for source, metrics in CaptionDerivation._source_metrics.items()}
+        for metrics in source_metrics.values():
+            metrics["avg_seconds"] = round(metrics["total_seconds"] / metrics["calls"], 4) if metrics["calls"] else None
+            metrics["total_seconds"] = round(metrics["total_seconds"], 4)
+            metrics["max_seconds"] = round(metrics["max_seconds"], 4)
+        return source_metrics
+
+    def get_caption_stats(self):
+        '''
+            Caption source metrics, single-flight counters and caption store sizes
+        '''
+        return {"sources": self.get_source_metrics(), "single_flight": self.single_flight.get_stats(),
+                "store": self.caption_store.stats()}
+
     def get_audio_captions(self, audio_path, caption_source=CaptionSources.ALL):
         '''
             Get captions from the audio.
         '''
+        return self.get_audio_transcript(audio_path, caption_source).text
+
+    def get_audio_transcript(self, audio_path, caption_source=CaptionSources.ALL):
+        '''
+            Get the timestamped transcript of the audio.
+        '''
         self.logger.info(f"\n*********************************************************\n"
                         f"get_audio_captions: Getting captions from {audio_path} using {caption_source}"
                         f"\n*********************************************************\n")
 
         audio_id = self.audio_captions.get_audio_id(audio_path)
-        file_path = self.captions_directory
         # Check If captions are already available
-        file_content = self.utils.getFile(file_path, audio_id);
-        if (not file_content.startswith("Error")):
-            return file_content
-        # Temporarily disable cache
+        stored_transcript = self.caption_store.get_transcript(audio_id)
+        if stored_transcript is not None:
+            return stored_transcript
+
+        return self.single_flight.do(audio_id, lambda: self.derive_audio_captions(audio_path, audio_id, caption_source),
+                                     check=lambda: self.caption_store.get_transcript(audio_id))
+
+    def derive_audio_captions(self, audio_path, audio_id, caption_source=CaptionSources.ALL):
+        '''
+            Transcribe the audio and save the transcript in the caption store.
+        '''
+        transcript = self.audio_captions.transcribe(audio_path) or Transcript()
 
-        final_captions = ""
-        
         # Save captions for future reference
-        if (final_captions):
-            saveFileResult = self.utils.saveFile(file_path, audio_id, final_captions)
-            if (saveFileResult):
-                self.logger.info(f"get_audio_captions: Caption for ${audio_id} are saved at ${file_path}")
+        if (transcript):
+            if self.caption_store.put_transcript(audio_id, transcript, source=caption_source):
+                self.logger.info(f"get_audio_captions: Caption for {audio_id} are saved")
             else:
-                self.logger.info(f"get_audio_captions: Caption for ${audio_id} are not saved at ${file_path}")
+                self.logger.info(f"get_audio_captions: Caption for {audio_id} are not saved")
+
+        return transcript
 
-        return final_captions
-    
     def get_wiki_captions(self, source_path):
         """
             Get captions from the wiki url.
@@ -238,27 +377,34 @@ class CaptionDerivation:
                         f"\n*********************************************************\n")
         # Check If captions are already available
         web_id = self.utils.get_hash_value(source_path)
-        file_path = self.captions_directory
 
         # Check If captions are already available
-        file_content = self.utils.getFile(file_path, web_id)
-        if (not file_content.startswith("Error")):
-            return file_content
+        stored_captions = self.caption_store.get(web_id)
+        if stored_captions is not None:
+            return stored_captions
+
+        return self.single_flight.do(web_id, lambda: self.derive_wiki_captions(source_path, web_id),
+                                     check=lambda: self.caption_store.get(web_id))
 
+    def derive_wiki_captions(self, source_path, web_id):
+        """
+            Get the text of the wiki or web url and save it in the caption store.
+        """
         # return self.get_wiki_url_text(source_path)
         if source_path.startswith("https://en.wikipedia.org/wiki/"):
             final_captions = self.get_wiki_url_text(source_path)
+            final_source = "wikipedia"
         else:
             final_captions = self.get_web_captions(source_path)
+            final_source = "web"
             # return self.get_wiki_search_text(source_path)
 
         # Save captions for future reference
         if (final_captions):
-            saveFileResult = self.utils.saveFile(file_path, web_id, final_captions)
-            if (saveFileResult):
-                self.logger.info(f"get_wiki_captions: Caption for ${web_id} are saved at ${file_path}")
+            if self.caption_store.put(web_id, final_captions, source=final_source):
+                self.logger.info(f"get_wiki_captions: Caption for {web_id} are saved")
             else:
-                self.logger.info(f"get_wiki_captions: Caption for ${web_id} are not saved at ${file_path}")
+                self.logger.info(f"get_wiki_captions: Caption for {web_id} are not saved")
 
         return final_captions
     
@@ -269,7 +415,7 @@ class CaptionDerivation:
         try:
             # Method 2: Get text only from the main body (often cleaner)
             # This will return all adds, unnecessary content on the page like author, date, etc.
-            soup = BeautifulSoup(html_content, 'lxml')
+            soup = bs4.BeautifulSoup(html_content, 'lxml')
             body = soup.find('body')
             if body:
                 # Remove script and style tags before extracting text
@@ -319,9 +465,10 @@ class CaptionDerivation:
             try:
                 response = requests.get(source_path, headers=headers, timeout=30) # Added timeout
                 # Use readability to parse and identify the main content
-                doc = Document(response.content) # Pass the raw byte content
+                doc = readability.Document(response.content) # Pass the raw byte content
                 summary_html = doc.summary() # Gets the cleaned HTML of the main content
-                self.logger.info(f"get_web_captions: doc: {doc}\nsummary_html: {summary_html}")
+                self.logger.info("get_web_captions: summary_html: %d chars", len(summary_html))
+                self.logger.debug("get_web_captions: doc: %s\nsummary_html: %s", doc, summary_html)
             except Exception as e:
                 self.logger.warning(f"get_web_captions: requests.get failed, trying urllib: {e}")
                 request = Request(source_path, headers=headers)
@@ -337,13 +484,14 @@ class CaptionDerivation:
             # If you prefer not to install lxml or encounter issues installing it, you can switch to 
             # Python's standard library HTML parser. It doesn't require any extra installation 
             # but might be slightly slower or less lenient with poorly formed HTML.
-            soup = BeautifulSoup(summary_html, 'lxml') # Use 'lxml' or 'html.parser'
+            soup = bs4.BeautifulSoup(summary_html, 'lxml') # Use 'lxml' or 'html.parser'
 
             # --- Extract Text ---
             # Method 1: Get all text from the entire page
             # This might include text from <script>, <style> tags, headers, footers etc.
             text = soup.get_text(separator=' ', strip=True)
-            self.logger.info(f"get_web_captions: text: {text}")
+            self.logger.info("get_web_captions: text: %d chars", len(text))
+            self.logger.debug("get_web_captions: text: %s", text)
             if text:
                 self.logger.info(f"get_web_captions: Successfully extracted primary content from \
                                 {source_path} - (length: {len(text)})")
@@ -423,7 +571,7 @@ class CaptionDerivation:
             r = requests.get(wiki_url)
             
             # Get body content
-            soup = BeautifulSoup(r.text,'html.parser')
+            soup = bs4.BeautifulSoup(r.text,'html.parser')
             self.logger.info(f"get_wiki_url_text: r: {r} \n\n")
             # soup: {soup} 
 
@@ -446,7 +594,8 @@ class CaptionDerivation:
             if main_content:
                 paragraphs = main_content.find_all("p")
                 text_content = "\n".join([p.text for p in paragraphs])
-            self.logger.info(f"get_wiki_url_text: text_content: {text_content}")
+            self.logger.info("get_wiki_url_text: text_content: %d chars", len(text_content))
+            self.logger.debug("get_wiki_url_text: text_content: %s", text_content)
 
             # Iterate through all tags
             # for tag in soup_body.find_all():
@@ -3,15 +3,53 @@ from source.services.lib.readProperties import PropertiesReader
 from source.services.lib.utils import Utils
 from source.services.lib.DB import Database
 from source.services.lib.Logger import Logger 
+from source.services.lib.LazyImport import lazy_import
+from source.services.lib.ModelRegistry import ModelRegistry
+from source.services.lib.Transcript import Transcript
+import importlib.util
 import os
-
-import speech_recognition as sr
-from pydub import AudioSegment
+import re
+import subprocess
 
 import wave
 import json
-from vosk import Model, KaldiRecognizer
-import vosk
+
+# Heavy packages are imported on first use
+sr = lazy_import("speech_recognition")
+pydub = lazy_import("pydub")
+vosk = lazy_import("vosk")
+whisper = lazy_import("whisper")
+np = lazy_import("numpy")
+
+# Audio is recognized as 16 kHz mono 16 bit PCM
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+def normalize_word(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+def merge_overlap(previous_text, text, max_words=30):
+    '''
+        text without its leading words that repeat the end of previous_text,
+        as recognized twice in the overlap of two consecutive windows
+    '''
+    previous_words = [normalize_word(word) for word in previous_text.split()[-max_words:]]
+    words = text.split()
+    leading_words = [normalize_word(word) for word in words[:max_words]]
+    for size in range(min(len(previous_words), len(leading_words)), 0, -1):
+        if previous_words[-size:] == leading_words[:size]:
+            return " ".join(words[size:])
+    return text
+
+def vosk_segment(result, default_start, default_end):
+    # Vosk result {"text", "result": [{"word", "start", "end"}, ...]} to a transcript segment
+    text = result.get("text", "").strip()
+    if not text:
+        return None
+    words = result.get("result") or []
+    start = words[0]["start"] if words else default_start
+    end = words[-1]["end"] if words else default_end
+    return {"text": text, "start": round(start, 3), "duration": round(end - start, 3)}
 
 # Configure logging
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -38,13 +76,22 @@ class CaptionDerivationAudio:
             self.utils = Utils(kwargs={"logger":self.logger, "properties":self.properties})
 
 
-        self.db = Database(kwargs={"logger":self.logger})
+        if 'db' in kwargs:
+            self.db = kwargs['db']
+        else:
+            self.db = Database(kwargs={"logger":self.logger, "properties":self.properties, "utils":self.utils})
         self.download_directory = self.properties.get_property("folders", "audio_directory")
         if not self.download_directory:
             self.download_directory = os.path.join(os.getcwd(), 'audioFilesDirectory')
         if not os.path.exists(self.download_directory):
             os.makedirs(self.download_directory)
 
+        # Streaming ASR: audio is decoded and recognized in windows of window_seconds, consecutive
+        # windows share overlap_seconds so words cut at a boundary are heard in full once
+        self.window_seconds = max(1, self.properties.get_property_int("asr", "window_seconds", 30))
+        self.overlap_seconds = min(max(0, self.properties.get_property_int("asr", "overlap_seconds", 2)), self.window_seconds // 2)
+        self.whisper_model_name = self.properties.get_property("asr", "whisper_model", "base")
+        self.vosk_model_path = self.properties.get_property("asr", "vosk_model_path", "vosk-model-small-en-us-0.15")
 
     def __str__(self):
         return f"{CaptionDerivationAudio.__name__}"
@@ -57,11 +104,198 @@ class CaptionDerivationAudio:
         return audio_id
 
     def convert_to_wav(self, input_file):
-        audio = AudioSegment.from_file(input_file)
+        audio = pydub.AudioSegment.from_file(input_file)
         output_file = os.path.join(self.download_directory, self.get_audio_id(input_file))
         audio.export(output_file, format="wav")
         return output_file
 
+    def get_ffmpeg_executable(self):
+        ffmpeg_executable_path = self.properties.get_property("tools", "ffmpeg_path")
+        if ffmpeg_executable_path and os.path.isdir(ffmpeg_executable_path):
+            return os.path.join(ffmpeg_executable_path, 'ffmpeg')
+        return ffmpeg_executable_path or "ffmpeg"
+
+    def iter_pcm_chunks(self, audio_path, chunk_bytes=65536):
+        '''
+            Stream the audio as 16 kHz mono 16 bit PCM in chunks of chunk_bytes.
+            WAV files already in that format are read directly, anything else is decoded
+            by an ffmpeg subprocess, so the decoded audio is never held in memory.
+        '''
+        try:
+            with wave.open(audio_path, "rb") as wav_file:
+                if (wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate()) == (1, SAMPLE_WIDTH, SAMPLE_RATE):
+                    frames = max(1, chunk_bytes // SAMPLE_WIDTH)
+                    while True:
+                        chunk = wav_file.readframes(frames)
+                        if not chunk:
+                            return
+                        yield chunk
+        except (wave.Error, EOFError):
+            pass
+
+        command = [self.get_ffmpeg_executable(), "-nostdin", "-v", "error", "-i", audio_path,
+                   "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            while True:
+                chunk = process.stdout.read(chunk_bytes)
+                if not chunk:
+                    break
+                yield chunk
+            if process.wait() != 0:
+                raise RuntimeError(f"iter_pcm_chunks: ffmpeg failed to decode {audio_path} (exit code {process.returncode})")
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+
+    def iter_audio_windows(self, audio_path):
+        '''
+            Yield (start seconds, PCM bytes) windows of window_seconds, each starting with the
+            last overlap_seconds of the previous one. The last window may be shorter.
+        '''
+        bytes_per_second = SAMPLE_RATE * SAMPLE_WIDTH
+        window_bytes = int(self.window_seconds * bytes_per_second) // SAMPLE_WIDTH * SAMPLE_WIDTH
+        overlap_bytes = int(self.overlap_seconds * bytes_per_second) // SAMPLE_WIDTH * SAMPLE_WIDTH
+        step_bytes = window_bytes - overlap_bytes
+        buffer = bytearray()
+        position = 0    # stream offset of buffer[0], in bytes
+        for chunk in self.iter_pcm_chunks(audio_path):
+            buffer += chunk
+            while len(buffer) >= window_bytes:
+                yield position / bytes_per_second, bytes(buffer[:window_bytes])
+                del buffer[:step_bytes]
+                position += step_bytes
+        if len(buffer) > overlap_bytes or (position == 0 and buffer):
+            yield position / bytes_per_second, bytes(buffer)
+
+    def get_whisper_model(self):
+        # Loaded once per process and kept warm by the model registry
+        model, _ = ModelRegistry.get_or_load(("whisper", self.whisper_model_name),
+                                             lambda: (whisper.load_model(self.whisper_model_name), None))
+        return model
+
+    def get_vosk_model(self, model_path=None):
+        model_path = model_path or self.vosk_model_path
+        model, _ = ModelRegistry.get_or_load(("vosk", model_path), lambda: (vosk.Model(model_path), None))
+        return model
+
+    def stream_captions_whisperai(self, audio_path):
+        model = self.get_whisper_model()
+        committed_until = 0.0
+        windows = self.iter_audio_windows(audio_path)
+        next_window = next(windows, None)
+        while next_window is not None:
+            window_start, pcm = next_window
+            # Look one window ahead, the last window has no next window to hear its overlap
+            next_window = next(windows, None)
+            is_last = next_window is None
+            window_end = window_start + len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+            audio = np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+            result = model.transcribe(audio, fp16=False)
+            # Segments starting in the overlap at the end of the window are left to the next
+            # window, which hears them in full; segments before committed_until were yielded already
+            boundary = window_end if is_last else window_end - self.overlap_seconds
+            for segment in result.get("segments", []):
+                start = window_start + segment["start"]
+                end = window_start + segment["end"]
+                if start < committed_until or start >= boundary:
+                    continue
+                yield {"text": segment["text"].strip(), "start": round(start, 3), "duration": round(end - start, 3)}
+                committed_until = max(committed_until, end)
+            committed_until = max(committed_until, boundary)
+
+    def stream_captions_vosk(self, audio_path, model_path=None):
+        # Vosk decodes a continuous stream, so it is fed plain chunks without overlap
+        recognizer = vosk.KaldiRecognizer(self.get_vosk_model(model_path), SAMPLE_RATE)
+        recognizer.SetWords(True)
+        position = 0.0
+        for chunk in self.iter_pcm_chunks(audio_path, chunk_bytes=8000):
+            chunk_start = position
+            position += len(chunk) / (SAMPLE_RATE * SAMPLE_WIDTH)
+            if recognizer.AcceptWaveform(chunk):
+                segment = vosk_segment(json.loads(recognizer.Result()), chunk_start, position)
+                if segment:
+                    yield segment
+        segment = vosk_segment(json.loads(recognizer.FinalResult()), position, position)
+        if segment:
+            yield segment
+
+    def stream_captions_speechrecognition(self, audio_path):
+        recognizer = sr.Recognizer()
+        previous_text = ""
+        for window_start, pcm in self.iter_audio_windows(audio_path):
+            try:
+                text = recognizer.recognize_google(sr.AudioData(pcm, SAMPLE_RATE, SAMPLE_WIDTH))
+            except sr.UnknownValueError:
+                # No speech in this window
+                continue
+            text = merge_overlap(previous_text, text)
+            if text:
+                yield {"text": text, "start": round(window_start, 3), "duration": round(len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH), 3)}
+                previous_text = text
+
+    def stream_captions(self, audio_path, method="whisperai", model_path=None):
+        '''
+            Generator of partial transcripts {"text", "start", "duration"} (seconds) of the audio file.
+            The audio is decoded and recognized window by window, so memory use does not grow
+            with the length of the audio.
+        '''
+        if (not os.path.exists(audio_path)):
+            raise Exception(f"stream_captions: Audio file not found at: {audio_path}")
+        self.logger.info(f"stream_captions: Transcribing {audio_path} using {method} in windows of "
+                         f"{self.window_seconds}s with {self.overlap_seconds}s overlap")
+        if method == "speechrecognition":
+            return self.stream_captions_speechrecognition(audio_path)
+        if method == "whisperai":
+            return self.stream_captions_whisperai(audio_path)
+        if method == "vosk":
+            return self.stream_captions_vosk(audio_path, model_path)
+        raise ValueError(f"Unknown method: {method}")
+
+    def get_transcript(self, audio_path, method="whisperai", model_path=None):
+        '''
+            Timestamped transcript of the audio file, model_path overrides [asr] vosk_model_path
+        '''
+        return Transcript.from_segments(self.stream_captions(audio_path, method, model_path))
+
+    def is_available(self, method, model_path=None):
+        '''
+            True if the library (and model) of method is installed, logs what is missing otherwise
+        '''
+        if method == "whisperai" and importlib.util.find_spec("whisper") is None:
+            self.logger.error("is_available: WhisperAI library is not installed. Please install it using 'pip install openai-whisper'.")
+            return False
+        if method == "vosk":
+            if importlib.util.find_spec("vosk") is None:
+                self.logger.error("is_available: Vosk library is not installed. Please install it using 'pip install vosk'.")
+                return False
+            if not os.path.exists(model_path or self.vosk_model_path):
+                self.logger.error(f"is_available: Vosk model path does not exist: {model_path or self.vosk_model_path}")
+                return False
+        if method == "speechrecognition" and importlib.util.find_spec("speech_recognition") is None:
+            self.logger.error("is_available: SpeechRecognition library is not installed. Please install it using 'pip install SpeechRecognition'.")
+            return False
+        return True
+
+    def transcribe(self, audio_path, methods=("whisperai", "vosk", "speechrecognition")):
+        '''
+            Timestamped transcript of the audio file from the first of methods that recognizes
+            speech, None if none does.
+        '''
+        for method in methods:
+            if not self.is_available(method):
+                continue
+            try:
+                transcript = self.get_transcript(audio_path, method)
+            except Exception as e:
+                self.logger.error(f"transcribe: Error getting captions using {method}: {e}")
+                continue
+            if transcript:
+                return transcript
+        return None
+
     def get_captions_speechrecognition(self, audio_path):
         '''
         Get captions from an audio file using SpeechRecognition library.
@@ -75,15 +309,11 @@ class CaptionDerivationAudio:
                         f"\n+++++++++++++++++++++++++++++++++++++++++++++++++++++++\n")
         if (not os.path.exists(audio_path)):
             raise Exception(f"get_captions_speechrecognition: Audio file not found at: ${audio_path}");
+        if not self.is_available("speechrecognition"):
+            return None
 
-        recognizer = sr.Recognizer()
-        if not audio_path.endswith(".wav"):
-            audio_path = self.convert_to_wav(audio_path)
-
-        with sr.AudioFile(audio_path) as source:
-            audio = recognizer.record(source)
         try:
-            return recognizer.recognize_google(audio)
+            return self.get_transcript(audio_path, "speechrecognition").text or None
         except Exception as e:
             self.logger.error(f"get_captions_speechrecognition: Error recognizing audio: {e}")
             return None
@@ -103,33 +333,17 @@ class CaptionDerivationAudio:
                         f"get_captions_whisperai: Processing audio file at {audio_path}"
                         f"\n+++++++++++++++++++++++++++++++++++++++++++++++++++++++\n")
         # Ensure the whisper library is installed
-        # You can install it using: pip install whisper
-        if not os.path.exists(audio_path):
-            self.logger.error(f"get_captions_whisperai: Audio file not found at: {audio_path}")
-            return None
-        if not os.path.exists(self.download_directory):
-            self.logger.error(f"get_captions_whisperai: Download directory does not exist: {self.download_directory}")
-            return None
-        if not os.path.exists("whisper"):
-            self.logger.error("get_captions_whisperai: WhisperAI library is not installed. Please install it using 'pip install whisper'.")
-            return None
-        if not os.path.exists("whisper/whisper"):
-            self.logger.error("get_captions_whisperai: WhisperAI model is not available. Please download the model.")
-            return None 
-        try:
-            import whisper
-            model = whisper.load_model("base")
-            result = model.transcribe(audio_path)
-            return result["text"]   
-        except ImportError:
-            self.logger.error("get_captions_whisperai: WhisperAI library is not installed. Please install it using 'pip install whisper'.")
+        # You can install it using: pip install openai-whisper
+        if not self.is_available("whisperai"):
             return None
+        return self.get_transcript(audio_path, "whisperai").text or None
         
-    def get_captions_vosk(self, audio_path, model_path="vosk-model-small-en-us-0.15"):
+    def get_captions_vosk(self, audio_path, model_path=None):
         '''
         Get captions from an audio file using Vosk.
         Args:
             audio_path (str): Path to the audio file.
+            model_path (str): Vosk model directory, [asr] vosk_model_path by default.
             Returns:    
             str: Recognized text from the audio file.
         '''
@@ -138,48 +352,11 @@ class CaptionDerivationAudio:
         self.logger.info(f"\n+++++++++++++++++++++++++++++++++++++++++++++++++++++++\n"
                         f"get_captions_vosk: Processing audio file at {audio_path}"
                         f"\n+++++++++++++++++++++++++++++++++++++++++++++++++++++++\n")
-        # Ensure the vosk library is installed
+        # Ensure the vosk library and model are installed
         # You can install it using: pip install vosk
-        if not os.path.exists("vosk"):
-            self.logger.error("get_captions_vosk: Vosk library is not installed. Please install it using 'pip install vosk'.")
-            return None
-        if not os.path.exists(model_path):
-            self.logger.error(f"get_captions_vosk: Model path does not exist: {model_path}")
-            return None
-        if not os.path.exists(audio_path):
-            self.logger.error(f"get_captions_vosk: Audio file not found at: {audio_path}")
-            return None
-        # Check if the model path exists
-        if not os.path.exists(model_path):
-            self.logger.error(f"get_captions_vosk: Model path does not exist: {model_path}")
-            return None
-        # Check if the audio file exists
-        if not os.path.exists(audio_path):
-            self.logger.error(f"get_captions_vosk: Audio file not found at: {audio_path}")
-            return None
-        
-        try:
-            vosk = __import__('vosk')
-            if not os.path.exists(model_path):
-                self.logger.error(f"get_captions_vosk: Model path does not exist: {model_path}")
-                return None
-            if not os.path.exists(audio_path):
-                self.logger.error(f"get_captions_vosk: Audio file not found at: {audio_path}")
-                return None
-            model = vosk.Model("model")
-            recognizer = vosk.KaldiRecognizer(model, 16000)
-            with open(audio_path, "rb") as f:
-                while True:
-                    data = f.read(4000)
-                    if len(data) == 0:
-                        break
-                    if recognizer.AcceptWaveform(data):
-                        result = recognizer.Result()
-                        return result["text"]
-            return None
-        except ImportError:
-            self.logger.error("get_captions_vosk: Vosk library is not installed. Please install it using 'pip install vosk'.")
+        if not self.is_available("vosk", model_path):
             return None
+        return self.get_transcript(audio_path, "vosk", model_path).text or None
         
     def get_captions(self, audio_path, method="speechrecognition"):
         """
@@ -1,13 +1,10 @@
 # Import necessary libraries
 import os
 import requests
-import yt_dlp
-from transformers import pipeline
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import NoTranscriptFound, YouTubeRequestFailed, IpBlocked, RequestBlocked, TranscriptsDisabled
 # CouldNotRetrieveTranscript
 
 from source.services.lib.readProperties import PropertiesReader
+from source.services.lib.LazyImport import lazy_import
 from source.services.lib.utils import Utils
 from source.services.lib.DB import Database
 from source.services.lib.Logger import Logger 
@@ -15,6 +12,11 @@ from source.services.lib.Authorization import Authorization
 from source.services.YouTubeDownloader import YouTubeDownloader
 from source.services.CaptionDerivationAudio import CaptionDerivationAudio
 
+# Heavy packages are imported on first use
+yt_dlp = lazy_import("yt_dlp")
+youtube_transcript_api = lazy_import("youtube_transcript_api")
+transcript_errors = lazy_import("youtube_transcript_api._errors")
+
 class CaptionDerivationVideo:
     """
     A class to derive captions from a given video.
@@ -37,17 +39,21 @@ class CaptionDerivationVideo:
             self.utils = Utils(kwargs={"logger":self.logger, "properties":self.properties})
 
 
-        self.db = Database(kwargs={"logger":self.logger})
+        if 'db' in kwargs:
+            self.db = kwargs['db']
+        else:
+            self.db = Database(kwargs={"logger":self.logger, "properties":self.properties, "utils":self.utils})
         self.authorization = Authorization(kwargs={"properties":self.properties, "logger":self.logger})
-        self.captionDerivationAudio = CaptionDerivationAudio(kwargs={"properties":self.properties, "logger":self.logger, "utils":self.utils})
-        self.youtubeDownload = YouTubeDownloader(kwargs={"properties":self.properties, "logger":self.logger, "utils":self.utils}) 
+        self.captionDerivationAudio = CaptionDerivationAudio(kwargs={"properties":self.properties, "logger":self.logger, "utils":self.utils, "db":self.db})
+        self.youtubeDownload = YouTubeDownloader(kwargs={"properties":self.properties, "logger":self.logger, "utils":self.utils, "db":self.db}) 
         self.captions_directory = self.properties.get_property("folders", "captions_directory")
         if not self.captions_directory:
             self.captions_directory = os.path.join(os.getcwd(), 'captionsDirectory')
         if not os.path.exists(self.captions_directory):
             os.makedirs(self.captions_directory)
         self.logger.info(f"Download directory set to: {self.captions_directory}")
-
+        # Network timeout of the caption sources, a source that loses the caption race stops at the latest then
+        self.source_timeout_seconds = self.properties.get_property_int("captions", "source_timeout_seconds", 30)
 
     def __str__(self):
         return f"{CaptionDerivationVideo.__name__}"
@@ -94,7 +100,7 @@ class CaptionDerivationVideo:
                             f"get_captions_thirdparty: video_id: {video_id} from video_path: {video_path}"+ "\n"
                             f"\n+++++++++++++++++++++++++++++++++++++++++++++++++++++++\n")
 
-            ytt_api = YouTubeTranscriptApi()
+            ytt_api = youtube_transcript_api.YouTubeTranscriptApi()
             lang_code = 'en'
             # Use the static get_transcript method.
             # This method fetches the transcript in the specified languages (e.g., 'en' for English).
@@ -152,7 +158,9 @@ class CaptionDerivationVideo:
                     self.logger.error(f"get_captions_thirdparty: auto_transcript Error: {e}")
                     auto_transcript = None
 
-                self.logger.info(f"get_captions_thirdparty: manual_transcript: {manual_transcript}\nauto_transcript: {auto_transcript}")    
+                self.logger.info("get_captions_thirdparty: manual_transcript: %s, auto_transcript: %s",
+                                 manual_transcript is not None, auto_transcript is not None)
+                self.logger.debug("get_captions_thirdparty: manual_transcript: %s\nauto_transcript: %s", manual_transcript, auto_transcript)
                 
                 captions = manual_transcript if manual_transcript else auto_transcript
                 
@@ -166,15 +174,15 @@ class CaptionDerivationVideo:
                 # self.logger.info(f"get_captions_thirdparty: input_text: {input_text}")
 
             return captions  #.to_raw_data()   # return the value in dictionary format
-        except YouTubeRequestFailed as e:
+        except transcript_errors.YouTubeRequestFailed as e:
             self.logger.error(f"get_captions_thirdparty: YouTube request failed: {e}")
             return None
         
-        except NoTranscriptFound as e:
+        except transcript_errors.NoTranscriptFound as e:
             self.logger.error(f"No transcript found for this video : {e}")
             # return None
             try:
-                transcript_list_obj = YouTubeTranscriptApi.list_transcripts(video_id)
+                transcript_list_obj = youtube_transcript_api.YouTubeTranscriptApi.list_transcripts(video_id)
                 found_transcript_data = None
                 # Check manually created transcripts first
                 for lang_code in transcript_list_obj._manually_created_transcripts:
@@ -206,15 +214,15 @@ class CaptionDerivationVideo:
                 self.logger.error(f"get_captions_thirdparty: Error during fallback transcript search for {video_id}: {e_fallback}", exc_info=True)
                 return None
     
-        except IpBlocked as e: 
+        except transcript_errors.IpBlocked as e: 
             self.logger.error(f"get_captions_thirdparty: YouTube request IP blocked: {e}")
             return None
         
-        except RequestBlocked as e:
+        except transcript_errors.RequestBlocked as e:
             self.logger.error(f"get_captions_thirdparty: YouTube request blocked: {e}")
             return None
 
-        except TranscriptsDisabled as e:
+        except transcript_errors.TranscriptsDisabled as e:
             self.logger.error(f"get_captions_thirdparty: YouTube Transcript disabled: {e}")
             return None
         
@@ -265,6 +273,7 @@ class CaptionDerivationVideo:
                 "subtitlesformat": "json3",
                 # You can skip the following option
                 "sleep_interval_subtitles": 1,
+                "socket_timeout": self.source_timeout_seconds,
             }
             
             # ydl = youtube_dl.YoutubeDL(ydl_opts)
@@ -363,7 +372,8 @@ class CaptionDerivationVideo:
             
             # 4. Return the caption text
             caption_text = response.text
-            self.logger.info(f"get_captions_google: Captions {caption_text} found for video: {video_id}")
+            self.logger.info("get_captions_google: Captions of %d chars found for video: %s", len(caption_text), video_id)
+            self.logger.debug("get_captions_google: Captions: %s", caption_text)
             return caption_text
 
         except requests.exceptions.HTTPError as e:
@@ -487,35 +497,17 @@ class CaptionDerivationVideo:
                 
             self.logger.info(f"get_captions_downloadAudio: audio_download: {audio_download}");
 
-            # Get Captions
+            # Get Captions: whisper, then vosk, then speechrecognition, with segment timestamps
             captions = None
             if (audio_download): # (len(audio_download) > 0):
-                try:
-                    captions = self.captionDerivationAudio.get_captions_whisperai(audio_download);
-                except Exception as e:
-                    self.logger.error(f"get_captions_downloadAudio: Error getting captions using get_captions_whisperai: {e}")
-            
-                if (not captions):
-                    try:
-                        captions = self.captionDerivationAudio.get_captions_vosk(audio_download);
-                        # getCaptionsAudioPathWhisperNode
-                    except Exception as e:
-                        self.logger.error(f"get_captions_downloadAudio: get_captions_downloadAudio: Error getting captions using get_captions_vosk: {e}")
-
-                if (not captions):
-                    try:
-                        captions = self.captionDerivationAudio.get_captions_speechrecognition(audio_download)
-                        # getCaptionsAudioPathWhisperNode
-                    except Exception as e:
-                        self.logger.error(f"get_captions_downloadAudio: get_captions_downloadAudio: Error getting captions using get_captions_speechrecognition: {e}")
-                    
-                # getCaptionsAudioPathVoskCLI  getCaptionsAudioPathVoskNode
-                self.logger.info(f"get_captions_downloadAudio: get_captions_downloadAudio: captions: {captions}")
+                captions = self.captionDerivationAudio.transcribe(audio_download)
+                self.logger.info("get_captions_downloadAudio: captions: %d chars", len(captions.text) if captions else 0)
+                self.logger.debug("get_captions_downloadAudio: captions: %s", captions)
             else:
                 self.logger.error(f"get_captions_downloadAudio: get_captions_downloadAudio: Audio was not downloaded: {audio_download}")
             
 
-            return captions;  # Returns in dictionary format
+            return captions;  # Transcript, None if no method recognized the audio
         except Exception as e:
             self.logger.error(f"get_captions_downloadAudio: get_captions_downloadAudio: Error getting captions: {e}")
             return None
\ No newline at end of file
@@ -1,12 +1,44 @@
 from source.services.lib.readProperties import PropertiesReader
 from source.services.lib.utils import Utils
 from source.services.lib.Logger import Logger 
-import spacy
-import nltk
+from source.services.lib.LazyImport import lazy_import
 import re
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
-from nltk.tag import pos_tag
+
+# Heavy packages are imported on first use
+spacy = lazy_import("spacy")
+nltk = lazy_import("nltk")
+
+# Wiki style references: [1], [2], [3] etc.
+REFERENCE_PATTERN = re.compile(r"\[\d+\]")
+# POS tags of cardinal numbers and symbols
+NUMERIC_TAGS = frozenset(['CD', 'SYM'])
+
+def filter_factual_sentences(sentences):
+    """
+    Potential factual statements among sentences, in order.
+
+    A sentence is kept when it has at least 3 words, some letters and, once the
+    references are removed, a cardinal number (CD) or a symbol (SYM) POS tag.
+    The sentences are tagged together with pos_tag_sents, which loads the tagger
+    once. Module level so it can run on a process pool.
+    """
+    candidates = []
+    for sentence in sentences:
+        # 2. Basic Filtering (length, presence of letters)
+        if len(sentence.split()) < 3:  # Skip very short sentences
+            continue
+        if not any(char.isalpha() for char in sentence): # Skip if no alphabets
+            continue
+        # 2.1. Remove references as it comes in wiki text
+        candidates.append(REFERENCE_PATTERN.sub("", sentence).replace("\n", ""))
+
+    # 3. Part-of-Speech (POS) Tagging, tokenized once per sentence
+    tagged_sentences = nltk.tag.pos_tag_sents([nltk.tokenize.word_tokenize(sentence) for sentence in candidates])
+
+    # 4. Only take that has numeric value in the sentence. The noun/verb, question and stop word
+    # checks the filter used to make were always overridden by this one, so they are not computed.
+    return [sentence for sentence, tagged_words in zip(candidates, tagged_sentences)
+            if any(tag in NUMERIC_TAGS for _, tag in tagged_words)]
 
 
 # Configure logging
@@ -33,6 +65,11 @@ class NERStatementDerivation:
         else:
             self.utils = Utils(kwargs={"logger":self.logger, "properties":self.properties})
         
+        # Texts with at least parallel_min_sentences sentences are split in shards of shard_size
+        # sentences when derive_nltk_statements is given an executor
+        self.parallel_min_sentences = self.properties.get_property_int("nlp", "ner_parallel_min_sentences", 2000)
+        self.shard_size = max(1, self.properties.get_property_int("nlp", "ner_shard_size", 500))
+
         self.spc = None  # Initialize to None
         # try:
         #     # https://spacy.io/models
@@ -56,27 +93,46 @@ class NERStatementDerivation:
         return f"{NERStatementDerivation.__name__}"
 
 
-    def derive_spacy_statements(self, text):
+    def get_shards(self, sentences):
+        """
+        Consecutive shards of shard_size sentences, or None if there are less than
+        parallel_min_sentences sentences and the text isn't worth splitting.
+        """
+        if len(sentences) < self.parallel_min_sentences:
+            return None
+        return [sentences[i:i + self.shard_size] for i in range(0, len(sentences), self.shard_size)]
+
+    def derive_spacy_statements(self, text, n_process=1):
         """
         Extracts potential factual statements from a given text.
+
+        With n_process > 1 long texts are split at sentence boundaries and the shards
+        are processed by nlp.pipe on n_process processes, the statements keep their order.
         """
         if self.spc is None:
             self.logger.error("Spacy model not loaded. Cannot derive Spacy statements.")
             return []
 
         try:
-            doc = self.spc(text)
+            shards = self.get_shards(nltk.tokenize.sent_tokenize(text)) if n_process > 1 else None
+            if shards is None:
+                docs = [self.spc(text)]
+            else:
+                self.logger.info("derive_spacy_statements: Processing %d shards on %d processes", len(shards), n_process)
+                docs = self.spc.pipe((" ".join(shard) for shard in shards), n_process=n_process)
+
             factual_statements = []
-            for sent in doc.sents:
-                # Filter statements with named entities (suggests factual info)
-                if any(ent.label_ in ["PERSON", "GPE", "ORG", "DATE", "MONEY"] for ent in sent.ents):
-                    factual_statements.append(sent.text)
+            for doc in docs:
+                for sent in doc.sents:
+                    # Filter statements with named entities (suggests factual info)
+                    if any(ent.label_ in ["PERSON", "GPE", "ORG", "DATE", "MONEY"] for ent in sent.ents):
+                        factual_statements.append(sent.text)
             return factual_statements
         except Exception as e:
             self.logger.error(f"Error in derive_spacy_statements: {e}")
             return []
 
-    def derive_nltk_statements(self, text):
+    def derive_nltk_statements(self, text, executor=None):
         """
         Extracts potential factual statements from a given text.
 
@@ -85,6 +141,9 @@ class NERStatementDerivation:
 
         Args:
             text (str): The input text from which to extract statements.
+            executor (Executor, optional): When given, long texts are sentence tokenized in shards
+                on the executor and texts of at least ner_parallel_min_sentences sentences are
+                filtered in shards of ner_shard_size sentences on it.
 
         Returns:
             list: A list of strings, where each string is a potential factual statement.
@@ -95,74 +154,14 @@ class NERStatementDerivation:
             return []
 
         # 1. Sentence Tokenization - It adds \n if sentence starts with a new empty line
-        sentences = sent_tokenize(text)
-        self.logger.info(f"derive_nltk_statements: Number of sentences: {len(sentences)}\nSentences: {sentences}")
-
-        factual_statements = []
-        for sentence in sentences:
-            # 2. Basic Filtering (length, presence of verbs)
-            if len(sentence.split()) < 3:  # Skip very short sentences
-                continue
-            if not any(char.isalpha() for char in sentence): # Skip if no alphabets
-                continue
-
-            # 2.1. Remove references as it comes in wiki text
-            # Removed [1], [2], [3] etc.
-            # self.logger.info(f"derive_nltk_statements: Original sentence: {sentence}")
-            sentence = re.sub(r"\[\d+\]", "", sentence).replace("\n", "")
-            # self.logger.info(f"derive_nltk_statements: Removed References sentence: {sentence}")
-
-            # 3. Part-of-Speech (POS) Tagging
-            tagged_words = pos_tag(word_tokenize(sentence))
-            # self.logger.info(f"derive_nltk_statements: Tagged words: {tagged_words}")
-            # VBP, PRP, IN, RB, DT, VBZ, VB, VBD, VBN, JJ, NN, NNS, CD, JJR, JJS
-
-            # 4. Filtering based on POS tags and content
-            is_factual = False
-            has_noun = False
-            has_verb = False
-            has_cardinal = False
-            has_symbol = False
-            for word, tag in tagged_words:
-                if tag.startswith('NN'):  # Noun (singular or plural)
-                    has_noun = True
-                elif tag.startswith('VB'):  # Verb (base form, past tense, etc.)
-                    has_verb = True
-                elif tag in ['CD']: # Cardinal numbers
-                    is_factual = True
-                    has_cardinal = True
-                elif tag in ['SYM']:
-                    has_symbol = True
-                elif tag in ['JJ', 'JJR', 'JJS']: # Adjective
-                    is_factual = True
-
-            # self.logger.info(f"derive_nltk_statements: is_factual: {is_factual}, has_noun: {has_noun}, has_verb: {has_verb}")
-            if has_noun and has_verb:
-                is_factual = True
-
-            # 5. Remove questions and commands
-            if sentence.endswith('?') or sentence.endswith('!'):
-                is_factual = False
-            # self.logger.info(f"derive_nltk_statements: is_factual: {is_factual}")
-            
-            # 6. Remove stop words
-            stop_words = set(stopwords.words('english'))
-            # {'have', 'they', 'as', "you've", 's', 'below', 'm', 'once', 'll', 'those', "you'll", 'how', 'couldn', 'ma', "i'm", 'ours', "don't", 'same', "hadn't", 'each', 'or', 'will', 'ourselves', 'an', 'aren', 'yourselves', 'then', 'some', "hasn't", 'now', "she'll", 'into', 'after', 'such', 'them', 'during', 'there', 'herself', "we'd", 'o', 'did', 'their', 'before', "he's", "i'll", 'only', 'shouldn', 'down', 'between', 'his', 'he', "needn't", 't', "it'd", 'don', 'had', "they're", 'why', 'hasn', "won't", 'your', 'it', 'd', 'myself', 'me', "we'll", 'yourself', 'my', 'do', 'our', 'does', 'no', "didn't", "she'd", 'when', 'any', 'what', 'which', 'you', "we've", "aren't", "should've", 'him', 'ain', "haven't", 'with', 'and', 'on', 'doesn', 'am', 'in', 'has', 'be', 'its', "that'll", 'up', "he'll", 're', 'here', 'both', 'isn', 'most', 'for', 'is', 'were', 'this', 'been', 'above', 'not', "we're", 'himself', 'she', 'who', "it'll", "you're", 'the', 'out', 'i', 'than', 'if', 'too', "it's", 'through', 'under', 'wouldn', 'where', 'hadn', 'by', 'themselves', 'about', 'are', 'having', "they'd", 'very', 'other', "wasn't", 'more', 'just', 'all', 'of', 've', "doesn't", 'can', 'should', "they've", "shan't", 'so', "you'd", "couldn't", 'a', 'own', 'while', 'mightn', 'because', 'from', 'that', 'further', "mightn't", 'whom', "she's", 'nor', "they'll", 'theirs', 'her', 'at', 'but', 'haven', 'mustn', 'itself', "wouldn't", 'we', "i've", "weren't", "shouldn't", 'over', 'was', "he'd", 'against', 'shan', 'weren', 'doing', 'won', 'y', 'again', 'these', 'until', 'to', "i'd", 'hers', "isn't", 'yours', 'didn', 'off', 'wasn', 'being', 'needn', "mustn't", 'few'}
-            # self.logger.info(f"derive_nltk_statements: stop_words: {stop_words}")
-            words = word_tokenize(sentence)
-            filtered_words = [w for w in words if not w.lower() in stop_words]
-            if len(filtered_words) < 2:
-                is_factual = False
-            
-            # 7. Only take that has numeric value in the sentence
-            if has_cardinal or has_symbol:
-                is_factual = True
-            else:
-                is_factual = False
-
-            self.logger.info(f"derive_nltk_statements: is_factual: {is_factual}\n\n")
+        sentences = self.utils.sentence_tokenization(text, executor=executor)
+        self.logger.info("derive_nltk_statements: Number of sentences: %d", len(sentences))
+        self.logger.debug("derive_nltk_statements: Sentences: %s", sentences)
 
-            if is_factual:
-                factual_statements.append(sentence)
+        shards = self.get_shards(sentences) if executor is not None else None
+        if shards is None:
+            return filter_factual_sentences(sentences)
 
-        return factual_statements
\ No newline at end of file
+        self.logger.info("derive_nltk_statements: Filtering %d shards in parallel", len(shards))
+        return [statement for shard_statements in executor.map(filter_factual_sentences, shards)
+                for statement in shard_statements]
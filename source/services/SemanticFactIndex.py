@@ -0,0 +1,326 @@
+# Import necessary libraries
+from source.services.lib.readProperties import PropertiesReader
+from source.services.lib.DB import Database
+from source.services.lib.Logger import Logger
+from source.services.lib.ModelRegistry import ModelRegistry
+from source.services.lib.utils import Utils, AvailableModels, ReturnTensorTypes, FactCheckStages
+from source.services.lib.LazyImport import lazy_import
+import os
+import json
+
+# Heavy packages are imported on first use
+np = lazy_import("numpy")
+torch = lazy_import("torch")
+transformers = lazy_import("transformers")
+
+# k-means needs this many facts per IVF partition to train useful centroids,
+# smaller indexes are scanned brute force
+MIN_FACTS_PER_PARTITION = 39
+
+class IndexSnapshot:
+    """
+    The arrays of one build of the semantic fact index. A snapshot is never changed:
+    a rebuild publishes a new one with a single assignment, and a search reads the
+    snapshot once, so it never pairs the fact ids of one build with the embeddings of another.
+    """
+    __slots__ = ("embeddings", "fact_ids", "centroids", "list_offsets", "metadata")
+
+    def __init__(self, embeddings, fact_ids, centroids, list_offsets, metadata):
+        for name, value in (("embeddings", embeddings), ("fact_ids", fact_ids), ("centroids", centroids),
+                            ("list_offsets", list_offsets), ("metadata", metadata)):
+            if value is not None and hasattr(value, "flags"):
+                value.flags.writeable = False
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{IndexSnapshot.__name__} is immutable")
+
+class SemanticFactIndex:
+    """
+    An in-process vector index over the embeddings of the facts table, so paraphrased
+    claims can be answered from the database without calling the external API.
+
+    Embeddings are L2 normalized, so the dot product is the cosine similarity. Search is a
+    NumPy brute force scan, or an IVF style scan of the nprobe closest partitions when the
+    index is built with nlist > 0. The index is persisted as .npy files and memory-mapped
+    when loaded, and has to be rebuilt (build()) after facts are loaded.
+    """
+
+    def __init__(self, kwargs=None):
+        if 'logger' in kwargs:
+            self.logger = kwargs['logger']
+        else:
+            self.loging = Logger()
+            self.logger = self.loging.get_logger()
+
+        if 'properties' in kwargs:
+            self.properties = kwargs['properties']
+        else:
+            self.properties = PropertiesReader(kwargs={"logger":self.logger})
+
+        if 'utils' in kwargs:
+            self.utils = kwargs['utils']
+        else:
+            self.utils = Utils(kwargs={"logger":self.logger, "properties":self.properties})
+
+        if 'db' in kwargs:
+            self.db = kwargs['db']
+        else:
+            self.db = Database(kwargs={"logger":self.logger, "properties":self.properties, "utils":self.utils})
+
+        if torch.cuda.is_available():
+            self.device = 'cuda'
+        else:
+            self.device = 'cpu'
+        self.tensor_return_type = ReturnTensorTypes.PYTORCH
+        self.model_name = AvailableModels.MINILM_EMBEDDINGS
+        self.max_tokenizer_length = 128
+        self.embedding_batch_size = 256
+
+        self.similarity_threshold = float(self.properties.get_property("semantic_index", "similarity_threshold", "0.85"))
+        # nlist = 0 -> brute force, otherwise number of IVF partitions
+        self.nlist = self.properties.get_property_int("semantic_index", "nlist", 0)
+        self.nprobe = self.properties.get_property_int("semantic_index", "nprobe", 4)
+
+        self.index_directory = self.properties.get_property("folders", "index_directory")
+        if not self.index_directory:
+            self.index_directory = os.path.join(os.getcwd(), 'indexDirectory')
+        if not os.path.exists(self.index_directory):
+            os.makedirs(self.index_directory)
+
+        # Replaced as a whole by load(), None until an index is loaded
+        self.snapshot = None
+        self.load()
+
+    def __str__(self):
+        return f"{SemanticFactIndex.__name__}"
+
+    def get_index_file(self, name, extension="npy"):
+        return os.path.join(self.index_directory, f"facts_{name}.{extension}")
+
+    def is_loaded(self):
+        return self.snapshot is not None
+
+    def load(self):
+        '''
+            Memory-map a previously built index, returns False if there is none
+        '''
+        try:
+            metadata_file = self.get_index_file("metadata", "json")
+            if not os.path.exists(metadata_file):
+                self.logger.info(f"load: No semantic fact index found in {self.index_directory}")
+                return False
+
+            with open(metadata_file, mode="r", encoding="utf-8") as file:
+                metadata = json.load(file)
+            if metadata.get("model_name") != self.model_name:
+                self.logger.warning(f"load: Semantic fact index was built with {metadata.get('model_name')}, rebuild required")
+                return False
+
+            count = metadata["count"]
+            embeddings = np.load(self.get_index_file("embeddings"), mmap_mode="r")
+            fact_ids = np.load(self.get_index_file("ids"), mmap_mode="r")
+            centroids = None
+            list_offsets = None
+            if metadata.get("nlist"):
+                centroids = np.load(self.get_index_file("centroids"))
+                list_offsets = np.load(self.get_index_file("list_offsets"))
+            # A build swapping its files in right now: keep the index we have
+            if not self.matches_metadata(metadata, embeddings, fact_ids, centroids, list_offsets):
+                self.logger.warning("load: Semantic fact index files don't match their metadata, keeping the loaded index")
+                return False
+            self.snapshot = IndexSnapshot(embeddings[:count], fact_ids, centroids, list_offsets, metadata)
+            self.logger.info(f"load: Loaded semantic fact index - {count} facts, nlist: {metadata.get('nlist')}")
+            return True
+        except Exception as e:
+            self.logger.error(f"load: Error loading semantic fact index: {e}")
+            return False
+
+    def matches_metadata(self, metadata, embeddings, fact_ids, centroids, list_offsets):
+        '''
+            True if the index files belong to the build described by metadata
+        '''
+        count = metadata["count"]
+        # Indexes built before "rows" was recorded are only checked on their counts
+        if len(fact_ids) != count or len(embeddings) != metadata.get("rows", len(embeddings)) or count > len(embeddings):
+            return False
+        if count and int(fact_ids.max()) != metadata.get("max_fact_id"):
+            return False
+        if metadata.get("nlist"):
+            return len(centroids) == metadata["nlist"] and len(list_offsets) == metadata["nlist"] + 1 and int(list_offsets[-1]) == count
+        return True
+
+    def embed(self, texts):
+        '''
+            Mean pooled, L2 normalized sentence embeddings as a float32 (len(texts), dim) array
+        '''
+        model, tokenizer = ModelRegistry.get_model(self.model_name, transformers.AutoModel, transformers.AutoTokenizer, device=self.device)
+        inputs = tokenizer(texts, padding=True, truncation=True, max_length=self.max_tokenizer_length,
+                           return_tensors=self.tensor_return_type).to(self.device)
+        with torch.inference_mode():
+            token_embeddings = model(**inputs).last_hidden_state
+        attention_mask = inputs["attention_mask"].unsqueeze(-1).type_as(token_embeddings)
+        embeddings = (token_embeddings * attention_mask).sum(dim=1) / attention_mask.sum(dim=1).clamp(min=1e-9)
+        embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+        return embeddings.cpu().numpy().astype(np.float32)
+
+    def train_centroids(self, embeddings, nlist, iterations=10, sample_size=None):
+        '''
+            Spherical k-means on a sample of the embeddings, returns (nlist, dim) normalized centroids
+        '''
+        sample_size = sample_size or nlist * 256
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(len(embeddings), size=min(sample_size, len(embeddings)), replace=False))
+        sample = np.asarray(embeddings[sample_rows])
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            for partition in range(nlist):
+                members = sample[assignments == partition]
+                if len(members):
+                    centroids[partition] = members.sum(axis=0)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-9)
+        return centroids
+
+    def build(self):
+        '''
+            Embed every fact and write the index files, then memory-map the new index.
+            Every file is written under a .tmp name, the complete set is swapped in with
+            os.replace and the metadata is replaced last. load() checks the counts of the
+            metadata against the files, so it never pairs files of two different builds.
+        '''
+        count = self.db.count_facts()
+        self.logger.info(f"build: Building semantic fact index for {count} facts")
+        if count == 0:
+            return 0
+
+        embeddings = None
+        fact_ids = np.empty(count, dtype=np.int64)
+        row = 0
+        embeddings_file = self.get_index_file("embeddings.tmp")
+        for batch in self.db.iter_facts(batch_size=self.embedding_batch_size):
+            batch = batch[:count - row]
+            if not batch:
+                break
+            batch_embeddings = self.embed([claim or "" for _, claim, _ in batch])
+            if embeddings is None:
+                embeddings = np.lib.format.open_memmap(embeddings_file, mode="w+", dtype=np.float32,
+                                                       shape=(count, batch_embeddings.shape[1]))
+            embeddings[row:row + len(batch)] = batch_embeddings
+            fact_ids[row:row + len(batch)] = [fact_id for fact_id, _, _ in batch]
+            row += len(batch)
+        # facts deleted while building
+        count = row
+        if count == 0:
+            self.logger.info("build: Every fact was deleted while building, keeping the previous index")
+            return 0
+        rows = embeddings.shape[0]
+        temp_files = {name: self.get_index_file(f"{name}.tmp") for name in ("ids", "centroids", "list_offsets")}
+        temp_files["embeddings"] = embeddings_file
+
+        nlist = self.nlist if self.nlist and count >= self.nlist * MIN_FACTS_PER_PARTITION else 0
+        if nlist:
+            centroids = self.train_centroids(embeddings[:count], nlist)
+            assignments = np.empty(count, dtype=np.int64)
+            for start in range(0, count, self.embedding_batch_size * 16):
+                end = min(count, start + self.embedding_batch_size * 16)
+                assignments[start:end] = np.argmax(np.asarray(embeddings[start:end]) @ centroids.T, axis=1)
+            # Store every partition contiguously so a probe is a slice of the memmap
+            order = np.argsort(assignments, kind="stable")
+            list_offsets = np.searchsorted(assignments[order], np.arange(nlist + 1))
+            ordered_file = self.get_index_file("embeddings.ordered.tmp")
+            ordered_embeddings = np.lib.format.open_memmap(ordered_file, mode="w+", dtype=np.float32,
+                                                           shape=(count, embeddings.shape[1]))
+            rows = count
+            for start in range(0, count, self.embedding_batch_size * 16):
+                end = min(count, start + self.embedding_batch_size * 16)
+                ordered_embeddings[start:end] = embeddings[order[start:end]]
+            ordered_embeddings.flush()
+            del embeddings, ordered_embeddings
+            os.replace(ordered_file, embeddings_file)
+            fact_ids = fact_ids[:count][order]
+            np.save(temp_files["centroids"], centroids)
+            np.save(temp_files["list_offsets"], list_offsets)
+        else:
+            embeddings.flush()
+            del embeddings
+            fact_ids = fact_ids[:count]
+            del temp_files["centroids"], temp_files["list_offsets"]
+        np.save(temp_files["ids"], fact_ids)
+
+        metadata_file = self.get_index_file("metadata", "json")
+        with open(f"{metadata_file}.tmp", mode="w", encoding="utf-8") as file:
+            json.dump({"model_name": self.model_name, "count": count, "rows": rows, "nlist": nlist,
+                       "max_fact_id": int(fact_ids.max()), "built_at": self.utils.get_current_date_time()}, file)
+
+        # Searches keep using the snapshot of the previous build until load() publishes the new one
+        for name, temp_file in temp_files.items():
+            os.replace(temp_file, self.get_index_file(name))
+        os.replace(f"{metadata_file}.tmp", metadata_file)
+
+        self.load()
+        # Claims that missed the previous index may match the new one
+        self.db.invalidate_negative_results(FactCheckStages.SEMANTIC_INDEX)
+        self.logger.info(f"build: Semantic fact index built - {count} facts, nlist: {nlist}")
+        return count
+
+    def best_match(self, snapshot, query):
+        '''
+            (row, score) of the closest embedding of snapshot to the normalized query embedding
+        '''
+        embeddings, centroids, list_offsets = snapshot.embeddings, snapshot.centroids, snapshot.list_offsets
+        best_row = -1
+        best_score = -1.0
+        if centroids is not None:
+            partitions = np.argsort(centroids @ query)[::-1][:self.nprobe]
+            row_ranges = [(list_offsets[partition], list_offsets[partition + 1]) for partition in partitions]
+        else:
+            row_ranges = [(0, len(embeddings))]
+
+        for start, end in row_ranges:
+            if end <= start:
+                continue
+            scores = embeddings[start:end] @ query
+            row = int(np.argmax(scores))
+            if scores[row] > best_score:
+                best_score = float(scores[row])
+                best_row = start + row
+        return best_row, best_score
+
+    def search(self, claim, threshold=None):
+        '''
+            Closest fact to claim by cosine similarity, None if the index is not built or
+            the best match is below the similarity threshold.
+        '''
+        if not claim:
+            return None
+        return self.search_many([claim], threshold=threshold)[0]
+
+    def search_many(self, claims, threshold=None):
+        '''
+            search() for a list of claims, embedded in batches. Returns a list aligned with claims.
+        '''
+        matches = [None] * len(claims)
+        # One snapshot for the whole call, a rebuild may publish a new one meanwhile
+        snapshot = self.snapshot
+        if snapshot is None or not claims:
+            return matches
+        threshold = self.similarity_threshold if threshold is None else threshold
+        try:
+            fact_ids = snapshot.fact_ids
+            for batch_start in range(0, len(claims), self.embedding_batch_size):
+                batch = claims[batch_start:batch_start + self.embedding_batch_size]
+                queries = self.embed(batch)
+                for offset, (claim, query) in enumerate(zip(batch, queries)):
+                    best_row, best_score = self.best_match(snapshot, query)
+                    if best_row < 0 or best_score < threshold:
+                        continue
+                    fact = self.db.get_fact_by_id(int(fact_ids[best_row]))
+                    if fact is None:
+                        continue
+                    fact["score"] = round(best_score, 4)
+                    self.logger.info(f"search_many: '{claim}' matched fact {fact['id']} with similarity {fact['score']}")
+                    matches[batch_start + offset] = fact
+        except Exception as e:
+            self.logger.error(f"search_many: Error searching semantic fact index: {e}")
+        return matches
@@ -1,9 +1,10 @@
 # Import necessary libraries
 from source.services.lib.readProperties import PropertiesReader
-from source.services.lib.utils import Utils
+from source.services.lib.utils import Utils, ParallelizationTypes, ParallelizationNumbers, WorkerPool
 from source.services.lib.DB import Database
 from source.services.lib.Logger import Logger
 from source.services.NERStatementDerivation import NERStatementDerivation
+from concurrent.futures import BrokenExecutor
 
 # Configure logging
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -30,43 +31,75 @@ class StatementDerivation:
         else:
             self.utils = Utils(kwargs={"logger":self.logger, "properties":self.properties})
 
-        self.db = Database(kwargs={"logger":self.logger})
+        if 'db' in kwargs:
+            self.db = kwargs['db']
+        else:
+            self.db = Database(kwargs={"logger":self.logger, "properties":self.properties, "utils":self.utils})
         self.statement_derivation = NERStatementDerivation(kwargs={"properties":self.properties, "logger":self.logger})
 
+        # Long texts are split at sentence boundaries and derived on a shared worker pool,
+        # see NERStatementDerivation.get_shards for when a text is split
+        self.parallelization_type = self.properties.get_property("nlp", "statement_parallelization", ParallelizationTypes.MULTI_PROCESSING)
+        self.parallel_workers = self.properties.get_property_int("nlp", "statement_workers", min(ParallelizationNumbers.CPU_COUNT, ParallelizationNumbers.FOUR))
+
     def __str__(self):
         return f"{StatementDerivation.__name__}"
     
-    def get_factual_statements(self, text, source="all"):
+    def derive_spacy_statements(self, text):
+        n_process = self.parallel_workers if self.parallelization_type == ParallelizationTypes.MULTI_PROCESSING else 1
+        return self.statement_derivation.derive_spacy_statements(text, n_process=n_process)
+
+    def derive_nltk_statements(self, text):
+        """
+            NLTK statements of text, sharded on the worker pool when the text is long enough.
+            Falls back to the calling thread if the pool is broken (e.g. a worker was killed).
+        """
+        executor = WorkerPool.get_executor(self.parallelization_type, self.parallel_workers)
+        try:
+            return self.statement_derivation.derive_nltk_statements(text, executor=executor)
+        except BrokenExecutor as e:
+            self.logger.error(f"derive_nltk_statements: Worker pool failed, deriving in process: {e}")
+            WorkerPool.discard(executor)
+            return self.statement_derivation.derive_nltk_statements(text)
+
+    def get_factual_statements(self, text, source="all", transcript=None):
         """
         Extracts potential factual statements from a given text."
+        With the timestamped transcript of text, "timestamps" lists the start and end (seconds)
+        of the segments each statement came from.
         """
         spacy_statements = None
         nltk_statements = None
         factual_statements = None
 
-        self.logger.info(f"get_factual_statements: Getting factual statements from {text} using {source}")
+        self.logger.info("get_factual_statements: Getting factual statements from text of %d chars using %s", len(text or ""), source)
+        self.logger.debug("get_factual_statements: Text: %s", text)
         if source == "spacy":
-            spacy_statements = self.statement_derivation.derive_spacy_statements(text)
+            spacy_statements = self.derive_spacy_statements(text)
         elif source == "nltk":
-            nltk_statements = self.statement_derivation.derive_nltk_statements(text)
+            nltk_statements = self.derive_nltk_statements(text)
         else:
             try:
-                spacy_statements = self.statement_derivation.derive_spacy_statements(text)
+                spacy_statements = self.derive_spacy_statements(text)
             except Exception as e:
                 self.logger.error(f"Error in Spacy: {e}")
             
             # for testing
             # if not spacy_statements:
             try:
-                nltk_statements = self.statement_derivation.derive_nltk_statements(text)
+                nltk_statements = self.derive_nltk_statements(text)
             except Exception as e:
                 self.logger.error(f"Error in NLTK: {e}")
 
-            self.logger.info(f"get_factual_statements: Spacy Statements: {spacy_statements} \nNLTK Statements: {nltk_statements}")
+            self.logger.debug("get_factual_statements: Spacy Statements: %s \nNLTK Statements: %s", spacy_statements, nltk_statements)
             # if spacy_statements:
             #     factual_statements = spacy_statements
             # elif nltk_statements:
             #     factual_statements = nltk_statements
 
         # return factual_statements
-        return {"spacy": spacy_statements, "nltk": nltk_statements}
\ No newline at end of file
+        factual_statements = {"spacy": spacy_statements, "nltk": nltk_statements}
+        if transcript is not None and transcript.has_timing():
+            factual_statements["timestamps"] = {name: transcript.locate_statements(statements)
+                                                for name, statements in factual_statements.items() if statements}
+        return factual_statements
\ No newline at end of file
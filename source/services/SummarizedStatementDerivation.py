@@ -2,14 +2,16 @@
 from source.services.lib.readProperties import PropertiesReader
 from source.services.lib.DB import Database
 from source.services.lib.Logger import Logger 
+from source.services.lib.ModelRegistry import ModelRegistry
 from source.services.lib.utils import Utils, SummarizationTypes, AvailableModels, ReturnTensorTypes, ParallelizationNumbers, TokenizationType, summarySelectedSize
+from source.services.lib.LazyImport import lazy_import
 import multiprocessing
-from transformers import pipeline
 # from transformers.pipelines.pt_utils import KeyDataset
 # import datasets
 
-import torch 
-from transformers import AutoTokenizer, AutoModelWithLMHead, AutoModelForSeq2SeqLM, PegasusForConditionalGeneration, PegasusTokenizer, BartTokenizer, AutoModelForCausalLM
+# Heavy packages are imported on first use
+torch = lazy_import("torch")
+transformers = lazy_import("transformers")
 
 # Configure logging
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -36,13 +38,26 @@ class SummarizedStatementDerivation:
         else:
             self.utils = Utils(kwargs={"logger":self.logger, "properties":self.properties})
 
-        self.db = Database(kwargs={"logger":self.logger})
+        if 'db' in kwargs:
+            self.db = kwargs['db']
+        else:
+            self.db = Database(kwargs={"logger":self.logger, "properties":self.properties, "utils":self.utils})
         
         # model_max_length is in token space not character space – len(text) != len(tokenizer(text))
         # tokenizer.model_max_length
         # T5 a priori, since its max input length is 512, while Bart and Pegasus can be fed with max 1024 tokens.
         self.max_tokenizer_length = 1024  # tokenizer.model_max_length
         self.max_paraphrase_tokenizer_length = 60
+        # map-reduce summarization - generated summary length bounds (tokens) for each chunk
+        # and rough characters per token to turn summarySelectedSize into a token budget
+        self.min_summary_tokens = 30
+        self.max_summary_tokens = 300
+        self.chars_per_token = 4
+        self.max_reduce_levels = 4
+        # tokens of the previous chunk repeated at the start of the next one, for context across chunk boundaries
+        self.chunk_overlap_tokens = self.properties.get_property_int("models", "chunk_overlap_tokens", 0)
+        # number of token chunks passed to a single generate() call
+        self.generation_batch_size = self.properties.get_property_int("models", "generation_batch_size", 4)
         if torch.cuda.is_available():
             self.device = 'cuda'
             self.logger.info("CUDA is available. Using GPU for Transformers TTS.")
@@ -55,24 +70,46 @@ class SummarizedStatementDerivation:
         self.model_name = AvailableModels.FACEBOOK_LARGECNN
         self.paraphrase_model_name = AvailableModels.PEGASUS_PARAPHRASE
 
+        # Models are loaded once per process and shared through the registry
+        memory_budget_mb = self.properties.get_property_int("models", "memory_budget_mb")
+        if memory_budget_mb:
+            ModelRegistry.set_memory_budget(memory_budget_mb)
+
     def __str__(self):
         return f"{SummarizedStatementDerivation.__name__}"
     
+    def generate_batches(self, model, inputs_padded_batches, **generate_kwargs):
+        '''
+            Run model.generate on each padded batch (output of Utils.batch_tokenization)
+            and return one 2-D tensor of generated ids per input chunk, in chunk order.
+        '''
+        summary_id_list = []
+        with torch.inference_mode():
+            for inputs_batch in inputs_padded_batches:
+                summary_ids = model.generate(input_ids=inputs_batch["input_ids"],
+                                             attention_mask=inputs_batch["attention_mask"],
+                                             **generate_kwargs)
+                summary_id_list.extend(torch.unsqueeze(summary_id, 0) for summary_id in summary_ids)
+        return summary_id_list
+
     def get_summarized_statements(self, text, summary_type=SummarizationTypes.ABSTRACTIVE_SUMMARY, parapharizing=False, selectedSize=summarySelectedSize.MEDIUM):
         """
         Extracts potential factual statements from a given text."
         """
         summarized_text = text
-        expected_size = summarySelectedSize.SUMMARY_SIZE_MAPPING[selectedSize]
+        expected_size = summarySelectedSize.SUMMARY_SIZE_MAPPING.get(selectedSize, summarySelectedSize.SUMMARY_SIZE_MAPPING[summarySelectedSize.MEDIUM])
         margin = summarySelectedSize.SUMMARY_SIZE_MAPPING[summarySelectedSize.MARGIN]
         max_iterations = 3
         self.logger.info(f"get_summarized_statements: expected size {selectedSize} - {expected_size}")
-        # Keep summarizing until it reaches desired length
-        iteration = 1
-        while (len(summarized_text) > expected_size + margin) and (iteration <= max_iterations):
-            iteration += 1
-            summarized_text = self.extractive_summarization(summarized_text) if summary_type == SummarizationTypes.EXTRACTIVE_SUMMARY \
-                else self.abstractive_summarization_abstract_tokens(summarized_text)
+        if summary_type == SummarizationTypes.EXTRACTIVE_SUMMARY:
+            # Keep summarizing until it reaches desired length
+            iteration = 1
+            while (len(summarized_text) > expected_size + margin) and (iteration <= max_iterations):
+                iteration += 1
+                summarized_text = self.extractive_summarization(summarized_text)
+        elif len(summarized_text) > expected_size + margin:
+            # Chunks are summarized once and only the chunk summaries are merged further
+            summarized_text = self.abstractive_summarization_map_reduce(summarized_text, expected_size)
         
         # abstractive_summarization_abstract_tokens abstractive_summarization_extract_tokens
         if parapharizing:
@@ -80,16 +117,97 @@ class SummarizedStatementDerivation:
         else:
             final_text = summarized_text
         
-        self.logger.info(f"get_summarized_statements: {len(final_text)}-{final_text}")
+        self.logger.info("get_summarized_statements: %d", len(final_text))
+        self.logger.debug("get_summarized_statements: %s", final_text)
         return final_text
     
+    def abstractive_summarization_map_reduce(self, text, expected_size):
+        """
+            Hierarchical (map-reduce) abstractive summary.
+            Map - pack whole sentences of the text into chunks of up to model_max_length tokens
+            (Utils.token_aware_tokenization) and summarize every chunk once (batched).
+            Reduce - pack the chunk summaries into model_max_length windows and summarize each
+            window, repeating only while the merged summary is longer than expected_size.
+            The target length is split across the chunks of each level to set max_length, so the
+            total work grows roughly linearly with the length of the text.
+        """
+        try:
+            self.logger.info(f"abstractive_summarization_map_reduce: Get summarized_text using {self.model_name} for Text: {len(text)}")
+            summarizer, tokenizer = ModelRegistry.get_model(self.model_name, transformers.AutoModelForSeq2SeqLM, transformers.AutoTokenizer, device=self.device)
+            target_tokens = max(self.min_summary_tokens, expected_size // self.chars_per_token)
+
+            # Map - whole sentences packed up to the model's token budget
+            chunks = [" ".join(sentences) for sentences in self.utils.token_aware_tokenization(text, tokenizer, self.max_tokenizer_length, self.chunk_overlap_tokens)]
+            chunk_count = len(chunks)
+            summaries = self.summarize_level(summarizer, tokenizer, self.batch_windows(tokenizer, chunks), chunk_count, target_tokens)
+            merged_summary = " ".join(summaries)
+            self.logger.info(f"abstractive_summarization_map_reduce: level 0 - chunks: {chunk_count}, summary: {len(merged_summary)}")
+
+            # Reduce
+            level = 1
+            while len(summaries) > 1 and len(merged_summary) > expected_size and level <= self.max_reduce_levels:
+                windows = self.pack_summaries(tokenizer, summaries)
+                summaries = self.summarize_level(summarizer, tokenizer, self.batch_windows(tokenizer, windows), len(windows), target_tokens)
+                merged_summary = " ".join(summaries)
+                self.logger.info(f"abstractive_summarization_map_reduce: level {level} - windows: {len(windows)}, summary: {len(merged_summary)}")
+                level += 1
+
+            return merged_summary
+
+        except Exception as e:
+            self.logger.error(f"abstractive_summarization_map_reduce: Error getting summarized_text: {e}")
+            return None
+
+    def batch_windows(self, tokenizer, windows):
+        '''
+            Tokenize text windows into padded batches of generation_batch_size rows, truncated to max_tokenizer_length.
+        '''
+        inputs_padded_batches = []
+        for batch_start in range(0, len(windows), self.generation_batch_size):
+            inputs_padded_batches.append(tokenizer(windows[batch_start:batch_start + self.generation_batch_size],
+                                                   return_tensors=self.tensor_return_type, padding=True,
+                                                   truncation=True, max_length=self.max_tokenizer_length).to(self.device))
+        return inputs_padded_batches
+
+    def summarize_level(self, summarizer, tokenizer, inputs_padded_batches, chunk_count, target_tokens):
+        '''
+            Summarize all chunks of one map-reduce level, sharing target_tokens across the chunks.
+        '''
+        max_length = min(self.max_summary_tokens, max(self.min_summary_tokens, -(-target_tokens // max(1, chunk_count))))
+        min_length = min(self.min_summary_tokens, max_length // 2)
+        summary_id_list = self.generate_batches(summarizer, inputs_padded_batches, num_beams=4, min_length=min_length,
+                                                max_length=max_length, early_stopping=False)
+        return [tokenizer.decode(summary_ids[0], skip_special_tokens=True, clean_up_tokenization_spaces=False).strip()
+                for summary_ids in summary_id_list]
+
+    def pack_summaries(self, tokenizer, summaries):
+        '''
+            Greedily pack consecutive summaries into windows that fit in max_tokenizer_length tokens.
+        '''
+        token_budget = self.max_tokenizer_length - tokenizer.num_special_tokens_to_add()
+        token_lengths = [len(input_ids) for input_ids in tokenizer(summaries, add_special_tokens=False)["input_ids"]]
+        windows = []
+        window = []
+        window_length = 0
+        for summary, token_length in zip(summaries, token_lengths):
+            if window and window_length + token_length > token_budget:
+                windows.append(" ".join(window))
+                window = []
+                window_length = 0
+            window.append(summary)
+            window_length += token_length
+        if window:
+            windows.append(" ".join(window))
+        return windows
+
     def extractive_summarization(self, text):
         """
             Get extractive summay text using the
             sumy, gensim, summa, bert-extractive-summarizer, etc.
         """
         try:
-            self.logger.info(f"extractive_summarization: Get summarized_text using AutoModelForCausalLM for Text: {len(text)}-{text}")
+            self.logger.info("extractive_summarization: Get summarized_text using AutoModelForCausalLM for Text: %d", len(text))
+            self.logger.debug("extractive_summarization: Get summarized_text using AutoModelForCausalLM for Text: %s", text)
         
             # gensim
             # Summarize based on Percentage
@@ -107,8 +225,7 @@ class SummarizedStatementDerivation:
             # removed in a future version. Please use `AutoModelForCausalLM` for causal 
             # language models, `AutoModelForMaskedLM` for masked language models and 
             # `AutoModelForSeq2SeqLM` for encoder-decoder models.
-            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            model = AutoModelForCausalLM.from_pretrained(self.model_name, return_dict=True)
+            model, tokenizer = ModelRegistry.get_model(self.model_name, transformers.AutoModelForCausalLM, transformers.AutoTokenizer, device=self.device, return_dict=True)
 
             # successive abstractive summarisation - Divide the text into max allowed length, 
             # do summary on each part and then again use it to summarise till the length you want. 
@@ -118,12 +235,11 @@ class SummarizedStatementDerivation:
             inputs = tokenizer.encode("summarize: " + text,
                                     return_tensors=self.tensor_return_type,
                                     max_length=512,
-                                    truncation=True)
+                                    truncation=True).to(self.device)
 
             summary_ids = model.generate(inputs, max_length=150, min_length=80, length_penalty=5., num_beams=2)  
             summarized_text = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-            self.logger.info("Sentence summary")
-            self.logger.info(summarized_text)
+            self.logger.debug("Sentence summary: %s", summarized_text)
             
             return summarized_text
         except Exception as e:
@@ -138,11 +254,11 @@ class SummarizedStatementDerivation:
             i.e. divide the token list from huge text into model_max_length array of tokens
         """
         try:
-            self.logger.info(f"abstractive_summarization_abstract_tokens: Get summarized_text using {self.model_name} for Text: {len(text)}-{text}")
+            self.logger.info("abstractive_summarization_abstract_tokens: Get summarized_text using %s for Text: %d", self.model_name, len(text))
+            self.logger.debug("abstractive_summarization_abstract_tokens: Text: %s", text)
         
             # Load the model and tokenizer
-            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            summarizer = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+            summarizer, tokenizer = ModelRegistry.get_model(self.model_name, transformers.AutoModelForSeq2SeqLM, transformers.AutoTokenizer, device=self.device)
             # summarizer = pipeline("summarization", model=self.model_name, tokenizer=tokenizer, truncation=True, device=self.device)
             # , max_length=1024
 
@@ -161,14 +277,16 @@ class SummarizedStatementDerivation:
             # Tokenize the text, output will be a tensor format
             inputs = tokenizer([text], return_tensors=self.tensor_return_type).to(self.device) # , truncation=True
             # max_length=self.max_tokenizer_length, use_fast = 'False'
-            self.logger.info(f"abstractive_summarization_abstract_tokens: Inputs: {len(inputs['input_ids'][0])}-{inputs}")
+            self.logger.info("abstractive_summarization_abstract_tokens: Inputs: %d", len(inputs['input_ids'][0]))
+            self.logger.debug("abstractive_summarization_abstract_tokens: Inputs: %s", inputs)
             # error with max_length=4096 IndexError: index out of range in self
             # inputs['input_ids'] -> 2-D tensor
             # inputs['input_ids'][0] -> 1-D tensor
 
             # Generate list of tokens based on max model length
             inputs_batch_list = self.utils.parallel_tokenization(parallelize="N", tokenization_type=TokenizationType.ABSTRACTIVE_TOKENIZATION, tokenizer_input_text=inputs['input_ids'], max_tokenizer_length=self.max_tokenizer_length)
-            self.logger.info(f"abstractive_summarization_abstract_tokens: inputs_batch_list: {len(inputs_batch_list)}-{inputs_batch_list}")
+            self.logger.info("abstractive_summarization_abstract_tokens: inputs_batch_list: %d", len(inputs_batch_list))
+            self.logger.debug("abstractive_summarization_abstract_tokens: inputs_batch_list: %s", inputs_batch_list)
             # inputs_batch_list -> an Array of 2-D tensor
             # input -> 2-D tensor
             # input[0] -> 1-D tensor
@@ -179,10 +297,12 @@ class SummarizedStatementDerivation:
             # Generate Summary, output will be a tensor format
             # took aprox 3 minutes for inputs size - 2805 , Text size - 10974
             # took aprox 1.5 minutes for inputs size - 4128 , Text size - 17646
-            summary_id_list = [summarizer.generate(input, num_beams=4, min_length=30, max_length=300, early_stopping=False).to(self.device) for input in inputs_batch_list]
-            # summary_id_list -> an Array of 2-D tensor
+            # Chunks are padded into batches of generation_batch_size and generated together
+            inputs_padded_batches = self.utils.batch_tokenization(inputs_batch_list, tokenizer.pad_token_id, self.generation_batch_size)
+            summary_id_list = self.generate_batches(summarizer, inputs_padded_batches, num_beams=4, min_length=30, max_length=300, early_stopping=False)
+            # summary_id_list -> an Array of 2-D tensor, one row per chunk
             # summary_id -> 2-D tensor
-            self.logger.debug(f"abstractive_summarization_abstract_tokens: summary_id_list: {len(summary_id_list)}-{summary_id_list}")
+            self.logger.debug("abstractive_summarization_abstract_tokens: summary_id_list: %d-%s", len(summary_id_list), summary_id_list)
             # TODO - Remove after testing. This is added for debugging purpose
             # for summary_id in summary_id_list:
             #     self.logger.debug(f"abstractive_summarization_abstract_tokens: summary_id: {len(summary_id[0])}-{summary_id}")
@@ -192,7 +312,7 @@ class SummarizedStatementDerivation:
 
             # Decode Summarized text for each summary
             summarized_text = [[tokenizer.decode(g, skip_special_tokens=True, clean_up_tokenization_spaces=False) for g in summary_ids] for summary_ids in summary_id_list]
-            self.logger.debug(f"abstractive_summarization_abstract_tokens summarized_text: {len(summarized_text)}-{summarized_text}")
+            self.logger.debug("abstractive_summarization_abstract_tokens summarized_text: %d-%s", len(summarized_text), summarized_text)
             
             final_summary = ""
             for text in summarized_text:
@@ -202,7 +322,8 @@ class SummarizedStatementDerivation:
             # self.logger.info(f"abstractive_summarization: Summarized Text: {summarized_text}")
             # final_summary = summarized_text[0]['summary_text']
 
-            self.logger.info(f"abstractive_summarization_abstract_tokens: final_summary: {len(final_summary)}-{final_summary}")
+            self.logger.info("abstractive_summarization_abstract_tokens: final_summary: %d", len(final_summary))
+            self.logger.debug("abstractive_summarization_abstract_tokens: final_summary: %s", final_summary)
             return final_summary
 
         except Exception as e:
@@ -217,29 +338,32 @@ class SummarizedStatementDerivation:
             which will not be same as the length of text
         """
         try:
-            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            summarizer = pipeline("summarization", model=self.model_name, tokenizer=tokenizer, device=self.device)
+            summarizer, tokenizer = ModelRegistry.get_model(self.model_name, transformers.AutoModelForSeq2SeqLM, transformers.AutoTokenizer, device=self.device)
+            # summarizer = pipeline("summarization", model=self.model_name, tokenizer=tokenizer, device=self.device)
                 # , max_length=1024 , truncation=True
 
             # sentence_toekn is not working properly on some of the scripts - https://www.youtube.com/watch?v=KipDBa4bTl8
             # each letter is becoming a sentence
-            sentences_list = self.utils.parallel_tokenization(parallelize="Y", tokenization_type=TokenizationType.EXTRACTIVE_TOKENIZATION, tokenizer_input_text=text, max_tokenizer_length=self.max_tokenizer_length)
-            self.logger.info(f"abstractive_summarization_extract_tokens: {len(sentences_list)}-{sentences_list}")
+            sentences_list = self.utils.token_aware_tokenization(text, tokenizer, self.max_tokenizer_length, self.chunk_overlap_tokens)
+            self.logger.info("abstractive_summarization_extract_tokens: %d", len(sentences_list))
+            self.logger.debug("abstractive_summarization_extract_tokens: %s", sentences_list)
             summaries = []
             for sentences in sentences_list:
-                input_tokenized = tokenizer.encode(' '.join(sentences), return_tensors=self.tensor_return_type) # , truncation=True
+                input_tokenized = tokenizer.encode(' '.join(sentences), return_tensors=self.tensor_return_type, truncation=True, max_length=self.max_tokenizer_length)
                 input_tokenized = input_tokenized.to(self.device)
-                summary_ids = summarizer.to(self.device).generate(input_tokenized,
+                summary_ids = summarizer.generate(input_tokenized,
                                                                 length_penalty=3.0,
                                                                 min_length=30,
                                                                 max_length=120)
                 summarized_text = [tokenizer.decode(g, skip_special_tokens=True, clean_up_tokenization_spaces=False) for g in summary_ids]
-                self.logger.info(f"abstractive_summarization_extract_tokens: {len(summarized_text)}-{summarized_text}")
+                self.logger.info("abstractive_summarization_extract_tokens: %d", len(summarized_text))
+                self.logger.debug("abstractive_summarization_extract_tokens: %s", summarized_text)
                 
                 summaries.append(summarized_text)
 
             final_summary = [sentence for sublist in summaries for sentence in sublist]
-            self.logger.info(f"abstractive_summarization_extract_tokens: {len(final_summary)}-{final_summary}")
+            self.logger.info("abstractive_summarization_extract_tokens: %d", len(final_summary))
+            self.logger.debug("abstractive_summarization_extract_tokens: %s", final_summary)
             return final_summary[0]
         except Exception as e:
             self.logger.error(f"abstractive_summarization_extract_tokens: Error getting summarized_text: {e}")
@@ -250,11 +374,11 @@ class SummarizedStatementDerivation:
             Paraphrase the text using the Hugging Face pipeline.
         """
         try:
-            self.logger.info(f"paraphrase_text: Get paraphrased using {self.paraphrase_model_name} for Text: {len(text)}-{text}")
+            self.logger.info("paraphrase_text: Get paraphrased using %s for Text: %d", self.paraphrase_model_name, len(text))
+            self.logger.debug("paraphrase_text: Text: %s", text)
         
             # Load the model and tokenizer
-            tokenizer = PegasusTokenizer.from_pretrained(self.paraphrase_model_name)
-            paraphraser = PegasusForConditionalGeneration.from_pretrained(self.paraphrase_model_name)
+            paraphraser, tokenizer = ModelRegistry.get_model(self.paraphrase_model_name, transformers.PegasusForConditionalGeneration, transformers.PegasusTokenizer, device=self.device)
 
             # Replace huge text with the text you want to summarize
             # pipe = pipeline("text2text-generation", model=summarizer, tokenizer=tokenizer, device=self.device)
@@ -269,15 +393,17 @@ class SummarizedStatementDerivation:
             # self.logger.info(f"abstractive_summarization_online: generated_text: {len(generated_text)}-{generated_text}")
         
             # Tokenize the text, output will be a tensor format
-            inputs = tokenizer([text], return_tensors=self.tensor_return_type) # max_length=self.max_tokenizer_length, 
-            self.logger.info(f"paraphrase_text: Inputs: {len(inputs['input_ids'][0])}-{inputs}")
+            inputs = tokenizer([text], return_tensors=self.tensor_return_type).to(self.device) # max_length=self.max_tokenizer_length, 
+            self.logger.info("paraphrase_text: Inputs: %d", len(inputs['input_ids'][0]))
+            self.logger.debug("paraphrase_text: Inputs: %s", inputs)
             # error with max_length=4096 IndexError: index out of range in self
             # inputs['input_ids'] -> 2-D tensor
             # inputs['input_ids'][0] -> 1-D tensor
             
             # Generate list of tokens based on max model length
             inputs_batch_list = self.utils.parallel_tokenization(parallelize="N", tokenization_type=TokenizationType.ABSTRACTIVE_TOKENIZATION, tokenizer_input_text=inputs['input_ids'], max_tokenizer_length=self.max_paraphrase_tokenizer_length)
-            self.logger.info(f"paraphrase_text: inputs_batch_list: {len(inputs_batch_list)}-{inputs_batch_list}")
+            self.logger.info("paraphrase_text: inputs_batch_list: %d", len(inputs_batch_list))
+            self.logger.debug("paraphrase_text: inputs_batch_list: %s", inputs_batch_list)
             # inputs_batch_list -> an Array of 2-D tensor
             # input -> 2-D tensor
             # input[0] -> 1-D tensor
@@ -286,10 +412,11 @@ class SummarizedStatementDerivation:
             #     self.logger.debug(f"paraphrase_text: Input: {len(input[0])}-{input}")
 
             # Generate Summary, output will be a tensor format
-            summary_id_list = [paraphraser.generate(input, num_beams=4, max_length=1000, early_stopping=False) for input in inputs_batch_list ]  #  argument after ** must be a mapping, not list
+            inputs_padded_batches = self.utils.batch_tokenization(inputs_batch_list, tokenizer.pad_token_id, self.generation_batch_size)
+            summary_id_list = self.generate_batches(paraphraser, inputs_padded_batches, num_beams=4, max_length=1000, early_stopping=False)
             # summary_id_list -> an Array of 2-D tensor
             # summary_id -> 2-D tensor
-            self.logger.debug(f"paraphrase_text: summary_id_list: {len(summary_id_list)}-{summary_id_list}")
+            self.logger.debug("paraphrase_text: summary_id_list: %d-%s", len(summary_id_list), summary_id_list)
             # TODO - Remove after testing. This is added for debugging purpose
             # for summary_id in summary_id_list:
             #     self.logger.debug(f"paraphrase_text: summary_id: {len(summary_id[0])}-{summary_id}")
@@ -299,7 +426,7 @@ class SummarizedStatementDerivation:
 
             # Decode Summarized text for each summary
             summarized_text = [[tokenizer.decode(g, skip_special_tokens=True, clean_up_tokenization_spaces=False) for g in summary_ids] for summary_ids in summary_id_list]
-            self.logger.debug(f"paraphrase_text summarized_text: {len(summarized_text)}-{summarized_text}")
+            self.logger.debug("paraphrase_text summarized_text: %d-%s", len(summarized_text), summarized_text)
             
             final_summary = ""
             for text in summarized_text:
@@ -309,7 +436,8 @@ class SummarizedStatementDerivation:
             # self.logger.info(f"abstractive_summarization: Summarized Text: {summarized_text}")
             # final_summary = summarized_text[0]['summary_text']
 
-            self.logger.info(f"paraphrase_text: final_summary: {len(final_summary)}-{final_summary}")
+            self.logger.info("paraphrase_text: final_summary: %d", len(final_summary))
+            self.logger.debug("paraphrase_text: final_summary: %s", final_summary)
             return final_summary
 
         except Exception as e:
@@ -2,13 +2,14 @@
 from source.services.lib.readProperties import PropertiesReader
 from source.services.lib.DB import Database
 from source.services.lib.Logger import Logger 
+from source.services.lib.ModelRegistry import ModelRegistry
 from source.services.lib.utils import Utils, TokenizationType, AvailableModels, ReturnTensorTypes, AvailableLanguages, TextToAudioSources, SpeechSynthesizers, AvailableCountryCodes
-from transformers import pipeline
-import torch
+from source.services.lib.LazyImport import lazy_import
 import os
 import multiprocessing
 
-from playsound import playsound
+# Heavy packages are imported on first use
+torch = lazy_import("torch")
 
 
 # Configure logging
@@ -37,7 +38,10 @@ class TextToAudio:
             self.utils = Utils(kwargs={"logger":self.logger, "properties":self.properties})
 
 
-        self.db = Database(kwargs={"logger":self.logger})
+        if 'db' in kwargs:
+            self.db = kwargs['db']
+        else:
+            self.db = Database(kwargs={"logger":self.logger, "properties":self.properties, "utils":self.utils})
 
         # model_max_length is in token space not character space – len(text) != len(tokenizer(text))
         # tokenizer.model_max_length
@@ -152,7 +156,8 @@ class TextToAudio:
         try:
             import gtts
 
-            self.logger.info(f"getAudioGtts: Getting audio from {text} using gtts in {language}")
+            self.logger.info("getAudioGtts: Getting audio from %d chars using gtts in %s", len(text), language)
+            self.logger.debug("getAudioGtts: Text: %s", text)
             tts = gtts.gTTS(text, lang=language)
             # self.logger.info(f"getAudioGtts: Languages: {len(gtts.lang.tts_langs())}")
 
@@ -186,7 +191,8 @@ class TextToAudio:
         try:
             import pyttsx3
             import platform
-            self.logger.info(f"getAudioPyttsx3: Getting audio from {text} using pyttsx3 in {language}")
+            self.logger.info("getAudioPyttsx3: Getting audio from %d chars using pyttsx3 in %s", len(text), language)
+            self.logger.debug("getAudioPyttsx3: Text: %s", text)
 
             # 'Windows' for Windows.
             # 'Linux' for Linux.
@@ -289,7 +295,8 @@ class TextToAudio:
             to do tensor procesing and in that process it will loose some of the text too
         """
         try:
-            self.logger.info(f"getAudioTramsformers: Getting audio from {text} using transformers in {language}")
+            self.logger.info("getAudioTramsformers: Getting audio from %d chars using transformers in %s", len(text), language)
+            self.logger.debug("getAudioTramsformers: Text: %s", text)
 
             from transformers import SpeechT5Processor, SpeechT5ForTextToSpeech, SpeechT5HifiGan
             from datasets import load_dataset
@@ -297,22 +304,21 @@ class TextToAudio:
             import string
             import soundfile as sf
 
-            # load the processor
-            processor = SpeechT5Processor.from_pretrained(self.model_name)
-
-            # load the model
-            model = SpeechT5ForTextToSpeech.from_pretrained(self.model_name).to(self.device)
+            # load the model and processor (once per process)
+            model, processor = ModelRegistry.get_model(self.model_name, SpeechT5ForTextToSpeech, SpeechT5Processor, device=self.device)
 
             # load the vocoder, that is the voice encoder
-            vocoder = SpeechT5HifiGan.from_pretrained(self.vocoder).to(self.device)
+            vocoder, _ = ModelRegistry.get_model(self.vocoder, SpeechT5HifiGan, device=self.device)
 
             # we load this dataset to get the speaker embeddings
-            embeddings_dataset = load_dataset(self.speaker_datasets, split="validation")
+            embeddings_dataset, _ = ModelRegistry.get_or_load(("dataset", self.speaker_datasets, "validation"),
+                                                              lambda: (load_dataset(self.speaker_datasets, split="validation"), None))
             self.logger.info(f"getAudioTramsformers: Embeddings dataset: {embeddings_dataset}")
 
             # preprocess text
             inputs = processor(text=text, return_tensors=self.tensor_return_type).to(self.device)
-            self.logger.info(f"abstractive_summarization_abstract_tokens: Inputs: {len(inputs['input_ids'][0])}-{inputs}")
+            self.logger.info("getAudioTramsformers: Inputs: %d tokens", len(inputs['input_ids'][0]))
+            self.logger.debug("getAudioTramsformers: Inputs: %s", inputs)
             
             # Generate list of tokens based on max model length
             inputs_batch_list = self.utils.parallel_tokenization(parallelize="N", tokenization_type=TokenizationType.ABSTRACTIVE_TOKENIZATION, tokenizer_input_text=inputs['input_ids'],
@@ -3,16 +3,19 @@ from source.services.lib.readProperties import PropertiesReader
 from source.services.lib.DB import Database
 from source.services.lib.Logger import Logger 
 from source.services.lib.utils import Utils
+from source.services.lib.LazyImport import lazy_import
 
-from pytube import YouTube
-from pytube import exceptions as pytube_exceptions
 import urllib.error
 
 
 import os
 # from __future__ import unicode_literals
 # import youtube_dl
-import yt_dlp
+
+# Heavy packages are imported on first use
+pytube = lazy_import("pytube")
+pytube_exceptions = lazy_import("pytube.exceptions")
+yt_dlp = lazy_import("yt_dlp")
 
 # Configure logging
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -38,7 +41,10 @@ class YouTubeDownloader:
         else:
             self.utils = Utils(kwargs={"logger":self.logger, "properties":self.properties})
 
-        self.db = Database(kwargs={"logger":self.logger})
+        if 'db' in kwargs:
+            self.db = kwargs['db']
+        else:
+            self.db = Database(kwargs={"logger":self.logger, "properties":self.properties, "utils":self.utils})
         self.download_directory = self.properties.get_property("folders", "audio_directory")
         if not self.download_directory:
             self.download_directory = os.path.join(os.getcwd(), 'audioFilesDirectory')
@@ -60,7 +66,7 @@ class YouTubeDownloader:
             self.logger.info(f"\n+++++++++++++++++++++++++++++++++++++++++++++++++++++++\n"
                             f"download_youtube_audio_pytube: output_dir - {output_dir}"
                             f"\n+++++++++++++++++++++++++++++++++++++++++++++++++++++++\n")
-            yt = YouTube(video_url)
+            yt = pytube.YouTube(video_url)
 
             if video_id is None:
                 video_id = video_url.split("=")[-1]
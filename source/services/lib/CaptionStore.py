@@ -0,0 +1,290 @@
+from source.services.lib.readProperties import PropertiesReader
+from source.services.lib.DB import Database
+from source.services.lib.Logger import Logger
+from source.services.lib.LazyImport import lazy_import
+from source.services.lib.Transcript import Transcript
+from source.services.lib.utils import Utils
+import importlib.util
+import hashlib
+import os
+import tempfile
+import time
+import zlib
+
+# Optional dependency, only needed with [captions] compression = zstd
+zstandard = lazy_import("zstandard")
+
+class CaptionCompression():
+    """
+    Possible values for the caption blob compression
+    """
+    NONE = "none"
+    ZLIB = "zlib"
+    ZSTD = "zstd"
+
+class CaptionStore:
+    """
+        Content addressed store for caption texts.
+
+        Each text is written once as a blob named after its sha256, in sharded directories
+        (<captions_directory>/store/ab/cd/<hash>.<ext>), optionally compressed with zstd or zlib.
+        The caption_index table maps a caption id (video id, audio id, url hash) to its blob,
+        with the text length, source, language and fetch time, so lookups never scan or probe
+        the captions directory. Captions with the same text share one blob. The segment timing
+        of a timestamped transcript is kept in the index row (put_transcript / get_transcript).
+    """
+    EXTENSIONS = {CaptionCompression.NONE: ".txt", CaptionCompression.ZLIB: ".zz", CaptionCompression.ZSTD: ".zst"}
+    LEGACY_SOURCE = "legacy"
+
+    def __init__(self, kwargs=None):
+        if 'logger' in kwargs:
+            self.logger = kwargs['logger']
+        else:
+            self.loging = Logger()
+            self.logger = self.loging.get_logger()
+
+        if 'properties' in kwargs:
+            self.properties = kwargs['properties']
+        else:
+            self.properties = PropertiesReader(kwargs={"logger":self.logger})
+
+        if 'utils' in kwargs:
+            self.utils = kwargs['utils']
+        else:
+            self.utils = Utils(kwargs={"logger":self.logger, "properties":self.properties})
+
+        if 'db' in kwargs:
+            self.db = kwargs['db']
+        else:
+            self.db = Database(kwargs={"logger":self.logger, "properties":self.properties, "utils":self.utils})
+
+        self.captions_directory = self.properties.get_property("folders", "captions_directory")
+        if not self.captions_directory:
+            self.captions_directory = os.path.join(os.getcwd(), 'captionsDirectory')
+        self.store_directory = self.properties.get_property("captions", "store_directory")
+        if not self.store_directory:
+            self.store_directory = os.path.join(self.captions_directory, 'store')
+        os.makedirs(self.store_directory, exist_ok=True)
+
+        self.compression = self.properties.get_property("captions", "compression", CaptionCompression.NONE).lower()
+        if self.compression not in CaptionStore.EXTENSIONS:
+            self.logger.warning(f"CaptionStore: Unknown compression {self.compression}, storing uncompressed")
+            self.compression = CaptionCompression.NONE
+        if self.compression == CaptionCompression.ZSTD and importlib.util.find_spec("zstandard") is None:
+            self.logger.warning("CaptionStore: zstandard is not installed, compressing with zlib instead")
+            self.compression = CaptionCompression.ZLIB
+        self.compression_level = self.properties.get_property_int("captions", "compression_level", 3)
+        # Read <captions_directory>/<id>.txt files written before the store and import them on first use
+        self.legacy_fallback = str(self.properties.get_property("captions", "legacy_fallback", "true")).lower() == "true"
+
+    def __str__(self):
+        return f"{CaptionStore.__name__}"
+
+    def get_blob_path(self, content_hash, compression):
+        return os.path.join(self.store_directory, content_hash[:2], content_hash[2:4],
+                            f"{content_hash}{CaptionStore.EXTENSIONS[compression]}")
+
+    def get_legacy_path(self, caption_id):
+        return os.path.join(self.captions_directory, f"{caption_id}.txt")
+
+    def compress(self, data, compression):
+        if compression == CaptionCompression.ZSTD:
+            return zstandard.ZstdCompressor(level=self.compression_level).compress(data)
+        if compression == CaptionCompression.ZLIB:
+            return zlib.compress(data, min(max(self.compression_level, 0), 9))
+        return data
+
+    def decompress(self, data, compression):
+        if compression == CaptionCompression.ZSTD:
+            return zstandard.ZstdDecompressor().decompress(data)
+        if compression == CaptionCompression.ZLIB:
+            return zlib.decompress(data)
+        return data
+
+    def write_blob(self, text):
+        '''
+            Write text as a content addressed blob, unless the same text is already stored.
+            Returns (content_hash, compression, length, stored_length).
+        '''
+        data = text.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        blob_path = self.get_blob_path(content_hash, self.compression)
+        if os.path.exists(blob_path):
+            return content_hash, self.compression, len(data), os.path.getsize(blob_path)
+
+        stored = self.compress(data, self.compression)
+        blob_directory = os.path.dirname(blob_path)
+        os.makedirs(blob_directory, exist_ok=True)
+        # Write to a temporary file and rename, readers never see a partial blob
+        file_descriptor, temp_path = tempfile.mkstemp(dir=blob_directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as blob_file:
+                blob_file.write(stored)
+            os.replace(temp_path, blob_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return content_hash, self.compression, len(data), len(stored)
+
+    def read_blob(self, content_hash, compression):
+        with open(self.get_blob_path(content_hash, compression), "rb") as blob_file:
+            return self.decompress(blob_file.read(), compression).decode("utf-8")
+
+    def remove_blob_if_unused(self, content_hash, compression):
+        if self.db.count_caption_references(content_hash, compression) == 0:
+            try:
+                os.remove(self.get_blob_path(content_hash, compression))
+            except FileNotFoundError:
+                pass
+
+    def get(self, caption_id):
+        '''
+            Caption text of caption_id, or None if it is not stored
+        '''
+        try:
+            entry = self.db.get_caption_entry(caption_id)
+            if entry is None:
+                return self.import_legacy_file(caption_id) if self.legacy_fallback else None
+            try:
+                return self.read_blob(entry["content_hash"], entry["compression"])
+            except FileNotFoundError:
+                self.logger.warning(f"get: Blob of caption {caption_id} is missing, dropping the index entry")
+                self.db.delete_caption_entry(caption_id)
+                return None
+        except Exception as e:
+            self.logger.error(f"get: Error reading caption {caption_id}: {e}")
+            return None
+
+    def get_entry(self, caption_id):
+        '''
+            Index entry of caption_id (hash, compression, lengths, source, language, fetched_at), or None
+        '''
+        return self.db.get_caption_entry(caption_id)
+
+    def exists(self, caption_id):
+        return self.db.get_caption_entry(caption_id) is not None
+
+    def get_transcript(self, caption_id):
+        '''
+            Transcript of caption_id with its segment timing if it was stored with one, or None
+        '''
+        text = self.get(caption_id)
+        if text is None:
+            return None
+        try:
+            return Transcript.from_timing_bytes(text, self.db.get_caption_timing(caption_id))
+        except Exception as e:
+            self.logger.error(f"get_transcript: Error reading the timing of caption {caption_id}: {e}")
+            return Transcript.from_text(text)
+
+    def put_transcript(self, caption_id, transcript, source=None, language=None, fetched_at=None):
+        '''
+            Store the text and segment timing of transcript as the caption of caption_id
+        '''
+        return self.put(caption_id, transcript.text, source=source, language=language, fetched_at=fetched_at,
+                        timing=transcript.to_timing_bytes())
+
+    def put(self, caption_id, text, source=None, language=None, fetched_at=None, timing=None):
+        '''
+            Store text as the caption of caption_id, replacing the previous caption.
+            Returns True if the caption was saved.
+        '''
+        try:
+            previous = self.db.get_caption_entry(caption_id)
+            content_hash, compression, length, stored_length = self.write_blob(text)
+            self.db.put_caption_entries([(caption_id, content_hash, compression, length, stored_length,
+                                          source, language, fetched_at if fetched_at is not None else time.time(), timing)])
+            if previous and (previous["content_hash"], previous["compression"]) != (content_hash, compression):
+                self.remove_blob_if_unused(previous["content_hash"], previous["compression"])
+            return True
+        except Exception as e:
+            self.logger.error(f"put: Error saving caption {caption_id}: {e}")
+            return False
+
+    def delete(self, caption_id):
+        '''
+            Remove caption_id, and its blob when no other caption shares it
+        '''
+        entry = self.db.get_caption_entry(caption_id)
+        if entry is None:
+            return False
+        self.db.delete_caption_entry(caption_id)
+        self.remove_blob_if_unused(entry["content_hash"], entry["compression"])
+        return True
+
+    def stats(self):
+        stats = self.db.get_caption_stats()
+        stats["compression"] = self.compression
+        stats["store_directory"] = self.store_directory
+        return stats
+
+    def import_legacy_file(self, caption_id):
+        '''
+            Import <captions_directory>/<caption_id>.txt into the store, returns its text or None
+        '''
+        legacy_path = self.get_legacy_path(caption_id)
+        try:
+            with open(legacy_path, mode="r", encoding="utf-8") as legacy_file:
+                text = legacy_file.read()
+        except FileNotFoundError:
+            return None
+        self.put(caption_id, text, source=CaptionStore.LEGACY_SOURCE, fetched_at=os.path.getmtime(legacy_path))
+        return text
+
+    def migrate_legacy_files(self, remove=False, batch_size=1000):
+        '''
+            Import every <id>.txt file of the captions directory that is not indexed yet.
+            Index rows are written batch_size files per transaction. With remove=True the
+            .txt files are deleted once indexed.
+            Returns {"files", "imported", "skipped", "failed", "text_bytes", "stored_bytes", "seconds"}
+        '''
+        start_time = time.perf_counter()
+        stats = {"files": 0, "imported": 0, "skipped": 0, "failed": 0, "text_bytes": 0, "stored_bytes": 0}
+
+        def flush(batch):
+            if not batch:
+                return
+            indexed = self.db.get_caption_ids([caption_id for caption_id, _ in batch])
+            rows = []
+            imported_paths = []
+            for caption_id, legacy_path in batch:
+                if caption_id in indexed:
+                    # Cached again since the store was introduced, the indexed caption is newer
+                    stats["skipped"] += 1
+                    imported_paths.append(legacy_path)
+                    continue
+                try:
+                    with open(legacy_path, mode="r", encoding="utf-8") as legacy_file:
+                        text = legacy_file.read()
+                    content_hash, compression, length, stored_length = self.write_blob(text)
+                except Exception as e:
+                    self.logger.error(f"migrate_legacy_files: Error importing {legacy_path}: {e}")
+                    stats["failed"] += 1
+                    continue
+                rows.append((caption_id, content_hash, compression, length, stored_length,
+                             CaptionStore.LEGACY_SOURCE, None, os.path.getmtime(legacy_path), None))
+                imported_paths.append(legacy_path)
+                stats["imported"] += 1
+                stats["text_bytes"] += length
+                stats["stored_bytes"] += stored_length
+            self.db.put_caption_entries(rows)
+            if remove:
+                for legacy_path in imported_paths:
+                    os.remove(legacy_path)
+
+        batch = []
+        with os.scandir(self.captions_directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.endswith(".txt"):
+                    continue
+                stats["files"] += 1
+                batch.append((entry.name[:-len(".txt")], entry.path))
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+        flush(batch)
+
+        stats["seconds"] = round(time.perf_counter() - start_time, 3)
+        self.logger.info(f"migrate_legacy_files: {stats}")
+        return stats
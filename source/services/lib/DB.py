@@ -1,13 +1,140 @@
-from .utils import Utils
+from .utils import Utils, FactCheckStages
 from source.services.lib.readProperties import PropertiesReader
 from source.services.lib.Logger import Logger
+from source.services.lib.LRUCache import LRUCache
 import sqlite3
 import hashlib
+import os
+import csv
+import json
+import time
+import queue
+import threading
+from contextlib import contextmanager
 # import logging
 from flask import jsonify
 from flask_bcrypt import Bcrypt
 
+class ConnectionPool:
+    """
+        Thread-safe pool of SQLite connections for one database file.
+
+        Connections are opened lazily up to pool_size, use WAL journaling and a busy timeout,
+        and are kept open so sqlite3's per-connection statement cache is reused across queries.
+        Pools are shared per (database file, process) so every Database instance uses the same one.
+    """
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, db_path, pool_size=8, busy_timeout_ms=5000, cached_statements=128):
+        self.db_path = db_path
+        self.pool_size = max(1, pool_size)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._connections = queue.LifoQueue(maxsize=self.pool_size)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"{ConnectionPool.__name__}"
+
+    @staticmethod
+    def get_pool(db_path, pool_size=8, busy_timeout_ms=5000, cached_statements=128):
+        # Connections must not cross a fork, so the pool is keyed on the process id too
+        key = (os.path.abspath(db_path), os.getpid())
+        with ConnectionPool._pools_lock:
+            if key not in ConnectionPool._pools:
+                ConnectionPool._pools[key] = ConnectionPool(db_path, pool_size, busy_timeout_ms, cached_statements)
+            return ConnectionPool._pools[key]
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path,
+                               timeout=self.busy_timeout_ms / 1000,
+                               check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def acquire(self):
+        try:
+            return self._connections.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.pool_size
+            if can_create:
+                self._created += 1
+
+        if can_create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        # Pool exhausted - wait for a connection to be released
+        try:
+            return self._connections.get(timeout=self.busy_timeout_ms / 1000)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"ConnectionPool: no connection available for {self.db_path} "
+                                           f"after {self.busy_timeout_ms} ms")
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._connections.put_nowait(conn)
+        except Exception:
+            # Broken connection or pool already full - drop it
+            with self._lock:
+                self._created -= 1
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._connections.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+            conn.close()
+
 class Database:
+    # Host parameters per statement for IN (...) lookups, below SQLite's default limit of 999
+    MAX_QUERY_PARAMETERS = 900
+
+    # Versioned schema migrations, applied in order and tracked with PRAGMA user_version
+    # (version, method name)
+    MIGRATIONS = [
+        (1, "migration_001_create_tables"),
+        (2, "migration_002_dedupe_sample_facts"),
+        (3, "migration_003_normalized_claims"),
+        (4, "migration_004_cache_expiry"),
+        (5, "migration_005_negative_cache"),
+        (6, "migration_006_caption_index"),
+        (7, "migration_007_caption_timing"),
+    ]
+
+    # Database files already migrated by this process
+    _migrated = set()
+    _migrate_lock = threading.Lock()
+
+    # Claim cache counters per database file, shared by every Database of the process
+    _cache_counters = {}
+    _cache_counters_lock = threading.Lock()
 
     def __init__(self, kwargs=None):
         if 'logger' in kwargs:
@@ -26,13 +153,145 @@ class Database:
         else:
             self.utils = Utils(kwargs={"logger":self.logger, "properties":self.properties})
 
+        self.db_path = self.properties.get_property("database", "db_path", "facts.db")
+        self.pool = ConnectionPool.get_pool(self.db_path,
+                                            pool_size=self.properties.get_property_int("database", "pool_size", 8),
+                                            busy_timeout_ms=self.properties.get_property_int("database", "busy_timeout_ms", 5000),
+                                            cached_statements=self.properties.get_property_int("database", "cached_statements", 128))
+
+        # Claim cache: process-local LRU tier in front of the SQLite cache table
+        self.cache_ttl_seconds = self.properties.get_property_int("cache", "ttl_seconds", 7 * 24 * 3600)
+        self.cache_max_entries = self.properties.get_property_int("cache", "max_entries", 100000)
+        self.cache_purge_interval = self.properties.get_property_int("cache", "purge_interval", 1000)
+        db_key = os.path.abspath(self.db_path)
+        self.memory_cache = LRUCache.get_cache(f"claims:{db_key}",
+                                               max_size=self.properties.get_property_int("cache", "memory_max_entries", 10000),
+                                               ttl_seconds=self.properties.get_property_int("cache", "memory_ttl_seconds", 3600))
+        # Negative cache: per stage "known to miss" entries keyed on the normalized claim
+        self.negative_ttl_seconds = {
+            FactCheckStages.DATABASE: self.properties.get_property_int("cache", "negative_db_ttl_seconds", 3600),
+            FactCheckStages.SEMANTIC_INDEX: self.properties.get_property_int("cache", "negative_semantic_ttl_seconds", 6 * 3600),
+            FactCheckStages.EXTERNAL_API: self.properties.get_property_int("cache", "negative_external_ttl_seconds", 24 * 3600),
+        }
+        self.negative_memory_cache = LRUCache.get_cache(f"negative:{db_key}",
+                                                        max_size=self.properties.get_property_int("cache", "memory_max_entries", 10000))
+        with Database._cache_counters_lock:
+            self.cache_counters = Database._cache_counters.setdefault(db_key, {"db_hits": 0, "db_misses": 0, "writes": 0,
+                                                                               "expired_purged": 0, "evicted": 0, "invalidated": 0,
+                                                                               "negative_hits": 0, "negative_writes": 0})
+
         self.bcrypt = Bcrypt()
-        self.init_db()
-        self.insert_sample_facts()
+        self.migrate()
+
+    def close(self):
+        '''
+            Close all pooled connections of this database file
+        '''
+        self.pool.close_all()
+
+    def get_schema_version(self):
+        with self.pool.connection() as conn:
+            return conn.execute('PRAGMA user_version').fetchone()[0]
+
+    def migrate(self):
+        '''
+            Apply pending schema migrations once per database file.
+            The in-process guard skips the check on later Database constructions and
+            PRAGMA user_version makes other processes skip migrations already applied.
+        '''
+        db_key = os.path.abspath(self.db_path)
+        with Database._migrate_lock:
+            if db_key in Database._migrated:
+                return
+
+            latest_version = Database.MIGRATIONS[-1][0]
+            with self.pool.connection() as conn:
+                if conn.execute('PRAGMA user_version').fetchone()[0] < latest_version:
+                    try:
+                        # Take the write lock before re-reading the version, another process may be migrating
+                        conn.execute('BEGIN IMMEDIATE')
+                        current_version = conn.execute('PRAGMA user_version').fetchone()[0]
+                        for version, migration_name in Database.MIGRATIONS:
+                            if version > current_version:
+                                self.logger.info(f"migrate: Applying {migration_name} to {self.db_path}")
+                                getattr(self, migration_name)(conn)
+                                conn.execute(f'PRAGMA user_version = {int(version)}')
+                        conn.commit()
+                    except Exception as e:
+                        conn.rollback()
+                        self.logger.error(f"migrate: Error migrating {self.db_path}: {e}")
+                        raise
+
+            Database._migrated.add(db_key)
+
+    def migration_001_create_tables(self, conn):
+        self.init_db(conn)
+        self.insert_sample_facts(conn)
+
+    def migration_002_dedupe_sample_facts(self, conn):
+        # Earlier versions inserted the sample facts on every startup
+        conn.execute('''DELETE FROM facts WHERE id NOT IN
+                        (SELECT MIN(id) FROM facts GROUP BY claim, truth)''')
+
+    def migration_003_normalized_claims(self, conn):
+        # Indexed lookup column for check_fact_db, claims that normalize to the same
+        # value are collapsed to the oldest row
+        columns = [column[1] for column in conn.execute('PRAGMA table_info(facts)')]
+        if 'claim_normalized' not in columns:
+            conn.execute('ALTER TABLE facts ADD COLUMN claim_normalized TEXT')
+
+        seen_claims = set()
+        updates = []
+        duplicates = []
+        for fact_id, claim in conn.execute('SELECT id, claim FROM facts ORDER BY id').fetchall():
+            claim_normalized = self.utils.normalize_claim(claim)
+            if claim_normalized in seen_claims:
+                duplicates.append((fact_id,))
+            else:
+                seen_claims.add(claim_normalized)
+                updates.append((claim_normalized, fact_id))
+
+        if duplicates:
+            self.logger.info(f"migration_003_normalized_claims: Removing {len(duplicates)} duplicate facts")
+            conn.executemany('DELETE FROM facts WHERE id = ?', duplicates)
+        conn.executemany('UPDATE facts SET claim_normalized = ? WHERE id = ?', updates)
+        conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_facts_claim_normalized ON facts (claim_normalized)')
+
+    def migration_004_cache_expiry(self, conn):
+        # Cache rows get an expiry and the normalized claim / matched fact they were answered
+        # from, so they can be invalidated when facts change. Existing rows have neither and
+        # can't be invalidated, they are dropped.
+        columns = [column[1] for column in conn.execute('PRAGMA table_info(cache)')]
+        for column, column_type in (("claim_normalized", "TEXT"), ("fact_id", "INTEGER"),
+                                    ("created_at", "REAL"), ("expires_at", "REAL")):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE cache ADD COLUMN {column} {column_type}')
+        conn.execute('DELETE FROM cache')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_claim_normalized ON cache (claim_normalized)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_fact_id ON cache (fact_id) WHERE fact_id IS NOT NULL')
+
+    def migration_005_negative_cache(self, conn):
+        conn.execute('''CREATE TABLE IF NOT EXISTS negative_cache
+                        (claim_normalized TEXT, stage TEXT, expires_at REAL, PRIMARY KEY (claim_normalized, stage))''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_negative_cache_expires_at ON negative_cache (expires_at)')
+
+    def migration_006_caption_index(self, conn):
+        # Index of the caption store (CaptionStore), caption id -> content addressed blob.
+        # Legacy <id>.txt files are imported by migrate_captions.py or on first read.
+        conn.execute('''CREATE TABLE IF NOT EXISTS caption_index
+                        (caption_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL, compression TEXT NOT NULL,
+                         length INTEGER, stored_length INTEGER, source TEXT, language TEXT, fetched_at REAL)''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_caption_index_content_hash ON caption_index (content_hash, compression)')
+
+    def migration_007_caption_timing(self, conn):
+        # Segment timing of timestamped transcripts (Transcript.to_timing_bytes), NULL for plain text
+        columns = [column[1] for column in conn.execute('PRAGMA table_info(caption_index)')]
+        if 'timing' not in columns:
+            conn.execute('ALTER TABLE caption_index ADD COLUMN timing BLOB')
 
     # Database initialization
-    def init_db(self):
-        conn = sqlite3.connect('facts.db')
+    def init_db(self, conn):
         c = conn.cursor()
         c.execute('''CREATE TABLE IF NOT EXISTS facts
                     (id INTEGER PRIMARY KEY AUTOINCREMENT, claim TEXT, truth BOOLEAN)''')
@@ -44,97 +303,582 @@ class Database:
                     (id INTEGER PRIMARY KEY AUTOINCREMENT, video_id TEXT, captions TEXT)''')
         c.execute('''CREATE TABLE IF NOT EXISTS captions_cache
                     (video_id TEXT PRIMARY KEY, captions TEXT)''')
-        conn.commit()
-        conn.close()
 
     # Insert sample facts
-    def insert_sample_facts(self):
-        conn = sqlite3.connect('facts.db')
+    def insert_sample_facts(self, conn):
         c = conn.cursor()
         sample_facts = [
             ("The earth is round", True),
             ("The sky is green", False)
         ]
-        c.executemany('INSERT INTO facts (claim, truth) VALUES (?, ?)', sample_facts)
-        conn.commit()
-        conn.close()
+        c.executemany('''INSERT INTO facts (claim, truth) SELECT ?, ?
+                        WHERE NOT EXISTS (SELECT 1 FROM facts WHERE claim = ?)''',
+                      [(claim, truth, claim) for claim, truth in sample_facts])
 
     # Utility function to check the fact from the database
     def check_fact_db(self, claim):
-        conn = sqlite3.connect('facts.db')
-        c = conn.cursor()
-        c.execute('SELECT truth FROM facts WHERE LOWER(claim) = LOWER(?)', (claim,))
-        result = c.fetchone()
-        conn.close()
+        claim_normalized = self.utils.normalize_claim(claim)
+        with self.pool.connection() as conn:
+            c = conn.execute('SELECT truth FROM facts WHERE claim_normalized = ?', (claim_normalized,))
+            result = c.fetchone()
         return result[0] if result else None
 
+    def check_facts_db(self, claims):
+        '''
+            Batched check_fact_db, returns {claim: truth} for the claims found in the facts table
+        '''
+        claims_by_normalized = {}
+        for claim in claims:
+            claims_by_normalized.setdefault(self.utils.normalize_claim(claim), []).append(claim)
+
+        results = {}
+        normalized_claims = list(claims_by_normalized.keys())
+        with self.pool.connection() as conn:
+            for start in range(0, len(normalized_claims), Database.MAX_QUERY_PARAMETERS):
+                chunk = normalized_claims[start:start + Database.MAX_QUERY_PARAMETERS]
+                placeholders = ", ".join("?" * len(chunk))
+                for claim_normalized, truth in conn.execute(f'''SELECT claim_normalized, truth FROM facts
+                                                               WHERE claim_normalized IN ({placeholders})''', chunk):
+                    for claim in claims_by_normalized[claim_normalized]:
+                        results[claim] = truth
+        return results
+
+    def get_fact_by_id(self, fact_id):
+        with self.pool.connection() as conn:
+            result = conn.execute('SELECT id, claim, truth FROM facts WHERE id = ?', (fact_id,)).fetchone()
+        return {"id": result[0], "claim": result[1], "truth": result[2]} if result else None
+
+    def count_facts(self):
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM facts').fetchone()[0]
+
+    def iter_facts(self, batch_size=10000):
+        '''
+            Stream all facts as lists of (id, claim, truth) ordered by id, batch_size rows at a time
+        '''
+        last_id = -1
+        while True:
+            with self.pool.connection() as conn:
+                rows = conn.execute('SELECT id, claim, truth FROM facts WHERE id > ? ORDER BY id LIMIT ?',
+                                    (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            yield rows
+            last_id = rows[-1][0]
+
+    # Insert or update a fact, keyed on the normalized claim
+    def insert_fact(self, claim, truth):
+        claim_normalized = self.utils.normalize_claim(claim)
+        with self.pool.connection() as conn:
+            conn.execute('''INSERT INTO facts (claim, truth, claim_normalized) VALUES (?, ?, ?)
+                            ON CONFLICT(claim_normalized) DO UPDATE SET claim = excluded.claim, truth = excluded.truth''',
+                         (claim, truth, claim_normalized))
+            fact_id = conn.execute('SELECT id FROM facts WHERE claim_normalized = ?', (claim_normalized,)).fetchone()[0]
+            invalidated = conn.execute('DELETE FROM cache WHERE claim_normalized = ? OR fact_id = ?',
+                                       (claim_normalized, fact_id)).rowcount
+            conn.execute('DELETE FROM negative_cache WHERE claim_normalized = ? AND stage = ?',
+                         (claim_normalized, FactCheckStages.DATABASE))
+            conn.commit()
+        invalidated += self.memory_cache.delete_where(lambda entry: entry[1] == claim_normalized or entry[2] == fact_id)
+        self.negative_memory_cache.delete((FactCheckStages.DATABASE, claim_normalized))
+        self.count_cache_event("invalidated", invalidated)
+
+    def parse_truth(self, value):
+        '''
+            Convert a truth value from a CSV/JSONL row to a boolean, None if it is not recognized
+        '''
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)):
+            return bool(value)
+        value = str(value).strip().lower()
+        if value in ("true", "t", "1", "yes", "y"):
+            return True
+        if value in ("false", "f", "0", "no", "n"):
+            return False
+        return None
+
+    def iter_facts_file(self, file_path, file_format=None):
+        '''
+            Stream (claim, truth) rows from a CSV (header with claim,truth columns) or JSONL
+            ({"claim": ..., "truth": ...} per line) file without reading it into memory.
+            Rows without a claim or with an unrecognized truth value yield (None, None).
+        '''
+        if file_format is None:
+            file_format = "jsonl" if file_path.endswith((".jsonl", ".json")) else "csv"
+
+        with open(file_path, mode="r", encoding="utf-8", newline="") as file:
+            if file_format == "jsonl":
+                for line in file:
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError:
+                        yield None, None
+                        continue
+                    yield row.get("claim"), self.parse_truth(row.get("truth"))
+            else:
+                for row in csv.DictReader(file):
+                    yield row.get("claim"), self.parse_truth(row.get("truth"))
+
+    def bulk_load_facts(self, facts, chunk_size=50000):
+        '''
+            Stream (claim, truth) rows into the facts table.
+
+            Rows are normalized and written with executemany, chunk_size rows per transaction,
+            into an unindexed temporary staging table. The staging index is built once after
+            the load, then the staged rows are merged into facts deduplicated on the normalized
+            claim (the last row wins). When facts is empty the unique index on facts is dropped
+            during the merge and rebuilt afterwards.
+            Returns the load statistics including rows/second.
+        '''
+        start_time = time.perf_counter()
+        rows_read = 0
+        rows_skipped = 0
+
+        with self.pool.connection() as conn:
+            try:
+                conn.execute('DROP TABLE IF EXISTS temp.facts_staging')
+                conn.execute('''CREATE TEMP TABLE facts_staging
+                                (claim TEXT, truth BOOLEAN, claim_normalized TEXT)''')
+
+                chunk = []
+                for claim, truth in facts:
+                    rows_read += 1
+                    claim_normalized = self.utils.normalize_claim(claim) if claim else ""
+                    if not claim_normalized or truth is None:
+                        rows_skipped += 1
+                        continue
+                    chunk.append((claim.strip(), truth, claim_normalized))
+                    if len(chunk) >= chunk_size:
+                        conn.executemany('INSERT INTO facts_staging (claim, truth, claim_normalized) VALUES (?, ?, ?)', chunk)
+                        conn.commit()
+                        chunk = []
+                        elapsed = time.perf_counter() - start_time
+                        self.logger.info(f"bulk_load_facts: {rows_read} rows read - {rows_read / elapsed:.0f} rows/second")
+                if chunk:
+                    conn.executemany('INSERT INTO facts_staging (claim, truth, claim_normalized) VALUES (?, ?, ?)', chunk)
+                    conn.commit()
+
+                conn.execute('CREATE INDEX temp.idx_facts_staging_claim_normalized ON facts_staging (claim_normalized)')
+                facts_before = conn.execute('SELECT COUNT(*) FROM facts').fetchone()[0]
+                defer_index = facts_before == 0
+
+                conn.execute('BEGIN IMMEDIATE')
+                if defer_index:
+                    conn.execute('DROP INDEX IF EXISTS idx_facts_claim_normalized')
+                    conn.execute('''INSERT INTO facts (claim, truth, claim_normalized)
+                                    SELECT claim, truth, claim_normalized FROM facts_staging
+                                    WHERE rowid IN (SELECT MAX(rowid) FROM facts_staging GROUP BY claim_normalized)''')
+                    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_facts_claim_normalized ON facts (claim_normalized)')
+                else:
+                    conn.execute('''INSERT INTO facts (claim, truth, claim_normalized)
+                                    SELECT claim, truth, claim_normalized FROM facts_staging
+                                    WHERE rowid IN (SELECT MAX(rowid) FROM facts_staging GROUP BY claim_normalized)
+                                    ON CONFLICT(claim_normalized) DO UPDATE SET claim = excluded.claim, truth = excluded.truth''')
+                rows_loaded = conn.execute('SELECT COUNT(DISTINCT claim_normalized) FROM facts_staging').fetchone()[0]
+                facts_after = conn.execute('SELECT COUNT(*) FROM facts').fetchone()[0]
+                # Cached answers for the loaded claims (or semantic matches of updated facts) are stale
+                invalidated = conn.execute('''DELETE FROM cache WHERE claim_normalized IN (SELECT claim_normalized FROM facts_staging)
+                                              OR fact_id IN (SELECT id FROM facts WHERE claim_normalized IN
+                                                             (SELECT claim_normalized FROM facts_staging))''').rowcount
+                conn.execute('''DELETE FROM negative_cache WHERE stage = ? AND claim_normalized IN
+                                (SELECT claim_normalized FROM facts_staging)''', (FactCheckStages.DATABASE,))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                self.logger.error(f"bulk_load_facts: Error loading facts: {e}")
+                raise
+            finally:
+                conn.execute('DROP TABLE IF EXISTS temp.facts_staging')
+
+        if rows_loaded:
+            self.memory_cache.clear()
+            self.negative_memory_cache.delete_where(lambda stage: stage == FactCheckStages.DATABASE)
+        self.count_cache_event("invalidated", invalidated)
+
+        elapsed = time.perf_counter() - start_time
+        stats = {
+            "rows_read": rows_read,
+            "rows_skipped": rows_skipped,
+            "rows_loaded": rows_loaded,
+            "facts_inserted": facts_after - facts_before,
+            "facts_updated": rows_loaded - (facts_after - facts_before),
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows_read / elapsed) if elapsed > 0 else rows_read,
+        }
+        self.logger.info(f"bulk_load_facts: {stats}")
+        return stats
+
     # Hash the claim for caching
     def get_claim_hash(self, claim):
         return hashlib.sha256(claim.encode()).hexdigest()
 
+    def count_cache_event(self, counter, count=1):
+        if count:
+            with Database._cache_counters_lock:
+                self.cache_counters[counter] += count
+
     # Store result in cache
-    def cache_result(self, claim, result):
-        conn = sqlite3.connect('facts.db')
-        c = conn.cursor()
+    def cache_result(self, claim, result, fact_id=None):
+        '''
+            Cache result in both tiers. fact_id is the fact the result was answered from when
+            it was not an exact match of the claim (semantic index), so it is invalidated with it.
+        '''
         claim_hash = self.get_claim_hash(claim)
-        c.execute('INSERT OR REPLACE INTO cache (claim_hash, result) VALUES (?, ?)', (claim_hash, result))
-        conn.commit()
-        conn.close()
+        claim_normalized = self.utils.normalize_claim(claim)
+        now = time.time()
+        expires_at = now + self.cache_ttl_seconds if self.cache_ttl_seconds else None
+        with self.pool.connection() as conn:
+            conn.execute('''INSERT OR REPLACE INTO cache (claim_hash, result, claim_normalized, fact_id, created_at, expires_at)
+                            VALUES (?, ?, ?, ?, ?, ?)''',
+                         (claim_hash, result, claim_normalized, fact_id, now, expires_at))
+            conn.commit()
+        self.memory_cache.set(claim, (result, claim_normalized, fact_id))
+
+        with Database._cache_counters_lock:
+            self.cache_counters["writes"] += 1
+            purge = self.cache_purge_interval > 0 and self.cache_counters["writes"] % self.cache_purge_interval == 0
+        if purge:
+            self.purge_cache()
 
     # Retrieve result from cache
     def get_cached_result(self, claim):
-        conn = sqlite3.connect('facts.db')
-        c = conn.cursor()
+        entry = self.memory_cache.get(claim)
+        if entry is not None:
+            return entry[0]
+
         claim_hash = self.get_claim_hash(claim)
-        c.execute('SELECT result FROM cache WHERE claim_hash = ?', (claim_hash,))
-        result = c.fetchone()
-        conn.close()
-        return result[0] if result else None
+        now = time.time()
+        with self.pool.connection() as conn:
+            c = conn.execute('''SELECT result, claim_normalized, fact_id, expires_at FROM cache
+                                WHERE claim_hash = ? AND (expires_at IS NULL OR expires_at > ?)''', (claim_hash, now))
+            result = c.fetchone()
+        if result is None:
+            self.count_cache_event("db_misses")
+            return None
+
+        self.count_cache_event("db_hits")
+        result_value, claim_normalized, fact_id, expires_at = result
+        memory_ttl = self.memory_cache.ttl_seconds
+        if expires_at is not None:
+            memory_ttl = min(memory_ttl, expires_at - now) if memory_ttl else expires_at - now
+        self.memory_cache.set(claim, (result_value, claim_normalized, fact_id), ttl_seconds=memory_ttl)
+        return result_value
+
+    def cache_results(self, cache_rows):
+        '''
+            Batched cache_result for (claim, result, fact_id) rows in one transaction
+        '''
+        if not cache_rows:
+            return
+        now = time.time()
+        expires_at = now + self.cache_ttl_seconds if self.cache_ttl_seconds else None
+        db_rows = []
+        for claim, result, fact_id in cache_rows:
+            claim_normalized = self.utils.normalize_claim(claim)
+            db_rows.append((self.get_claim_hash(claim), result, claim_normalized, fact_id, now, expires_at))
+            self.memory_cache.set(claim, (result, claim_normalized, fact_id))
+        with self.pool.connection() as conn:
+            conn.executemany('''INSERT OR REPLACE INTO cache (claim_hash, result, claim_normalized, fact_id, created_at, expires_at)
+                                VALUES (?, ?, ?, ?, ?, ?)''', db_rows)
+            conn.commit()
+
+        with Database._cache_counters_lock:
+            writes_before = self.cache_counters["writes"]
+            self.cache_counters["writes"] += len(db_rows)
+            purge = self.cache_purge_interval > 0 and \
+                writes_before // self.cache_purge_interval != self.cache_counters["writes"] // self.cache_purge_interval
+        if purge:
+            self.purge_cache()
+
+    def get_cached_results(self, claims):
+        '''
+            Batched get_cached_result, returns {claim: result} for the cached claims.
+            Claims missing from the memory tier are looked up in SQLite with one query per chunk.
+        '''
+        results = {}
+        claims_by_hash = {}
+        for claim in claims:
+            if claim in results:
+                continue
+            entry = self.memory_cache.get(claim)
+            if entry is not None:
+                results[claim] = entry[0]
+            else:
+                claims_by_hash[self.get_claim_hash(claim)] = claim
+        if not claims_by_hash:
+            return results
+
+        now = time.time()
+        claim_hashes = list(claims_by_hash.keys())
+        with self.pool.connection() as conn:
+            for start in range(0, len(claim_hashes), Database.MAX_QUERY_PARAMETERS):
+                chunk = claim_hashes[start:start + Database.MAX_QUERY_PARAMETERS]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = conn.execute(f'''SELECT claim_hash, result, claim_normalized, fact_id, expires_at FROM cache
+                                        WHERE claim_hash IN ({placeholders}) AND (expires_at IS NULL OR expires_at > ?)''',
+                                    chunk + [now]).fetchall()
+                for claim_hash, result, claim_normalized, fact_id, expires_at in rows:
+                    claim = claims_by_hash[claim_hash]
+                    results[claim] = result
+                    memory_ttl = self.memory_cache.ttl_seconds
+                    if expires_at is not None:
+                        memory_ttl = min(memory_ttl, expires_at - now) if memory_ttl else expires_at - now
+                    self.memory_cache.set(claim, (result, claim_normalized, fact_id), ttl_seconds=memory_ttl)
+
+        db_hits = sum(1 for claim in claims_by_hash.values() if claim in results)
+        self.count_cache_event("db_hits", db_hits)
+        self.count_cache_event("db_misses", len(claims_by_hash) - db_hits)
+        return results
+
+    def get_negative_stages(self, claim):
+        '''
+            Stages of the fact-check cascade known to miss for claim (any claim with the same normalization)
+        '''
+        return self.get_negative_stages_many([claim]).get(claim, set())
+
+    def get_negative_stages_many(self, claims):
+        '''
+            Batched get_negative_stages, returns {claim: set of stages} for claims with negative entries
+        '''
+        stages_by_normalized = {}
+        claims_by_normalized = {}
+        for claim in claims:
+            claims_by_normalized.setdefault(self.utils.normalize_claim(claim), []).append(claim)
+
+        # Stages missing from the memory tier are looked up in SQLite, per claim
+        missing_stages = {}
+        for claim_normalized in claims_by_normalized:
+            for stage in self.negative_ttl_seconds:
+                if self.negative_memory_cache.get((stage, claim_normalized)) is not None:
+                    stages_by_normalized.setdefault(claim_normalized, set()).add(stage)
+                else:
+                    missing_stages.setdefault(claim_normalized, set()).add(stage)
+        lookup = list(missing_stages.keys())
+
+        now = time.time()
+        with self.pool.connection() as conn:
+            for start in range(0, len(lookup), Database.MAX_QUERY_PARAMETERS):
+                chunk = lookup[start:start + Database.MAX_QUERY_PARAMETERS]
+                placeholders = ", ".join("?" * len(chunk))
+                for claim_normalized, stage, expires_at in conn.execute(
+                        f'''SELECT claim_normalized, stage, expires_at FROM negative_cache
+                            WHERE claim_normalized IN ({placeholders}) AND expires_at > ?''', chunk + [now]):
+                    if stage not in missing_stages[claim_normalized]:
+                        continue
+                    stages_by_normalized.setdefault(claim_normalized, set()).add(stage)
+                    # stage is stored as the value so delete_where can drop a whole stage
+                    self.negative_memory_cache.set((stage, claim_normalized), stage, ttl_seconds=expires_at - now)
+
+        results = {}
+        for claim_normalized, stages in stages_by_normalized.items():
+            self.count_cache_event("negative_hits", len(stages))
+            for claim in claims_by_normalized[claim_normalized]:
+                results[claim] = stages
+        return results
+
+    def cache_negative_result(self, claim, stage):
+        '''
+            Record that stage missed for claim, skipped by later checks until the stage TTL expires
+        '''
+        self.cache_negative_results([(claim, stage)])
+
+    def cache_negative_results(self, negative_rows):
+        '''
+            Batched cache_negative_result for (claim, stage) rows
+        '''
+        now = time.time()
+        db_rows = []
+        for claim, stage in negative_rows:
+            ttl_seconds = self.negative_ttl_seconds.get(stage)
+            if not ttl_seconds:
+                continue
+            claim_normalized = self.utils.normalize_claim(claim)
+            db_rows.append((claim_normalized, stage, now + ttl_seconds))
+            self.negative_memory_cache.set((stage, claim_normalized), stage, ttl_seconds=ttl_seconds)
+        if not db_rows:
+            return
+        with self.pool.connection() as conn:
+            conn.executemany('INSERT OR REPLACE INTO negative_cache (claim_normalized, stage, expires_at) VALUES (?, ?, ?)', db_rows)
+            conn.commit()
+        self.count_cache_event("negative_writes", len(db_rows))
+
+    def invalidate_negative_results(self, stage=None):
+        '''
+            Drop the negative entries of stage, or of every stage
+        '''
+        with self.pool.connection() as conn:
+            if stage is None:
+                conn.execute('DELETE FROM negative_cache')
+            else:
+                conn.execute('DELETE FROM negative_cache WHERE stage = ?', (stage,))
+            conn.commit()
+        if stage is None:
+            self.negative_memory_cache.clear()
+        else:
+            self.negative_memory_cache.delete_where(lambda entry_stage: entry_stage == stage)
+
+    def purge_cache(self):
+        '''
+            Delete expired cache rows, then the oldest rows above cache max_entries.
+            Returns (expired rows deleted, rows evicted).
+        '''
+        with self.pool.connection() as conn:
+            expired = conn.execute('DELETE FROM cache WHERE expires_at <= ?', (time.time(),)).rowcount
+            expired += conn.execute('DELETE FROM negative_cache WHERE expires_at <= ?', (time.time(),)).rowcount
+            evicted = 0
+            if self.cache_max_entries > 0:
+                overflow = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0] - self.cache_max_entries
+                if overflow > 0:
+                    evicted = conn.execute('''DELETE FROM cache WHERE claim_hash IN
+                                              (SELECT claim_hash FROM cache ORDER BY expires_at LIMIT ?)''', (overflow,)).rowcount
+            conn.commit()
+        self.count_cache_event("expired_purged", expired)
+        self.count_cache_event("evicted", evicted)
+        self.logger.info(f"purge_cache: {expired} expired and {evicted} overflow cache rows deleted")
+        return expired, evicted
+
+    def invalidate_cache(self):
+        '''
+            Drop every cached claim result in both tiers
+        '''
+        with self.pool.connection() as conn:
+            invalidated = conn.execute('DELETE FROM cache').rowcount
+            conn.commit()
+        self.memory_cache.clear()
+        self.count_cache_event("invalidated", invalidated)
+
+    def get_cache_stats(self):
+        '''
+            Hit/miss counters of both cache tiers for this process
+        '''
+        with self.pool.connection() as conn:
+            db_size = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        with Database._cache_counters_lock:
+            counters = dict(self.cache_counters)
+        memory_stats = self.memory_cache.stats()
+        lookups = memory_stats["hits"] + counters["db_hits"] + counters["db_misses"]
+        return {
+            "memory": memory_stats,
+            "sqlite": {"size": db_size, "max_entries": self.cache_max_entries, "ttl_seconds": self.cache_ttl_seconds,
+                       "hits": counters["db_hits"], "misses": counters["db_misses"], "writes": counters["writes"],
+                       "expired_purged": counters["expired_purged"], "evicted": counters["evicted"]},
+            "negative": {"hits": counters["negative_hits"], "writes": counters["negative_writes"],
+                         "ttl_seconds": self.negative_ttl_seconds},
+            "invalidated": counters["invalidated"],
+            "hit_rate": round((memory_stats["hits"] + counters["db_hits"]) / lookups, 4) if lookups else 0.0,
+        }
 
     # Insert sample facts
     def insert_captions_cache(self, video_id, captions):
-        conn = sqlite3.connect('facts.db')
-        c = conn.cursor()
-        c.execute('INSERT OR REPLACE INTO captions_cache (video_id, captions) VALUES (?, ?)', (video_id, captions))
-        conn.commit()
-        conn.close()
+        with self.pool.connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO captions_cache (video_id, captions) VALUES (?, ?)', (video_id, captions))
+            conn.commit()
 
     # Retrieve result from cache
     def get_captions_cached_result(self, video_id):
-        conn = sqlite3.connect('facts.db')
-        c = conn.cursor()
-        c.execute('SELECT captions FROM captions_cache WHERE video_id = ?', (video_id,))
-        result = c.fetchone()
-        conn.close()
+        with self.pool.connection() as conn:
+            c = conn.execute('SELECT captions FROM captions_cache WHERE video_id = ?', (video_id,))
+            result = c.fetchone()
         return result[0] if result else None
 
+    def get_caption_entry(self, caption_id):
+        '''
+            Caption index row of caption_id as a dict, or None
+        '''
+        with self.pool.connection() as conn:
+            row = conn.execute('''SELECT caption_id, content_hash, compression, length, stored_length, source, language, fetched_at
+                                  FROM caption_index WHERE caption_id = ?''', (caption_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("caption_id", "content_hash", "compression", "length", "stored_length",
+                         "source", "language", "fetched_at"), row))
+
+    def get_caption_ids(self, caption_ids):
+        '''
+            Subset of caption_ids present in the caption index
+        '''
+        caption_ids = list(caption_ids)
+        found = set()
+        with self.pool.connection() as conn:
+            for start in range(0, len(caption_ids), Database.MAX_QUERY_PARAMETERS):
+                chunk = caption_ids[start:start + Database.MAX_QUERY_PARAMETERS]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(row[0] for row in conn.execute(
+                    f'SELECT caption_id FROM caption_index WHERE caption_id IN ({placeholders})', chunk))
+        return found
+
+    def get_caption_timing(self, caption_id):
+        '''
+            Segment timing blob of caption_id, None for plain text or unknown ids
+        '''
+        with self.pool.connection() as conn:
+            row = conn.execute('SELECT timing FROM caption_index WHERE caption_id = ?', (caption_id,)).fetchone()
+        return row[0] if row else None
+
+    def put_caption_entries(self, caption_rows):
+        '''
+            Insert or replace caption index rows in one transaction.
+            caption_rows: (caption_id, content_hash, compression, length, stored_length, source, language, fetched_at, timing)
+        '''
+        with self.pool.connection() as conn:
+            conn.executemany('''INSERT OR REPLACE INTO caption_index
+                                (caption_id, content_hash, compression, length, stored_length, source, language, fetched_at, timing)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', caption_rows)
+            conn.commit()
+
+    def delete_caption_entry(self, caption_id):
+        '''
+            Remove caption_id from the caption index, returns True if it was indexed
+        '''
+        with self.pool.connection() as conn:
+            deleted = conn.execute('DELETE FROM caption_index WHERE caption_id = ?', (caption_id,)).rowcount
+            conn.commit()
+        return deleted > 0
+
+    def count_caption_references(self, content_hash, compression):
+        '''
+            Number of caption ids sharing the blob (content_hash, compression)
+        '''
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM caption_index WHERE content_hash = ? AND compression = ?',
+                                (content_hash, compression)).fetchone()[0]
+
+    def get_caption_stats(self):
+        '''
+            Caption ids, distinct blobs and text / stored sizes of the caption index
+        '''
+        with self.pool.connection() as conn:
+            captions, text_bytes = conn.execute('SELECT COUNT(*), COALESCE(SUM(length), 0) FROM caption_index').fetchone()
+            blobs, stored_bytes = conn.execute('''SELECT COUNT(*), COALESCE(SUM(stored_length), 0) FROM
+                                                 (SELECT MAX(stored_length) AS stored_length FROM caption_index
+                                                  GROUP BY content_hash, compression)''').fetchone()
+        return {"captions": captions, "blobs": blobs, "text_bytes": text_bytes, "stored_bytes": stored_bytes}
+
     def create_user(self, username, password):
         hashed_password = self.bcrypt.generate_password_hash(password).decode('utf-8')
-    
-        conn = sqlite3.connect('facts.db')
-        c = conn.cursor()
-        try:
-            self.logger.info(f"create_user: Creating User {username}")
-            c.execute('INSERT INTO users (username, password) VALUES (?, ?)', (username, hashed_password))
-            conn.commit()
-            self.logger.info(f"create_user: User {username} created")
-            return jsonify({"message": "User created", "status_code": 201})
-        except sqlite3.IntegrityError as e:
-            self.logger.error(f"create_user: Error creating user {username}: {e}")
-            return jsonify({"message": "User already exists", "status_code": 400})
-        except Exception as e:
-            self.logger.error(f"create_user: Error creating user {username}: {e}")
-            return jsonify({"message": "Internal Server Error", "status_code": 500})  
-        finally:
-            conn.close()
+
+        with self.pool.connection() as conn:
+            try:
+                self.logger.info(f"create_user: Creating User {username}")
+                conn.execute('INSERT INTO users (username, password) VALUES (?, ?)', (username, hashed_password))
+                conn.commit()
+                self.logger.info(f"create_user: User {username} created")
+                return jsonify({"message": "User created", "status_code": 201})
+            except sqlite3.IntegrityError as e:
+                self.logger.error(f"create_user: Error creating user {username}: {e}")
+                return jsonify({"message": "User already exists", "status_code": 400})
+            except Exception as e:
+                self.logger.error(f"create_user: Error creating user {username}: {e}")
+                return jsonify({"message": "Internal Server Error", "status_code": 500})
 
     def verify_user(self, username, password):
-        conn = sqlite3.connect('facts.db')
-        c = conn.cursor()
-        c.execute('SELECT password FROM users WHERE username = ?', (username,))
-        result = c.fetchone()
+        with self.pool.connection() as conn:
+            c = conn.execute('SELECT password FROM users WHERE username = ?', (username,))
+            result = c.fetchone()
         self.logger.info(f"verify_user: User {username} found: {result}")
-        conn.close()
         if result:
             return self.bcrypt.check_password_hash(result[0], password)
         return False
\ No newline at end of file
@@ -0,0 +1,226 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from source.services.lib.Logger import Logger
+
+class CircuitBreaker:
+    """
+        Consecutive failure circuit breaker.
+
+        After failure_threshold consecutive failures the circuit opens and calls are rejected
+        for reset_seconds. Then one trial call is let through (half open), its success closes
+        the circuit and its failure opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_seconds=30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"{CircuitBreaker.__name__}"
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == CircuitBreaker.CLOSED:
+                return True
+            if self.state == CircuitBreaker.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = CircuitBreaker.HALF_OPEN
+                return True
+            # Open, or half open with the trial call in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CircuitBreaker.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == CircuitBreaker.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = CircuitBreaker.OPEN
+                self.opened_at = time.monotonic()
+
+class ExternalFactCheckClient:
+    """
+        Pooled client for the Google Fact Check Tools claims:search API.
+
+        One keep-alive requests.Session is shared by all calls, with at most max_concurrency
+        requests in flight. Every request has a timeout and is retried with exponential backoff
+        (and jitter) on connection errors, timeouts, 429 and 5xx responses. A circuit breaker
+        stops calling the API while connection errors, timeouts and 5xx responses keep coming,
+        other errors (4xx, invalid JSON) are answers of a reachable API and don't open it. Concurrent calls for the same claim are
+        coalesced into a single in-flight request whose result is shared by all callers.
+        A claim the API has no review for is rated "Unknown", while None means the API could
+        not be asked (open circuit, timeouts, connection errors, error responses).
+    """
+    UNKNOWN = "Unknown"
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    _clients = {}    # (api_url, api_key) -> ExternalFactCheckClient, shared by the process
+    _clients_lock = threading.Lock()
+
+    def __init__(self, api_url, api_key=None, timeout_seconds=5.0, max_retries=3, backoff_seconds=0.5,
+                 max_backoff_seconds=8.0, max_concurrency=8, failure_threshold=5, reset_seconds=30, logger=None):
+        self.logger = logger if logger is not None else Logger.get_logger()
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.max_concurrency = max_concurrency
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="external-fact-check")
+        self.circuit_breaker = CircuitBreaker(failure_threshold, reset_seconds)
+
+        self._in_flight = {}    # claim -> Future of the request being made for it
+        self._in_flight_lock = threading.Lock()    # also guards stats
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "coalesced": 0, "rejected": 0}
+
+    def __str__(self):
+        return f"{ExternalFactCheckClient.__name__}"
+
+    @staticmethod
+    def get_client(api_url, api_key=None, **options):
+        '''
+            Process-wide client for api_url/api_key, created with options on first use
+        '''
+        key = (api_url, api_key)
+        with ExternalFactCheckClient._clients_lock:
+            if key not in ExternalFactCheckClient._clients:
+                ExternalFactCheckClient._clients[key] = ExternalFactCheckClient(api_url, api_key, **options)
+            return ExternalFactCheckClient._clients[key]
+
+    def count_event(self, counter, count=1):
+        with self._in_flight_lock:
+            self.stats[counter] += count
+
+    @staticmethod
+    def is_unavailable_error(error):
+        '''
+            True for the errors of an unavailable API (connection errors, timeouts, 5xx responses),
+            the only ones counted by the circuit breaker
+        '''
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        response = getattr(error, "response", None)
+        return response is not None and response.status_code >= 500
+
+    def get_backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff_seconds)
+        backoff = min(self.backoff_seconds * (2 ** attempt), self.max_backoff_seconds)
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+    def request_rating(self, claim):
+        '''
+            Call the API for claim with retries, returns the textual rating of the first claim review
+        '''
+        params = {'query': claim}
+        if self.api_key:
+            params['key'] = self.api_key
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                with self.semaphore:
+                    self.count_event("requests")
+                    response = self.session.get(self.api_url, params=params, timeout=self.timeout_seconds)
+                if response.status_code in ExternalFactCheckClient.RETRY_STATUS_CODES:
+                    header = response.headers.get("Retry-After")
+                    retry_after = float(header) if header and header.isdigit() else None
+                    raise requests.HTTPError(f"{response.status_code} response", response=response)
+                response.raise_for_status()
+                claims = response.json().get("claims", [])
+                if claims:
+                    return claims[0].get("claimReview", [{}])[0].get("textualRating", ExternalFactCheckClient.UNKNOWN)
+                return ExternalFactCheckClient.UNKNOWN
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                status_code = e.response.status_code if getattr(e, "response", None) is not None else None
+                if status_code is not None and status_code not in ExternalFactCheckClient.RETRY_STATUS_CODES:
+                    raise
+                if attempt == self.max_retries:
+                    raise
+                self.count_event("retries")
+                backoff = self.get_backoff(attempt, retry_after)
+                self.logger.warning(f"request_rating: Attempt {attempt + 1} failed ({e}), retrying in {backoff:.2f}s")
+                time.sleep(backoff)
+
+    def check_claim(self, claim):
+        '''
+            Textual rating of claim, "Unknown" if the API has no review for it,
+            None if the API is unavailable. Concurrent calls for the same claim share one request.
+        '''
+        with self._in_flight_lock:
+            future = self._in_flight.get(claim)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[claim] = future
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            return future.result()
+
+        rating = None
+        try:
+            if not self.circuit_breaker.allow_request():
+                self.count_event("rejected")
+                self.logger.warning(f"check_claim: Circuit open, skipping external API for '{claim}'")
+            else:
+                try:
+                    rating = self.request_rating(claim)
+                    self.circuit_breaker.record_success()
+                except (requests.RequestException, ValueError) as e:
+                    # ValueError: response body is not JSON
+                    self.count_event("failures")
+                    if ExternalFactCheckClient.is_unavailable_error(e):
+                        self.circuit_breaker.record_failure()
+                    else:
+                        # The API answered, it is reachable
+                        self.circuit_breaker.record_success()
+                    self.logger.error(f"check_claim: External API error: {e}")
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(claim, None)
+            future.set_result(rating)
+        return rating
+
+    def check_claims(self, claims):
+        '''
+            check_claim for many claims concurrently (bounded by max_concurrency), returns {claim: rating or None}
+        '''
+        unique_claims = list(dict.fromkeys(claims))
+        return dict(zip(unique_claims, self.executor.map(self.check_claim, unique_claims)))
+
+    async def check_claim_async(self, claim):
+        '''
+            check_claim for asyncio callers, runs on the client's thread pool
+        '''
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.check_claim, claim)
+
+    def get_stats(self):
+        with self._in_flight_lock:
+            return dict(self.stats, circuit_state=self.circuit_breaker.state, in_flight=len(self._in_flight))
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
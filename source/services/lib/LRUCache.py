@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """
+        Thread-safe in-process cache bounded by entry count and time-to-live.
+
+        Entries are kept in least recently used order, a get() moves the entry to the end
+        and a set() past max_size drops the entries at the front. Expired entries are
+        removed when they are read. Hit, miss, eviction and expiration counters are kept
+        for stats().
+    """
+    _caches = {}             # name -> LRUCache, shared by every user of the same name in the process
+    _caches_lock = threading.Lock()
+
+    def __init__(self, max_size=10000, ttl_seconds=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds    # None or 0 means entries never expire
+        self._entries = OrderedDict()     # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __str__(self):
+        return f"{LRUCache.__name__}"
+
+    @staticmethod
+    def get_cache(name, max_size=10000, ttl_seconds=None):
+        '''
+            Process-wide cache for name, created on first use
+        '''
+        with LRUCache._caches_lock:
+            if name not in LRUCache._caches:
+                LRUCache._caches[name] = LRUCache(max_size, ttl_seconds)
+            return LRUCache._caches[name]
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl_seconds=None):
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def delete_where(self, predicate):
+        '''
+            Delete every entry whose value matches predicate, returns the number deleted
+        '''
+        with self._lock:
+            keys = [key for key, (value, _) in self._entries.items() if predicate(value)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,97 @@
+import importlib
+import sys
+import threading
+import time
+import types
+
+# Heavy third party packages, importing any of them at startup is a regression (see profile_imports.py)
+HEAVY_MODULES = ["torch", "transformers", "nltk", "spacy", "yt_dlp", "pytube", "youtube_transcript_api",
+                 "numpy", "vosk", "speech_recognition", "pydub", "playsound", "wikipedia", "bs4", "readability"]
+
+class LazyModule(types.ModuleType):
+    """
+        Module placeholder that imports the real module on first attribute access.
+
+        Declared at module level in place of an import statement, e.g.
+        torch = lazy_import("torch"), so heavy packages are only imported by the code
+        paths that use them. Import times are recorded in LazyModule.import_times.
+        There is one proxy per module name, so on_import callbacks run whichever module
+        declaring it is used first.
+    """
+    import_times = {}    # module name -> seconds spent importing it on first use
+    _proxies = {}    # module name -> the LazyModule shared by every lazy_import of it
+    _lock = threading.RLock()
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_callbacks"] = []
+
+    def __repr__(self):
+        state = "imported" if self.__dict__["_lazy_module"] is not None else "not imported"
+        return f"<lazy module '{self.__dict__['_lazy_name']}' ({state})>"
+
+    def _lazy_load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+
+        with LazyModule._lock:
+            module = self.__dict__["_lazy_module"]
+            if module is not None:
+                return module
+            name = self.__dict__["_lazy_name"]
+            start_time = time.perf_counter()
+            module = importlib.import_module(name)
+            LazyModule.import_times[name] = round(time.perf_counter() - start_time, 4)
+            self.__dict__["_lazy_module"] = module
+            callbacks = self.__dict__["_lazy_callbacks"]
+            self.__dict__["_lazy_callbacks"] = []
+
+        for callback in callbacks:
+            callback()
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._lazy_load(), attribute)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+def lazy_import(name):
+    '''
+        Module proxy for name, the module is imported on first attribute access.
+        Returns the module itself when it is already imported.
+    '''
+    if name in sys.modules:
+        return sys.modules[name]
+    with LazyModule._lock:
+        if name not in LazyModule._proxies:
+            LazyModule._proxies[name] = LazyModule(name)
+        return LazyModule._proxies[name]
+
+def is_imported(module):
+    '''
+        True if module (a module or LazyModule) has been imported
+    '''
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
+
+def on_import(module, callback):
+    '''
+        Call callback once module is imported, right away if it already is
+    '''
+    if isinstance(module, LazyModule):
+        with LazyModule._lock:
+            if module.__dict__["_lazy_module"] is None:
+                module.__dict__["_lazy_callbacks"].append(callback)
+                return
+    callback()
+
+def loaded_heavy_modules():
+    '''
+        Heavy packages (HEAVY_MODULES) present in sys.modules
+    '''
+    return [name for name in HEAVY_MODULES if name in sys.modules]
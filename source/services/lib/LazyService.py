@@ -0,0 +1,115 @@
+import importlib
+import multiprocessing
+import threading
+import time
+from source.services.lib.Logger import Logger
+
+class LazyService:
+    """
+        Proxy that builds a service (or model) the first time it is used.
+
+        factory is called once, under a lock, on the first attribute access or call and the
+        proxy forwards everything to the instance it returned. Module level services can be
+        declared as LazyService so importing the module doesn't load any model, and
+        warm_up() builds them in a background thread before the first request needs them.
+    """
+
+    def __init__(self, name, factory):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_error", None)
+        object.__setattr__(self, "_load_seconds", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def __str__(self):
+        return f"{LazyService.__name__}"
+
+    def initialize(self):
+        '''
+            Build the instance if needed and return it
+        '''
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                logger = Logger.get_logger()
+                logger.info(f"LazyService.initialize: Loading {self._name}")
+                start_time = time.perf_counter()
+                try:
+                    instance = self._factory()
+                except Exception as e:
+                    object.__setattr__(self, "_error", str(e))
+                    logger.error(f"LazyService.initialize: Error loading {self._name}: {e}")
+                    raise
+                object.__setattr__(self, "_load_seconds", round(time.perf_counter() - start_time, 3))
+                object.__setattr__(self, "_error", None)
+                object.__setattr__(self, "_instance", instance)
+                logger.info(f"LazyService.initialize: Loaded {self._name} in {self._load_seconds}s")
+            return self._instance
+
+    def is_initialized(self):
+        return self._instance is not None
+
+    def get_status(self):
+        return {"loaded": self.is_initialized(), "load_seconds": self._load_seconds, "error": self._error}
+
+    def __getattr__(self, attribute):
+        # Only called for attributes not found on the proxy itself
+        return getattr(self.initialize(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self.initialize(), attribute, value)
+
+    def __call__(self, *args, **kwargs):
+        return self.initialize()(*args, **kwargs)
+
+    @staticmethod
+    def for_class(name, module_path, class_name, kwargs):
+        '''
+            LazyService for a service class, the module is only imported on first use
+        '''
+        def factory():
+            service_class = getattr(importlib.import_module(module_path), class_name)
+            return service_class(kwargs=kwargs)
+        return LazyService(name, factory)
+
+    @staticmethod
+    def get_readiness(services, required, warmup_complete):
+        '''
+            Readiness of the {name: LazyService} services: ready once the warm-up attempt finished
+            and every required service is loaded. Other services that failed to load are listed
+            in "failed" without blocking readiness, they are retried on first use.
+        '''
+        services_status = {name: service.get_status() for name, service in services.items()}
+        failed = [name for name, status in services_status.items() if status["error"] and not status["loaded"]]
+        is_ready = warmup_complete and all(services_status[name]["loaded"] for name in required if name in services_status)
+        return {"ready": is_ready, "failed": failed, "services": services_status}
+
+    @staticmethod
+    def warm_up(services, on_complete=None):
+        '''
+            Initialize the {name: LazyService} services in order in a daemon thread.
+            A service failing to load is logged and skipped, it is retried on first use.
+            on_complete is called when every service was tried. Returns the thread, or None in
+            worker processes (WorkerPool), which re-import the main module but don't serve requests.
+        '''
+        if multiprocessing.parent_process() is not None:
+            return None
+
+        def run():
+            logger = Logger.get_logger()
+            start_time = time.perf_counter()
+            for name, service in services.items():
+                try:
+                    service.initialize()
+                except Exception as e:
+                    logger.error(f"LazyService.warm_up: {name} failed to load: {e}")
+            logger.info(f"LazyService.warm_up: Warm-up finished in {time.perf_counter() - start_time:.2f}s")
+            if on_complete is not None:
+                on_complete()
+
+        thread = threading.Thread(target=run, name="service-warm-up", daemon=True)
+        thread.start()
+        return thread
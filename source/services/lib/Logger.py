@@ -1,13 +1,64 @@
+import atexit
 import logging
+import queue
 import sys
+import threading
 import time
 import os
-import logging
-import os
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
 import configparser
 
+class TruncatingFormatter(logging.Formatter):
+    """
+        Formatter that cuts messages longer than max_message_length characters,
+        so logging a whole transcript or tensor doesn't write megabytes per line.
+    """
+
+    def __init__(self, fmt=None, max_message_length=2000):
+        super().__init__(fmt)
+        self.max_message_length = max_message_length
+
+    def formatMessage(self, record):
+        message = record.message
+        if self.max_message_length and len(message) > self.max_message_length:
+            record.message = f"{message[:self.max_message_length]}... [truncated {len(message) - self.max_message_length} chars]"
+        try:
+            return super().formatMessage(record)
+        finally:
+            record.message = message
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+        QueueHandler that hands the record to the background writer unformatted.
+
+        The message is only built (record.msg % record.args) by the QueueListener thread, so
+        the calling thread pays for an enqueue and nothing else. When the queue is full the
+        record is dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.listener = None    # BackgroundLogWriter draining the queue, set by Logger.configure
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class BackgroundLogWriter(QueueListener):
+    """
+        QueueListener whose stop() waits for room in a full queue, so every queued record is written.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
 class Logger:
     # def __init__(self, log_level=None, log_dir=None, handlers=[], kwargs=None):
     #     if log_level:
@@ -75,38 +126,103 @@ class Logger:
     #     return logger
     
     _logger = None
+    _lock = threading.Lock()
+    _listeners = []
+    LOG_FORMAT = '%(asctime)s | %(levelname)s | %(message)s'
+
+    @staticmethod
+    def read_config():
+        '''
+            [folders] log_file_path and [logging] settings from global_properties.properties
+        '''
+        # property_reader = PropertiesReader.PropertiesReader()
+        # To break the circular dependency, the logger will read its config directly.
+        config = configparser.ConfigParser()
+        settings = {"log_file_path": './logs/', "level": "INFO", "non_blocking": True,
+                    "max_message_length": 2000, "queue_size": 10000}
+        try:
+            # Assuming the properties file is in a fixed location relative to the project
+            properties_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'global_properties.properties'))
+            if os.path.exists(properties_path):
+                config.read(properties_path)
+                settings["log_file_path"] = config.get('folders', 'log_file_path', fallback='./logs/')
+                settings["level"] = config.get('logging', 'level', fallback='INFO')
+                settings["non_blocking"] = config.getboolean('logging', 'non_blocking', fallback=True)
+                settings["max_message_length"] = config.getint('logging', 'max_message_length', fallback=2000)
+                settings["queue_size"] = config.getint('logging', 'queue_size', fallback=10000)
+        except Exception:
+            # If properties can't be read, proceed with the default.
+            # A basic logger will be created, which is better than crashing.
+            pass
+        # Environment overrides, e.g. FACT_CHECKER_LOG_LEVEL=DEBUG to debug a single run
+        settings["level"] = os.environ.get("FACT_CHECKER_LOG_LEVEL", settings["level"]).upper()
+        return settings
+
+    @staticmethod
+    def configure(logger, log_filename, level=logging.INFO, non_blocking=True, max_message_length=2000,
+                  queue_size=10000, stream=True):
+        '''
+            Attach the file (and stream) handlers to logger.
+            With non_blocking the handlers run on a BackgroundLogWriter thread behind a NonBlockingQueueHandler,
+            the listener is stopped (and the queue flushed) at exit or by Logger.shutdown().
+        '''
+        formatter = TruncatingFormatter(Logger.LOG_FORMAT, max_message_length)
+        handlers = [RotatingFileHandler(log_filename, maxBytes=10485760, backupCount=5)]
+        if stream:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        logger.setLevel(level)
+        if non_blocking:
+            queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+            listener = BackgroundLogWriter(queue_handler.queue, *handlers, respect_handler_level=True)
+            listener.start()
+            queue_handler.listener = listener
+            Logger._listeners.append(listener)
+            logger.addHandler(queue_handler)
+        else:
+            for handler in handlers:
+                logger.addHandler(handler)
+        return logger
+
+    @staticmethod
+    def shutdown(logger=None):
+        '''
+            Write the queued records and stop the background writers, only those of logger if given
+        '''
+        if logger is None:
+            listeners = list(Logger._listeners)
+        else:
+            listeners = [handler.listener for handler in logger.handlers if getattr(handler, "listener", None) is not None]
+        for listener in listeners:
+            if listener in Logger._listeners:
+                Logger._listeners.remove(listener)
+                listener.stop()
+                for handler in listener.handlers:
+                    handler.close()
 
     @staticmethod
     def get_logger():
         if Logger._logger is None:
-            # property_reader = PropertiesReader.PropertiesReader()
-            # To break the circular dependency, the logger will read its config directly.
-            config = configparser.ConfigParser()
-            log_file_path = './logs/' # Default value
-            try:
-                # Assuming the properties file is in a fixed location relative to the project
-                properties_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'global_properties.properties'))
-                if os.path.exists(properties_path):
-                    config.read(properties_path)
-                    log_file_path = config.get('folders', 'log_file_path', fallback='./logs/')
-            except Exception:
-                # If properties can't be read, proceed with the default.
-                # A basic logger will be created, which is better than crashing.
-                pass
-            # Ensure the log directory exists
-            os.makedirs(log_file_path, exist_ok=True)
-            
-            log_filename = os.path.join(log_file_path, f"app_{datetime.now().strftime('%Y%m%d')}.log")
-
-            # Configure the root logger
-            logging.basicConfig(
-                level=logging.INFO,
-                format='%(asctime)s | %(levelname)s | %(message)s',
-                handlers=[
-                    RotatingFileHandler(log_filename, maxBytes=10485760, backupCount=5),
-                    logging.StreamHandler()
-                ]
-            )
-            Logger._logger = logging.getLogger("OracleAnalyticsAgent")
-        
-        return Logger._logger
\ No newline at end of file
+            with Logger._lock:
+                if Logger._logger is None:
+                    settings = Logger.read_config()
+                    log_file_path = settings["log_file_path"]
+                    # Ensure the log directory exists
+                    os.makedirs(log_file_path, exist_ok=True)
+
+                    log_filename = os.path.join(log_file_path, f"app_{datetime.now().strftime('%Y%m%d')}.log")
+
+                    level = getattr(logging, settings["level"], logging.INFO)
+                    # Configure the root logger, unless the application already did (as logging.basicConfig)
+                    root_logger = logging.getLogger()
+                    if not root_logger.handlers:
+                        Logger.configure(root_logger, log_filename, level=level if isinstance(level, int) else logging.INFO,
+                                         non_blocking=settings["non_blocking"],
+                                         max_message_length=settings["max_message_length"],
+                                         queue_size=settings["queue_size"])
+                        atexit.register(Logger.shutdown)
+                    Logger._logger = logging.getLogger("OracleAnalyticsAgent")
+
+        return Logger._logger
@@ -0,0 +1,160 @@
+import threading
+from collections import OrderedDict
+from source.services.lib.Logger import Logger
+
+class ModelRegistry:
+    """
+        Process-wide registry of loaded models.
+
+        Every (model name, model class, tokenizer class, device) combination is loaded
+        once per process and kept warm for subsequent calls. When a memory budget is set
+        the least recently used entries are evicted until the loaded weights fit in it.
+    """
+    _entries = OrderedDict()   # key -> {"model", "tokenizer", "size"}
+    _key_locks = {}            # key -> lock, so two callers don't load the same model twice
+    _lock = threading.RLock()
+    _memory_budget = None      # bytes, None means unbounded
+
+    def __str__(self):
+        return f"{ModelRegistry.__name__}"
+
+    @staticmethod
+    def set_memory_budget(memory_budget_mb):
+        '''
+            Set the memory budget (in MB) for all loaded models. None or 0 disables eviction.
+        '''
+        with ModelRegistry._lock:
+            ModelRegistry._memory_budget = int(memory_budget_mb) * 1024 * 1024 if memory_budget_mb else None
+            ModelRegistry._evict()
+
+    @staticmethod
+    def get_model_size(model):
+        '''
+            Approximate in-memory size of a model in bytes (parameters + buffers).
+        '''
+        size = 0
+        try:
+            for tensor in list(model.parameters()) + list(model.buffers()):
+                size += tensor.numel() * tensor.element_size()
+        except Exception:
+            # Not a torch module (e.g. pipeline, dataset) - size is unknown
+            inner_model = getattr(model, "model", None)
+            if inner_model is not None and inner_model is not model:
+                return ModelRegistry.get_model_size(inner_model)
+        return size
+
+    @staticmethod
+    def get_or_load(key, loader):
+        '''
+            Return the cached (model, tokenizer) for key, calling loader() to build it on a miss.
+            loader must return a (model, tokenizer) tuple, tokenizer may be None.
+        '''
+        with ModelRegistry._lock:
+            if key in ModelRegistry._entries:
+                ModelRegistry._entries.move_to_end(key)
+                entry = ModelRegistry._entries[key]
+                return entry["model"], entry["tokenizer"]
+            key_lock = ModelRegistry._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                # Another thread may have finished loading while we were waiting
+                with ModelRegistry._lock:
+                    if key in ModelRegistry._entries:
+                        ModelRegistry._entries.move_to_end(key)
+                        entry = ModelRegistry._entries[key]
+                        return entry["model"], entry["tokenizer"]
+
+                logger = Logger.get_logger()
+                logger.info(f"ModelRegistry.get_or_load: Loading {key}")
+                model, tokenizer = loader()
+                size = ModelRegistry.get_model_size(model)
+                logger.info(f"ModelRegistry.get_or_load: Loaded {key} - {size / (1024 * 1024):.1f} MB")
+
+                with ModelRegistry._lock:
+                    ModelRegistry._entries[key] = {"model": model, "tokenizer": tokenizer, "size": size}
+                    ModelRegistry._evict(keep=key)
+                return model, tokenizer
+            finally:
+                # Also when loader() raises, a failed load must not leave its lock behind
+                with ModelRegistry._lock:
+                    if ModelRegistry._key_locks.get(key) is key_lock:
+                        del ModelRegistry._key_locks[key]
+
+    @staticmethod
+    def get_model(model_name, model_class, tokenizer_class=None, device="cpu", **model_kwargs):
+        '''
+            Load model_class (and optionally tokenizer_class) from model_name onto device once
+            per process and return (model, tokenizer).
+        '''
+        key = (model_name, model_class.__name__, tokenizer_class.__name__ if tokenizer_class else None, device,
+               tuple(sorted(model_kwargs.items())))
+
+        def loader():
+            tokenizer = tokenizer_class.from_pretrained(model_name) if tokenizer_class else None
+            model = model_class.from_pretrained(model_name, **model_kwargs)
+            if hasattr(model, "to"):
+                model = model.to(device)
+            if hasattr(model, "eval"):
+                model.eval()
+            return model, tokenizer
+
+        return ModelRegistry.get_or_load(key, loader)
+
+    @staticmethod
+    def get_pipeline(task, model_name, device=None):
+        '''
+            Build a transformers pipeline for task/model_name once per process.
+        '''
+        def loader():
+            from transformers import pipeline
+            if device is None:
+                return pipeline(task, model=model_name), None
+            return pipeline(task, model=model_name, device=device), None
+
+        nlp, _ = ModelRegistry.get_or_load(("pipeline", task, model_name, device), loader)
+        return nlp
+
+    @staticmethod
+    def is_loaded(key):
+        with ModelRegistry._lock:
+            return key in ModelRegistry._entries
+
+    @staticmethod
+    def loaded_models():
+        '''
+            List of (key, size in bytes) for all loaded models, least recently used first.
+        '''
+        with ModelRegistry._lock:
+            return [(key, entry["size"]) for key, entry in ModelRegistry._entries.items()]
+
+    @staticmethod
+    def memory_used():
+        with ModelRegistry._lock:
+            return sum(entry["size"] for entry in ModelRegistry._entries.values())
+
+    @staticmethod
+    def evict(key):
+        with ModelRegistry._lock:
+            return ModelRegistry._entries.pop(key, None) is not None
+
+    @staticmethod
+    def clear():
+        with ModelRegistry._lock:
+            ModelRegistry._entries.clear()
+
+    @staticmethod
+    def _evict(keep=None):
+        '''
+            Drop least recently used entries until the memory budget is met.
+            The entry just loaded (keep) is never evicted, even if it alone exceeds the budget.
+        '''
+        if ModelRegistry._memory_budget is None:
+            return
+        for key in list(ModelRegistry._entries.keys()):
+            if ModelRegistry.memory_used() <= ModelRegistry._memory_budget:
+                break
+            if key == keep:
+                continue
+            entry = ModelRegistry._entries.pop(key)
+            Logger.get_logger().info(f"ModelRegistry._evict: Evicted {key} - {entry['size'] / (1024 * 1024):.1f} MB")
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future
+from source.services.lib.Logger import Logger
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no advisory file locks, FileKeyLock is unavailable
+    fcntl = None
+
+class FileKeyLock:
+    """
+        Exclusive advisory lock on a key, shared by every process using the same lock directory.
+
+        One lock file per key (sharded by hash, <lock_directory>/ab/<hash>.lock), locked with
+        fcntl.flock. The file is removed on release. A process that locked a file that was
+        removed in the meantime retries on the new one, so two holders never coexist.
+    """
+    def __init__(self, lock_directory, key, timeout_seconds=600, poll_seconds=0.1):
+        key_hash = hashlib.sha256(str(key).encode("utf-8")).hexdigest()
+        self.path = os.path.join(lock_directory, key_hash[:2], f"{key_hash}.lock")
+        self.timeout_seconds = timeout_seconds
+        self.poll_seconds = poll_seconds
+        self._file = None
+
+    def __str__(self):
+        return f"{FileKeyLock.__name__}"
+
+    @staticmethod
+    def is_supported():
+        return fcntl is not None
+
+    def acquire(self):
+        '''
+            Wait for the lock, True once held, False after timeout_seconds
+        '''
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        deadline = time.monotonic() + self.timeout_seconds
+        while True:
+            lock_file = open(self.path, "a+")
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(self.poll_seconds)
+                continue
+            try:
+                # The previous holder may have removed the file between our open and flock
+                if os.fstat(lock_file.fileno()).st_ino == os.stat(self.path).st_ino:
+                    self._file = lock_file
+                    return True
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+class SingleFlight:
+    """
+        Per-key single-flight: concurrent calls for the same key run the function once.
+
+        The first caller of a key runs it, later callers wait on its Future and get the same
+        result (or exception). With a lock_directory the running caller also holds a FileKeyLock,
+        so only one process of a multi-worker deployment derives the key. The running caller
+        calls check() first, to pick up a result stored by a call that just finished.
+        Groups are shared per name by the process (get_group).
+    """
+    _groups = {}    # name -> SingleFlight, shared by the process
+    _groups_lock = threading.Lock()
+
+    def __init__(self, name, lock_directory=None, lock_timeout_seconds=600, logger=None):
+        self.logger = logger if logger is not None else Logger.get_logger()
+        self.name = name
+        self.lock_directory = lock_directory
+        if self.lock_directory and not FileKeyLock.is_supported():
+            self.logger.warning(f"SingleFlight: File locks are not supported here, {name} is deduplicated per process only")
+            self.lock_directory = None
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self._in_flight = {}    # key -> Future of the call being made for it
+        self._in_flight_lock = threading.Lock()    # also guards stats
+        self.stats = {"calls": 0, "coalesced": 0, "check_hits": 0, "file_lock_timeouts": 0}
+
+    def __str__(self):
+        return f"{SingleFlight.__name__}"
+
+    @staticmethod
+    def get_group(name, lock_directory=None, lock_timeout_seconds=600, logger=None):
+        with SingleFlight._groups_lock:
+            if name not in SingleFlight._groups:
+                SingleFlight._groups[name] = SingleFlight(name, lock_directory, lock_timeout_seconds, logger)
+            return SingleFlight._groups[name]
+
+    def count_event(self, counter, count=1):
+        with self._in_flight_lock:
+            self.stats[counter] += count
+
+    def do(self, key, function, check=None):
+        '''
+            Result of function() for key, shared by the concurrent calls for key.
+            check(), when given, returns the already available result or None.
+        '''
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                self.stats["calls"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            self.logger.info(f"do: Waiting for the {self.name} call in flight for {key}")
+            return future.result()
+
+        try:
+            result = self.run(key, function, check)
+        except BaseException as e:
+            with self._in_flight_lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._in_flight_lock:
+            self._in_flight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def run(self, key, function, check=None):
+        file_lock = None
+        if self.lock_directory:
+            file_lock = FileKeyLock(self.lock_directory, f"{self.name}:{key}", timeout_seconds=self.lock_timeout_seconds)
+            if not file_lock.acquire():
+                # Holder is stuck or very slow, derive anyway rather than fail the request
+                self.count_event("file_lock_timeouts")
+                self.logger.warning(f"run: Timed out waiting for the {self.name} file lock of {key}")
+                file_lock = None
+        try:
+            # The previous call for key (in this or another process) may have just stored its result
+            if check is not None:
+                result = check()
+                if result is not None:
+                    self.count_event("check_hits")
+                    return result
+            return function()
+        finally:
+            if file_lock is not None:
+                file_lock.release()
+
+    def get_stats(self):
+        with self._in_flight_lock:
+            return dict(self.stats, in_flight=len(self._in_flight), file_locks=bool(self.lock_directory))
@@ -0,0 +1,180 @@
+import array
+import bisect
+import re
+import struct
+import zlib
+
+class Transcript:
+    """
+        Timestamped transcript.
+
+        The segment texts are joined once into one text buffer (text), and three parallel
+        typed arrays describe the segments: offsets (index of the segment in text), starts and
+        durations (seconds). A transcript built from plain text has no segments.
+        Character spans of text (e.g. a factual statement) map back to a time range with
+        a binary search on offsets.
+    """
+    SEPARATOR = " "
+    TIMING_VERSION = 1
+    TIMING_HEADER = struct.Struct("<BI")    # version, number of segments
+
+    def __init__(self, text="", offsets=None, starts=None, durations=None):
+        self.text = text or ""
+        self.offsets = array.array("q", offsets if offsets is not None else [])
+        self.starts = array.array("d", starts if starts is not None else [])
+        self.durations = array.array("d", durations if durations is not None else [])
+
+    def __str__(self):
+        return self.text
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __bool__(self):
+        return bool(self.text)
+
+    @staticmethod
+    def from_segments(segments):
+        '''
+            Transcript of {'text', 'start', 'duration'} segments (dicts, or objects with those
+            attributes such as youtube_transcript_api snippets). Whitespace inside a segment
+            (caption line breaks) is collapsed, empty segments are dropped.
+        '''
+        texts = []
+        offsets = array.array("q")
+        starts = array.array("d")
+        durations = array.array("d")
+        offset = 0
+        for segment in segments or []:
+            if isinstance(segment, dict):
+                text, start, duration = segment.get("text", ""), segment.get("start", 0.0), segment.get("duration", 0.0)
+            else:
+                text, start, duration = getattr(segment, "text", ""), getattr(segment, "start", 0.0), getattr(segment, "duration", 0.0)
+            text = " ".join(str(text or "").split())
+            if not text:
+                continue
+            texts.append(text)
+            offsets.append(offset)
+            starts.append(float(start or 0.0))
+            durations.append(float(duration or 0.0))
+            offset += len(text) + len(Transcript.SEPARATOR)
+        return Transcript(Transcript.SEPARATOR.join(texts), offsets, starts, durations)
+
+    @staticmethod
+    def from_text(text):
+        return Transcript(text)
+
+    def has_timing(self):
+        return len(self.offsets) > 0
+
+    def get_segment_end(self, index):
+        # End (exclusive) of segment index in text
+        if index + 1 < len(self.offsets):
+            return self.offsets[index + 1] - len(Transcript.SEPARATOR)
+        return len(self.text)
+
+    def get_segment(self, index):
+        return {"text": self.text[self.offsets[index]:self.get_segment_end(index)],
+                "start": self.starts[index], "duration": self.durations[index]}
+
+    def segments(self):
+        for index in range(len(self.offsets)):
+            yield self.get_segment(index)
+
+    def get_segment_index(self, char_offset):
+        '''
+            Index of the segment containing char_offset of text, None without timing
+        '''
+        if not self.offsets:
+            return None
+        return max(0, bisect.bisect_right(self.offsets, char_offset) - 1)
+
+    def get_time_range(self, begin, end):
+        '''
+            (start, end) seconds of the segments covering text[begin:end], None without timing
+        '''
+        if not self.offsets:
+            return None
+        first = self.get_segment_index(begin)
+        last = self.get_segment_index(max(begin, end - 1))
+        return round(self.starts[first], 3), round(self.starts[last] + self.durations[last], 3)
+
+    def slice(self, start_seconds, end_seconds):
+        '''
+            Transcript of the segments overlapping [start_seconds, end_seconds), offsets rebased
+        '''
+        if not self.offsets:
+            return Transcript()
+        first = bisect.bisect_left(self.starts, start_seconds)
+        # Segments that started earlier may still be running at start_seconds
+        while first > 0 and self.starts[first - 1] + self.durations[first - 1] > start_seconds:
+            first -= 1
+        last = bisect.bisect_left(self.starts, end_seconds)
+        if first >= last:
+            return Transcript()
+        base = self.offsets[first]
+        return Transcript(self.text[base:self.get_segment_end(last - 1)],
+                          [offset - base for offset in self.offsets[first:last]],
+                          self.starts[first:last], self.durations[first:last])
+
+    def locate(self, statement, start_offset=0):
+        '''
+            (begin, end) span of statement in text, searched from start_offset first.
+            Falls back to a whitespace insensitive match, None if statement is not found.
+        '''
+        statement = statement.strip()
+        if not statement:
+            return None
+        for search_from in (start_offset, 0):
+            begin = self.text.find(statement, search_from)
+            if begin >= 0:
+                return begin, begin + len(statement)
+        # Statement derivation may have removed or collapsed whitespace
+        characters = [re.escape(character) for character in statement if not character.isspace()]
+        match = re.compile(r"\s*".join(characters)).search(self.text)
+        if match:
+            return match.span()
+        return None
+
+    def locate_statements(self, statements):
+        '''
+            [{"statement", "start", "end"}] for statements derived from text, start and end
+            (seconds) are None for a statement that can't be found or without timing.
+            Statements are searched in order, so repeated sentences map to successive occurrences.
+        '''
+        located = []
+        cursor = 0
+        for statement in statements or []:
+            span = self.locate(statement, cursor)
+            time_range = self.get_time_range(*span) if span else None
+            if span:
+                cursor = span[1]
+            located.append({"statement": statement,
+                            "start": time_range[0] if time_range else None,
+                            "end": time_range[1] if time_range else None})
+        return located
+
+    def to_timing_bytes(self):
+        '''
+            Offsets, starts and durations packed little endian and zlib compressed, None without timing
+        '''
+        if not self.offsets:
+            return None
+        count = len(self.offsets)
+        payload = Transcript.TIMING_HEADER.pack(Transcript.TIMING_VERSION, count)
+        payload += struct.pack(f"<{count}I{count}d{count}d", *self.offsets, *self.starts, *self.durations)
+        return zlib.compress(payload)
+
+    @staticmethod
+    def from_timing_bytes(text, timing):
+        '''
+            Transcript of text with the timing of to_timing_bytes (plain text if timing is empty)
+        '''
+        if not timing:
+            return Transcript(text)
+        payload = zlib.decompress(timing)
+        version, count = Transcript.TIMING_HEADER.unpack_from(payload)
+        if version != Transcript.TIMING_VERSION:
+            raise ValueError(f"Unsupported transcript timing version {version}")
+        values = struct.unpack_from(f"<{count}I{count}d{count}d", payload, Transcript.TIMING_HEADER.size)
+        return Transcript(text, values[:count], values[count:2 * count], values[2 * count:])
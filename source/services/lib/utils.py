@@ -1,14 +1,20 @@
 from source.services.lib.readProperties import PropertiesReader
 from source.services.lib.Logger import Logger
+from source.services.lib.LazyImport import lazy_import, is_imported, on_import
+import asyncio
+import atexit
+import bisect
 import multiprocessing
 import os
+import re
 import hashlib
+import sys
+import threading
+import unicodedata
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
 # from transformers import utils.ExplicitEnum
-import torch
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
-from nltk.tag import pos_tag
+torch = lazy_import("torch")
+nltk = lazy_import("nltk")
 
 class ReturnTensorTypes(): # ExplicitEnum
     """
@@ -71,6 +77,7 @@ class AvailableModels():
     PEGASUS_PARAPHRASE = "tuner007/pegasus_paraphrase"
     MICROSOFT_SPEECH = "microsoft/speecht5_tts"
     MICROSOFT_VOCODER = "microsoft/speecht5_hifigan"
+    MINILM_EMBEDDINGS = "sentence-transformers/all-MiniLM-L6-v2"
 
     # model.generate() method parameters - 
     # num_return_sequences  -> the possibility of generating multiple paraphrased sentences
@@ -140,6 +147,63 @@ class ParallelizationNumbers():
     HUNDRED_TWENTY_EIGHT = 128
     TWO_HUNDRED_SIXTY_FOUR = 264
 
+class WorkerPool():
+    """
+    Long-lived executors shared by the process, one per (parallelization type, size).
+
+    MULTI_PROCESSING gets a ProcessPoolExecutor whose workers are spawned, not forked, so
+    they don't inherit the server's threads and locks. MULTI_THREADING and ASYNC get a
+    ThreadPoolExecutor (asyncio callers use it with run_in_executor). SINGLE gets None,
+    callers then run the work in the calling thread.
+    """
+    _executors = {}    # (parallelization type, max workers) -> executor
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_executor(parallelization_type, max_workers=ParallelizationNumbers.CPU_COUNT):
+        if parallelization_type not in (ParallelizationTypes.MULTI_PROCESSING, ParallelizationTypes.MULTI_THREADING, ParallelizationTypes.ASYNC):
+            return None
+        max_workers = max(1, int(max_workers))
+        key = (parallelization_type, max_workers)
+        with WorkerPool._lock:
+            if key not in WorkerPool._executors:
+                if parallelization_type == ParallelizationTypes.MULTI_PROCESSING:
+                    executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"worker-pool-{parallelization_type}")
+                if not WorkerPool._executors:
+                    atexit.register(WorkerPool.shutdown)
+                WorkerPool._executors[key] = executor
+            return WorkerPool._executors[key]
+
+    @staticmethod
+    def discard(executor):
+        '''
+            Drop a broken executor, the next get_executor call creates a new one
+        '''
+        with WorkerPool._lock:
+            for key, shared_executor in list(WorkerPool._executors.items()):
+                if shared_executor is executor:
+                    del WorkerPool._executors[key]
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def shutdown():
+        with WorkerPool._lock:
+            executors = list(WorkerPool._executors.values())
+            WorkerPool._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+class FactCheckStages():
+    """
+    Stages of the fact-check cascade that can be negatively cached 
+    """
+    # fact check stages
+    DATABASE = "db"
+    SEMANTIC_INDEX = "semantic"
+    EXTERNAL_API = "external"
+
 class summarySelectedSize():
     SMALL = "small"
     MEDIUM = "medium"
@@ -155,6 +219,171 @@ class summarySelectedSize():
     }
     # Mapping of summary selected size to number of sentences    
 
+# NLTK resources used by the services, (resource path for nltk.data.find, packages to download)
+NLTK_RESOURCES = [
+    ("tokenizers/punkt", ["punkt"]),
+    ("tokenizers/punkt_tab", ["punkt_tab"]),
+    ("corpora/wordnet", ["wordnet"]),
+    ("corpora/stopwords", ["stopwords"]),
+    ("taggers/averaged_perceptron_tagger", ["averaged_perceptron_tagger"]),
+    ("taggers/averaged_perceptron_tagger_eng", ["averaged_perceptron_tagger_eng"]),
+]
+
+# NLTK resources are verified once per process, when nltk is first imported
+_nltk_resources_checked = False
+_nltk_resources_pending = False
+_nltk_resources_lock = threading.RLock()
+
+def add_nltk_data_dir(data_dir):
+    '''
+        Put data_dir first on the NLTK search path of this process and of the processes it
+        starts: NLTK_DATA is read by nltk when it is imported, nltk.data.path if it already is
+    '''
+    nltk_data = os.environ.get("NLTK_DATA", "")
+    if data_dir not in nltk_data.split(os.pathsep):
+        os.environ["NLTK_DATA"] = os.pathsep.join(filter(None, [data_dir, nltk_data]))
+    nltk_module = sys.modules.get("nltk")
+    if nltk_module is not None and hasattr(nltk_module, "data") and data_dir not in nltk_module.data.path:
+        nltk_module.data.path.insert(0, data_dir)
+
+def ensure_nltk_resources(logger, properties):
+    '''
+        Verify the NLTK resources once per process. [nltk] data_dir is added to the NLTK search
+        path right away, wherever nltk is imported from later (WorkerPool processes included).
+        Missing resources are only downloaded when [nltk] allow_download is true, otherwise
+        they are logged; bundle them with `python setup_models.py --nltk-data-dir <data_dir>`.
+        Returns the list of resources still missing.
+    '''
+    global _nltk_resources_checked, _nltk_resources_pending
+    if _nltk_resources_checked:
+        return []
+
+    with _nltk_resources_lock:
+        if _nltk_resources_checked:
+            return []
+        data_dir = properties.get_property("nltk", "data_dir")
+        if data_dir:
+            add_nltk_data_dir(data_dir)
+        if not is_imported(nltk):
+            # Don't import nltk just to check it, verify when it is first used
+            if not _nltk_resources_pending:
+                _nltk_resources_pending = True
+                on_import(nltk, lambda: ensure_nltk_resources(logger, properties))
+            return []
+
+        allow_download = str(properties.get_property("nltk", "allow_download", "false")).lower() == "true"
+
+        missing = []
+        for resource_path, packages in NLTK_RESOURCES:
+            try:
+                nltk.data.find(resource_path)
+            except LookupError:
+                if not allow_download:
+                    missing.append(resource_path)
+                    continue
+                try:
+                    for package in packages:
+                        nltk.download(package, download_dir=data_dir, quiet=True)
+                    logger.info(f"ensure_nltk_resources: NLTK '{resource_path}' downloaded.")
+                except Exception as e:
+                    missing.append(resource_path)
+                    logger.error(f"ensure_nltk_resources: Error downloading NLTK '{resource_path}': {e}")
+
+        if missing:
+            logger.error(f"ensure_nltk_resources: Missing NLTK resources {missing}, "
+                         f"run python setup_models.py --nltk-data-dir <data_dir> and set [nltk] data_dir")
+        _nltk_resources_checked = True
+        return missing
+
+def bundle_nltk_resources(download_dir):
+    '''
+        Download every NLTK resource used by the services into download_dir (offline bundle).
+        Returns the list of packages that failed to download.
+    '''
+    os.makedirs(download_dir, exist_ok=True)
+    failed = []
+    for _, packages in NLTK_RESOURCES:
+        for package in packages:
+            if not nltk.download(package, download_dir=download_dir, quiet=True, raise_on_error=False):
+                failed.append(package)
+    return failed
+
+# Candidate shard boundaries for parallel sentence tokenization: whitespace after a sentence terminator,
+# followed by an upper case letter or a quote, and not after a short abbreviation like "Mr." or "St."
+SHARD_BOUNDARY_PATTERN = re.compile(r"(?<![A-Z][a-z]\.)(?<![A-Z]\.)(?<=[.!?])\s+(?=[A-Z\"\u201c])")
+# Characters of text on each side of a candidate boundary given to sent_tokenize to confirm it
+SHARD_BOUNDARY_CONTEXT_CHARS = 400
+
+def is_sentence_boundary(text, start, end):
+    '''
+        True if sent_tokenize ends a sentence at start and begins the next one at end.
+        Punkt decides a boundary from the tokens around it, so the text around the
+        boundary gives the same decision as the whole text.
+    '''
+    window_start = max(0, start - SHARD_BOUNDARY_CONTEXT_CHARS)
+    window = text[window_start:end + SHARD_BOUNDARY_CONTEXT_CHARS]
+    position = 0
+    for sentence in sentence_tokenize(window):
+        sentence_start = window.find(sentence, position)
+        if sentence_start < 0:
+            return False
+        if window_start + sentence_start >= end:
+            return window_start + position == start and window_start + sentence_start == end
+        position = sentence_start + len(sentence)
+    return False
+
+def split_text_shards(text, shard_chars):
+    '''
+        Split text in shards of about shard_chars characters at sentence boundaries, so the shards
+        can be sentence tokenized separately and give the sentences of the whole text.
+        Candidates of SHARD_BOUNDARY_PATTERN are only used once sent_tokenize confirms them.
+        Returns [text] when no boundary is found.
+    '''
+    shards = []
+    shard_start = 0
+    search_start = shard_start + shard_chars
+    while len(text) - shard_start > shard_chars:
+        boundary = SHARD_BOUNDARY_PATTERN.search(text, search_start)
+        if boundary is None:
+            break
+        if not is_sentence_boundary(text, boundary.start(), boundary.end()):
+            search_start = boundary.end()
+            continue
+        shards.append(text[shard_start:boundary.start()])
+        shard_start = boundary.end()
+        search_start = shard_start + shard_chars
+    shards.append(text[shard_start:])
+    return shards
+
+def sentence_tokenize(text):
+    '''
+        nltk sent_tokenize, module level so it can run on a WorkerPool process
+    '''
+    return nltk.tokenize.sent_tokenize(text)
+
+def group_sentences(sentences, max_tokenizer_length=1024):
+    '''
+        Group consecutive sentences while their total length stays under max_tokenizer_length characters.
+        A sentence longer than that is a group of its own.
+    '''
+    nested = []
+    sent = []
+    length = 0
+    for sentence in sentences:
+        length += len(sentence)
+        if length < max_tokenizer_length:
+            sent.append(sentence)
+        else:
+            # The first sentence alone can be too long, don't emit an empty group for it
+            if sent:
+                nested.append(sent)
+            sent = [ sentence ]
+            length = len(sentence)
+
+    if sent:
+        nested.append(sent)
+    return nested
+
 class Utils:
     def __init__(self, kwargs):
         if 'logger' in kwargs:
@@ -168,44 +397,12 @@ class Utils:
         else:
             self.properties = PropertiesReader(kwargs={"logger":self.logger})
         
-        # Use code with caution, suggested code may be subject to licenses
-        # https://github.com/I4-Projektseminar-HHU-2017/i4-projekt-wissenstechnologien-got-mining
-        # License unknownPowered by Gemini
-        # Download necessary NLTK resources (only need to do this once)
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
-            nltk.download('punkt_tab')
-            self.logger.info("NLTK 'punkt' tokenizer downloaded.")
-        except Exception as e:
-            self.logger.error(f"Error downloading NLTK 'punkt': {e}")
-
-        try:
-            nltk.data.find('tokenizers/wordnet')
-        except LookupError:
-            nltk.download('wordnet')
-            self.logger.info("NLTK 'wordnet' tokenizer downloaded.")
-        except Exception as e:
-            self.logger.error(f"Error downloading NLTK 'wordnet': {e}")
-
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('stopwords')
-            self.logger.info("NLTK 'stopwords' corpus downloaded.")
-        except Exception as e:
-            self.logger.error(f"Error downloading NLTK 'stopwords': {e}")
-
-        try:
-            nltk.data.find('taggers/averaged_perceptron_tagger')
-        except LookupError:
-            nltk.download('averaged_perceptron_tagger')
-            nltk.download('averaged_perceptron_tagger_eng')
-            self.logger.info("NLTK 'averaged_perceptron_tagger' downloaded.")
-        except Exception as e:
-            self.logger.error(f"Error downloading NLTK 'averaged_perceptron_tagger': {e}")
+        ensure_nltk_resources(self.logger, self.properties)
 
+        # parallel_tokenization(parallelize="Y") runs on a long-lived WorkerPool of this type and size
+        self.tokenization_parallelization = self.properties.get_property("nlp", "tokenization_parallelization", ParallelizationTypes.MULTI_PROCESSING)
+        self.tokenization_workers = self.properties.get_property_int("nlp", "tokenization_workers", ParallelizationNumbers.CPU_COUNT)
+        self.tokenization_shard_chars = max(1, self.properties.get_property_int("nlp", "tokenization_shard_chars", 100000))
 
     def __str__(self):
         return f"{Utils.__name__}"
@@ -251,6 +448,14 @@ class Utils:
     # Hash the claim for caching
     def get_hash_value(self, value):
         return hashlib.sha256(value.encode()).hexdigest()
+
+    def normalize_claim(self, claim):
+        '''
+            Normalize a claim for exact lookups - unicode NFKC, casefolded,
+            punctuation and whitespace runs collapsed to a single space
+        '''
+        claim = unicodedata.normalize("NFKC", claim or "").casefold()
+        return re.sub(r"[\W_]+", " ", claim).strip()
     
     def get_current_date(self):
         import datetime
@@ -265,34 +470,119 @@ class Utils:
         return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     
+    def sentence_tokenization(self, text, executor=None):
+        '''
+            sentence tokenize text.
+            With an executor, texts longer than 2 x tokenization_shard_chars are split
+            at sentence boundaries and the shards are sentence tokenized on the executor.
+        '''
+        shards = [text]
+        if executor is not None and len(text) >= 2 * self.tokenization_shard_chars:
+            shards = split_text_shards(text, self.tokenization_shard_chars)
+
+        if len(shards) > 1:
+            self.logger.info("sentence_tokenization: Tokenizing %d shards of %d chars", len(shards), len(text))
+            return [sentence for shard_sentences in executor.map(sentence_tokenize, shards) for sentence in shard_sentences]
+        return sentence_tokenize(text)
+
     # generate chunks of text \ sentences <= 1024 tokens
-    def extractive_tokenization(self, text, max_tokenizer_length=1024):
+    def extractive_tokenization(self, text, max_tokenizer_length=1024, executor=None):
         '''
-            generate array of sentences upto model max length allowed
+            generate array of sentences upto model max length allowed.
+            With an executor, long texts are sentence tokenized in shards, see sentence_tokenization.
         '''
         # self.logger.info(f"extractive_tokenization: Text: {len(text)}-{text}")
-        nested = []
-        sent = []
-        length = 0
-        for sentence in sent_tokenize(text):
-            # TODO: Remove this logging
-            self.logger.info(f"extractive_tokenization: Sentence: {len(sentence)}-{sentence}")
-            length += len(sentence)
-            if length < max_tokenizer_length:
-                sent.append(sentence)
-            else:
-                nested.append(sent)
-                # sent = []
-                # length = 0
-                sent = [ sentence ]
-                length = len(sentence)
+        sentences = self.sentence_tokenization(text, executor=executor)
+        self.logger.debug("extractive_tokenization: Sentences: %d-%s", len(sentences), sentences)
 
-        if sent:
-            nested.append(sent)
+        nested = group_sentences(sentences, max_tokenizer_length)
         # self.logger.info(f"extractive_tokenization: Nested: {len(nested)}-{nested}")
 
         return nested
     
+    def get_sentence_token_spans(self, text, sentences, tokenizer):
+        '''
+            (start, end, token count) of every sentence of text, in characters of text, and the
+            offset mapping of text (None without a fast tokenizer).
+            With a fast tokenizer text is tokenized once and the tokens are assigned to
+            sentences through the offset mapping, a token belongs to the sentence its
+            first character is in (whitespace between sentences goes to the previous one).
+            Other tokenizers tokenize the sentences separately.
+        '''
+        starts = []
+        position = 0
+        for sentence in sentences:
+            start = text.find(sentence, position)
+            # sent_tokenize strips whitespace only, keep going if a sentence still isn't found as is
+            start = position if start < 0 else start
+            starts.append(start)
+            position = start + len(sentence)
+        # Leading whitespace belongs to the first sentence, so every token is counted once
+        starts[:1] = [0]
+        ends = starts[1:] + [len(text)]
+
+        if getattr(tokenizer, "is_fast", False):
+            offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+            token_starts = [token_start for token_start, _ in offsets]
+            token_counts = [bisect.bisect_left(token_starts, end) - bisect.bisect_left(token_starts, start)
+                            for start, end in zip(starts, ends)]
+        else:
+            offsets = None
+            token_counts = [len(input_ids) for input_ids in tokenizer(sentences, add_special_tokens=False)["input_ids"]]
+        return [(start, end, token_count) for start, end, token_count in zip(starts, ends, token_counts)], offsets
+
+    def token_aware_tokenization(self, text, tokenizer, max_tokenizer_length=1024, overlap_tokens=0):
+        '''
+            generate array of sentences that fill up max_tokenizer_length tokens of tokenizer,
+            like extractive_tokenization but measured in tokens, not characters.
+            Whole sentences are packed greedily, a sentence longer than the budget is split at token
+            boundaries (fast tokenizers) or left alone to be truncated. With overlap_tokens each chunk
+            starts with the last sentences of the previous chunk, up to overlap_tokens tokens.
+        '''
+        if not text or not text.strip():
+            return []
+        token_budget = max(1, max_tokenizer_length - tokenizer.num_special_tokens_to_add())
+        overlap_tokens = min(max(0, overlap_tokens), token_budget // 2)
+        sentences = sentence_tokenize(text)
+        spans, offsets = self.get_sentence_token_spans(text, sentences, tokenizer)
+
+        # (text, token count) pieces no longer than the budget
+        pieces = []
+        token_index = 0
+        for start, end, token_count in spans:
+            if token_count <= token_budget or offsets is None:
+                pieces.append((text[start:end].strip(), token_count))
+            else:
+                for piece_start in range(token_index, token_index + token_count, token_budget):
+                    piece_end = min(piece_start + token_budget, token_index + token_count)
+                    pieces.append((text[offsets[piece_start][0]:offsets[piece_end - 1][1]].strip(), piece_end - piece_start))
+            token_index += token_count
+
+        nested = []
+        chunk = []
+        chunk_tokens = 0
+        for piece, token_count in pieces:
+            if chunk and chunk_tokens + token_count > token_budget:
+                nested.append([sentence for sentence, _ in chunk])
+                # Carry the last sentences over, as long as the new piece still fits
+                overlap = []
+                overlap_length = 0
+                for sentence, sentence_tokens in reversed(chunk):
+                    if overlap_length + sentence_tokens > overlap_tokens or overlap_length + sentence_tokens + token_count > token_budget:
+                        break
+                    overlap.insert(0, (sentence, sentence_tokens))
+                    overlap_length += sentence_tokens
+                chunk = overlap
+                chunk_tokens = overlap_length
+            chunk.append((piece, token_count))
+            chunk_tokens += token_count
+
+        if chunk:
+            nested.append([sentence for sentence, _ in chunk])
+        self.logger.info("token_aware_tokenization: %d sentences, %d tokens in %d chunks of at most %d tokens",
+                         len(sentences), token_index, len(nested), token_budget)
+        return nested
+
     def abstractive_tokenization(self, tokenizer_input_text, max_tokenizer_length=1024):
         # get batches of tokens corresponding to the exact model_max_length
         # tokenizer_input_text will be an array
@@ -310,24 +600,80 @@ class Utils:
 
         # self.logger.debug(f"abstractive_tokenization: Nested: {len(inputs_batch_lst)}-{inputs_batch_lst}")
         return inputs_batch_lst
+
+    def batch_tokenization(self, inputs_batch_lst, pad_token_id, batch_size=4):
+        '''
+            stack chunks of tokens (output of abstractive_tokenization) into right padded
+            batches of at most batch_size rows, with the matching attention masks,
+            so model.generate can process several chunks in one call
+        '''
+        # abstractive_tokenization can return an empty trailing chunk when the text length
+        # is an exact multiple of max_tokenizer_length
+        chunks = [inputs_batch[0] for inputs_batch in inputs_batch_lst if inputs_batch.shape[-1] > 0]
+        batch_size = max(1, batch_size)
+        batches = []
+        for batch_start in range(0, len(chunks), batch_size):
+            batch_chunks = chunks[batch_start:batch_start + batch_size]
+            max_length = max(len(chunk) for chunk in batch_chunks)
+            device = batch_chunks[0].device
+            input_ids = torch.full((len(batch_chunks), max_length), pad_token_id, dtype=batch_chunks[0].dtype, device=device)
+            attention_mask = torch.zeros((len(batch_chunks), max_length), dtype=torch.long, device=device)
+            for row, chunk in enumerate(batch_chunks):
+                input_ids[row, :len(chunk)] = chunk
+                attention_mask[row, :len(chunk)] = 1
+            batches.append({"input_ids": input_ids, "attention_mask": attention_mask})
+
+        return batches
     
+    def get_tokenization_executor(self, parallelize):
+        '''
+            WorkerPool executor for parallelize: "N" (or SINGLE) runs in the calling thread,
+            "Y" uses [nlp] tokenization_parallelization, a ParallelizationTypes value uses that type
+        '''
+        if parallelize == "N":
+            return None
+        parallelization_type = self.tokenization_parallelization if parallelize == "Y" else parallelize
+        return WorkerPool.get_executor(parallelization_type, self.tokenization_workers)
+
     def parallel_tokenization(self, parallelize="N", tokenization_type = TokenizationType.ABSTRACTIVE_TOKENIZATION, tokenizer_input_text=None, max_tokenizer_length=1024):
+        '''
+            Chunk tokenizer_input_text for the model.
+            Extractive: a text (or a list of documents, chunked separately) is split in groups of sentences,
+            long texts and lists of documents are sentence tokenized on the long-lived WorkerPool.
+            Abstractive: token ids are sliced in max_tokenizer_length chunks, which is cheap and always
+            done in the calling thread.
+        '''
         inputs_batch_lst = []
-        if parallelize == "N":
-            if tokenization_type == TokenizationType.ABSTRACTIVE_TOKENIZATION:
-                inputs_batch_lst = self.abstractive_tokenization(tokenizer_input_text, max_tokenizer_length)
-            else:
-                inputs_batch_lst = self.extractive_tokenization(tokenizer_input_text, max_tokenizer_length)
+        if tokenization_type == TokenizationType.ABSTRACTIVE_TOKENIZATION:
+            return self.abstractive_tokenization(tokenizer_input_text, max_tokenizer_length)
 
-        else:
-            with multiprocessing.Pool(processes=ParallelizationNumbers.ONE) as pool:
-                if tokenization_type == TokenizationType.ABSTRACTIVE_TOKENIZATION:
-                    inputs_batch_lst = pool.map(self.abstractive_tokenization, tokenizer_input_text)
-                else:
-                    inputs_batch_lst = pool.map(self.extractive_tokenization, tokenizer_input_text)
+        executor = self.get_tokenization_executor(parallelize)
+        try:
+            if isinstance(tokenizer_input_text, str):
+                inputs_batch_lst = self.extractive_tokenization(tokenizer_input_text, max_tokenizer_length, executor=executor)
+            elif executor is None:
+                inputs_batch_lst = [self.extractive_tokenization(text, max_tokenizer_length) for text in tokenizer_input_text]
+            else:
+                # One document per task, the sentences are grouped in the calling process
+                inputs_batch_lst = [group_sentences(sentences, max_tokenizer_length)
+                                    for sentences in executor.map(sentence_tokenize, tokenizer_input_text)]
+        except BrokenExecutor as e:
+            self.logger.error(f"parallel_tokenization: Worker pool failed, tokenizing in process: {e}")
+            WorkerPool.discard(executor)
+            return self.parallel_tokenization("N", tokenization_type, tokenizer_input_text, max_tokenizer_length)
 
-        # self.logger.debug(f"parallel_tokenization: Nested: {len(inputs_batch_lst)}-{inputs_batch_lst}")
         return inputs_batch_lst
-        # self.logger.debug(f"parallel_tokenization: Nested: {len(inputs_batch_lst)}-{inputs_batch_lst}")
+
+    async def parallel_tokenization_async(self, parallelize="Y", tokenization_type = TokenizationType.EXTRACTIVE_TOKENIZATION, tokenizer_input_text=None, max_tokenizer_length=1024):
+        '''
+            parallel_tokenization for asyncio callers, doesn't block the event loop.
+            When parallelize resolves to the ASYNC pool the work runs on, it is done in that
+            worker thread: waiting on its own pool would deadlock once every worker does it.
+        '''
+        executor = WorkerPool.get_executor(ParallelizationTypes.ASYNC, self.tokenization_workers)
+        if self.get_tokenization_executor(parallelize) is executor:
+            parallelize = "N"
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, self.parallel_tokenization, parallelize, tokenization_type, tokenizer_input_text, max_tokenizer_length)
 
 
@@ -8,17 +8,12 @@ if PROJECT_ROOT not in sys.path:
 
 # Import necessary libraries
 from flask import Flask, redirect, request, jsonify, session, render_template, url_for, send_from_directory, send_file
-from transformers import pipeline
 from source.services.lib.DB import Database
+from source.services.lib.ModelRegistry import ModelRegistry
+from source.services.lib.LazyService import LazyService
 from source.services.lib.Logger import Logger
-from source.services.lib.Authorization import Authorization
 from source.services.lib.readProperties import PropertiesReader
 from source.services.lib.utils import Utils, SourceTypes, CaptionSources, SummarizationTypes, TextToAudioSources, AvailableLanguages, AvailableCountryCodes
-from source.services.CaptionDerivation import CaptionDerivation
-from source.services.StatementDerivation import StatementDerivation
-from source.services.SummarizedStatementDerivation import SummarizedStatementDerivation
-from source.services.TextToAudio import TextToAudio
-from source.services.FactDerivation import FactDerivation
 
 from flask_session import Session
 import os
@@ -54,8 +49,8 @@ if not os.path.exists(app.config['SESSION_FILE_DIR']):
 
 Session(app)
 
-# Load the NLP model
-nlp = pipeline("text-classification", model="bert-base-uncased")
+# Load the NLP model on first use
+nlp = LazyService("nlp", lambda: ModelRegistry.get_pipeline("text-classification", "bert-base-uncased"))
 
 # Get Properties
 properties = PropertiesReader(kwargs={"logger":logger})
@@ -66,23 +61,55 @@ utils = Utils(kwargs={"properties":properties, "logger":logger})
 # Create a database instance
 db = Database(kwargs={"properties":properties, "logger":logger, "utils": utils})
 
+# Services are built (and their models loaded) on first use, see warm-up below
+service_kwargs = {"properties":properties, "logger":logger, "utils": utils, "db": db}
+
 # Get the captions from the video
-captionDerivation = CaptionDerivation(kwargs={"properties":properties, "logger":logger, "utils": utils})
+captionDerivation = LazyService.for_class("captionDerivation", "source.services.CaptionDerivation", "CaptionDerivation", service_kwargs)
 
 # Get Statement Derivation
-statementDerivation = StatementDerivation(kwargs={"properties":properties, "logger":logger, "utils": utils})
+statementDerivation = LazyService.for_class("statementDerivation", "source.services.StatementDerivation", "StatementDerivation", service_kwargs)
 
 # Get Summarized Statement Derivation
-summarizedStatementDerivation = SummarizedStatementDerivation(kwargs={"properties":properties, "logger":logger, "utils": utils})
+summarizedStatementDerivation = LazyService.for_class("summarizedStatementDerivation", "source.services.SummarizedStatementDerivation", "SummarizedStatementDerivation", service_kwargs)
 
 # Get Fact Derivation
-factDerivation = FactDerivation(kwargs={"properties":properties, "logger":logger, "utils": utils})
+factDerivation = LazyService.for_class("factDerivation", "source.services.FactDerivation", "FactDerivation", service_kwargs)
+
+# Get Semantic Fact Index for paraphrased claims
+semanticFactIndex = LazyService.for_class("semanticFactIndex", "source.services.SemanticFactIndex", "SemanticFactIndex", service_kwargs)
 
 # Get text to audio
-textToAudio = TextToAudio(kwargs={"properties":properties, "logger":logger, "utils": utils})
+textToAudio = LazyService.for_class("textToAudio", "source.services.TextToAudio", "TextToAudio", service_kwargs)
 
 # Get Authorizations
-authorization = Authorization(kwargs={"properties":properties, "logger":logger, "utils": utils})
+authorization = LazyService.for_class("authorization", "source.services.lib.Authorization", "Authorization", service_kwargs)
+
+# Warm up the services in the background, fact checking first. /ready reports when it is done
+lazy_services = {
+    "factDerivation": factDerivation,
+    "semanticFactIndex": semanticFactIndex,
+    "nlp": nlp,
+    "statementDerivation": statementDerivation,
+    "summarizedStatementDerivation": summarizedStatementDerivation,
+    "captionDerivation": captionDerivation,
+    "textToAudio": textToAudio,
+    "authorization": authorization,
+}
+warmup_services = [name.strip() for name in properties.get_property("startup", "warmup_services", ",".join(lazy_services)).split(",")
+                   if name.strip() in lazy_services]
+# /ready waits for these (the fact checking services) when they are warmed up, the others are optional
+ready_services = [name.strip() for name in properties.get_property("startup", "ready_services", "factDerivation,semanticFactIndex,nlp").split(",")
+                  if name.strip() in lazy_services]
+warmup_state = {"complete": False, "required": []}
+# FACT_CHECKER_WARMUP overrides the property, profile_imports.py turns it off
+if os.environ.get("FACT_CHECKER_WARMUP", properties.get_property("startup", "warmup", "true")).lower() == "true":
+    warmup_state["required"] = [name for name in ready_services if name in warmup_services]
+    LazyService.warm_up({name: lazy_services[name] for name in warmup_services},
+                        on_complete=lambda: warmup_state.update(complete=True))
+else:
+    # Nothing is warmed up, the services load on first use
+    warmup_state["complete"] = True
 
 #  Use app.teardown_appcontext for request/app-context-specific resources
 @app.teardown_appcontext
@@ -99,9 +126,23 @@ def perform_cleanup():
     # logger.info("Application is shutting down. Performing cleanup...")
     print("Application is shutting down. Performing cleanup...")
     # Example: Close files, release resources, etc.
+    db.close()
 
 atexit.register(perform_cleanup)
 
+@app.route('/health')
+def health():
+    return jsonify({"status": "ok"})
+
+@app.route('/ready')
+def ready():
+    """
+    Readiness probe, 200 once the background warm-up finished and loaded the fact checking
+    services, 503 before. Optional services that failed to load are reported in "failed".
+    """
+    readiness = LazyService.get_readiness(lazy_services, warmup_state["required"], warmup_state["complete"])
+    return jsonify(readiness), 200 if readiness["ready"] else 503
+
 @app.route('/')
 def home():
     """
@@ -233,7 +274,8 @@ def get_summarization():
         captions = raw_text
         paraphrasing = True
 
-    logger.info(f"get_summarization: captions: {captions}")
+    logger.info("get_summarization: captions: %d chars", len(captions or ""))
+    logger.debug("get_summarization: captions: %s", captions)
     if not captions:
         logger.warning("Not able to get captions/ transcript for Summarization")
         return jsonify({"error": "Not able to get captions/ transcript for Summarization"}), 400
@@ -261,26 +303,33 @@ def get_statements():
         return jsonify({"error": "No text provided"}), 400
 
     captions = None
+    # Video and audio transcripts keep their segment timestamps, so statements can be traced back to them
+    transcript = None
     if youtube_video_url:
-        captions = captionDerivation.get_captions(source_path=youtube_video_url, source_type=SourceTypes.YOUTUBE, caption_source=CaptionSources.ALL)
+        transcript = captionDerivation.get_transcript(source_path=youtube_video_url, source_type=SourceTypes.YOUTUBE, caption_source=CaptionSources.ALL)
+        captions = transcript.text
     elif video_url:
-        captions = captionDerivation.get_captions(source_path=video_url, source_type=SourceTypes.VIDEO, caption_source=CaptionSources.ALL)
+        transcript = captionDerivation.get_transcript(source_path=video_url, source_type=SourceTypes.VIDEO, caption_source=CaptionSources.ALL)
+        captions = transcript.text
     elif audio_url:
-        captions = captionDerivation.get_captions(source_path=audio_url, source_type=SourceTypes.AUDIO, caption_source=CaptionSources.ALL)
+        transcript = captionDerivation.get_transcript(source_path=audio_url, source_type=SourceTypes.AUDIO, caption_source=CaptionSources.ALL)
+        captions = transcript.text
     elif podcast_url:
-        captions = captionDerivation.get_captions(source_path=podcast_url, source_type=SourceTypes.PODCAST, caption_source=CaptionSources.ALL)
+        transcript = captionDerivation.get_transcript(source_path=podcast_url, source_type=SourceTypes.PODCAST, caption_source=CaptionSources.ALL)
+        captions = transcript.text
     elif web_url:
         captions = captionDerivation.get_captions(source_path=web_url, source_type=SourceTypes.WIKI)
         # get_web_url_text(web_url)
     elif raw_text:
         captions = raw_text
 
-    logger.info(f"get_statements: captions: {captions}")
+    logger.info("get_statements: captions: %d chars", len(captions or ""))
+    logger.debug("get_statements: captions: %s", captions)
     if not captions:
         logger.warning("Not able to get captions/ transcript for Factual Statements")
         return jsonify({"error": "Not able to get captions/ transcript for Factual Statements"}), 400
 
-    factual_statements = statementDerivation.get_factual_statements(captions, "nltk")
+    factual_statements = statementDerivation.get_factual_statements(captions, "nltk", transcript=transcript)
     return jsonify({"factual_statements": factual_statements})
 
 @app.route('/check', methods=['POST'])
@@ -296,28 +345,38 @@ def fact_check():
         return jsonify({"error": "No claim provided"}), 400
 
     logger.info(f"fact_check: Checking claim: {claim}")
+    return jsonify(factDerivation.check_claim(claim, nlp, semantic_index=semanticFactIndex))
+
+@app.route('/check_batch', methods=['POST'])
+def fact_check_batch():
+    if 'user' not in session:
+        return jsonify({"error": "Unauthorized access"}), 401
+
+    data = request.json
+    claims = data.get("claims")
+
+    error = factDerivation.validate_claims_batch(claims)
+    if error:
+        logger.warning(f"fact_check_batch: {error}")
+        return jsonify({"error": error}), 400
+
+    logger.info(f"fact_check_batch: Checking {len(claims)} claims")
+    results = factDerivation.check_claims_batch(claims, nlp, semantic_index=semanticFactIndex)
+    return jsonify({"results": results})
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    if 'user' not in session:
+        return jsonify({"error": "Unauthorized access"}), 401
+
+    return jsonify(db.get_cache_stats())
+
+@app.route('/caption_stats', methods=['GET'])
+def caption_stats():
+    if 'user' not in session:
+        return jsonify({"error": "Unauthorized access"}), 401
 
-    cached_result = db.get_cached_result(claim)
-    if cached_result:
-        logger.info("fact_check: Cache hit")
-        return jsonify({"claim": claim, "result": cached_result})
-
-    result = db.check_fact_db(claim)
-    if result is not None:
-        logger.info("fact_check: Database hit")
-        db.cache_result(claim, str(bool(result)))
-        return jsonify({"claim": claim, "truth": bool(result)})
-
-    external_result = factDerivation.check_external_api(claim)
-    if external_result != "Unknown":
-        logger.info("fact_check: External API hit")
-        db.cache_result(claim, external_result)
-        return jsonify({"claim": claim, "external_result": external_result})
-
-    logger.info("fact_check: Performing NLP analysis")
-    analysis = nlp(claim)
-    db.cache_result(claim, str(analysis))
-    return jsonify({"claim": claim, "analysis": analysis})
+    return jsonify(captionDerivation.get_caption_stats())
 
 @app.route('/text_to_speech', methods=['POST'])
 def text_to_speech():
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Logging overhead benchmark
+
+Runs a tokenization-like hot loop that logs every sentence, once with the old logging
+(synchronous file handler, f-string INFO messages) and once with the non-blocking logging
+of Logger.configure (queue handler + background writer, lazy DEBUG messages), and prints
+the time spent by the calling thread and the time until every record is written.
+Usage: python testing/benchmark_logging.py [--sentences 20000] [--sentence-length 200]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from source.services.lib.Logger import Logger
+
+def make_sentences(count, sentence_length):
+    words = "the quick brown fox jumps over the lazy dog in 1969 and again in 2024".split()
+    sentence = " ".join(words[i % len(words)] for i in range(sentence_length // 5))[:sentence_length]
+    return [f"{sentence} {i}." for i in range(count)]
+
+def hot_loop_before(logger, sentences):
+    # Logging as extractive_tokenization / derive_nltk_statements did: every message built eagerly at INFO
+    logger.info(f"derive_nltk_statements: Number of sentences: {len(sentences)}\nSentences: {sentences}")
+    length = 0
+    for sentence in sentences:
+        logger.info(f"extractive_tokenization: Sentence: {len(sentence)}-{sentence}")
+        length += len(sentence)
+    return length
+
+def hot_loop_after(logger, sentences):
+    logger.info("derive_nltk_statements: Number of sentences: %d", len(sentences))
+    logger.debug("derive_nltk_statements: Sentences: %s", sentences)
+    length = 0
+    for sentence in sentences:
+        logger.debug("extractive_tokenization: Sentence: %d-%s", len(sentence), sentence)
+        length += len(sentence)
+    return length
+
+def run_case(name, hot_loop, sentences, log_dir, level, non_blocking):
+    logger = logging.getLogger(f"benchmark_logging.{name}")
+    logger.propagate = False
+    log_filename = os.path.join(log_dir, f"{name}.log")
+    Logger.configure(logger, log_filename, level=level, non_blocking=non_blocking, stream=False)
+    dropped = lambda: sum(getattr(handler, "dropped", 0) for handler in logger.handlers)
+
+    start_time = time.perf_counter()
+    hot_loop(logger, sentences)
+    caller_seconds = time.perf_counter() - start_time
+    # Wait for the background writer to drain the queue
+    Logger.shutdown(logger)
+    total_seconds = time.perf_counter() - start_time
+    dropped_records = dropped()
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
+
+    return {"case": name, "caller_seconds": caller_seconds, "total_seconds": total_seconds,
+            "log_bytes": os.path.getsize(log_filename), "dropped": dropped_records}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the overhead of per-sentence logging before and after the non-blocking logger.")
+    parser.add_argument("--sentences", type=int, default=20000)
+    parser.add_argument("--sentence-length", type=int, default=200)
+    args = parser.parse_args()
+
+    sentences = make_sentences(args.sentences, args.sentence_length)
+    with tempfile.TemporaryDirectory() as log_dir:
+        results = [
+            run_case("before_sync_info", hot_loop_before, sentences, log_dir, logging.INFO, non_blocking=False),
+            run_case("after_queue_info", hot_loop_after, sentences, log_dir, logging.INFO, non_blocking=True),
+            # Debugging a run: every sentence is logged, but formatted and written by the background writer
+            run_case("after_queue_debug", hot_loop_after, sentences, log_dir, logging.DEBUG, non_blocking=True),
+        ]
+
+    print(f"\n📊 {args.sentences} sentences of {args.sentence_length} chars")
+    print(f"  {'case':<20} {'caller':>10} {'total':>10} {'log size':>12} {'dropped':>8}")
+    for result in results:
+        print(f"  {result['case']:<20} {result['caller_seconds'] * 1000:8.1f}ms {result['total_seconds'] * 1000:8.1f}ms "
+              f"{result['log_bytes']:>11}B {result['dropped']:>8}")
+    baseline = results[0]["caller_seconds"]
+    for result in results[1:]:
+        print(f"  {result['case']}: {baseline / max(result['caller_seconds'], 1e-9):.1f}x less time in the calling thread")
+
+if __name__ == "__main__":
+    main()
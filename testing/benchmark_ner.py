@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+NLTK statement filter throughput benchmark
+
+Times the previous per-sentence filter of NERStatementDerivation.derive_nltk_statements
+(stop words rebuilt, two word_tokenize and one pos_tag call per sentence) against the
+batched filter_factual_sentences, serially and sharded on a process pool, on a long
+Wikipedia article, and checks that all of them return the same statements.
+Needs the NLTK punkt, averaged_perceptron_tagger and stopwords resources (setup_models.py).
+Usage: python testing/benchmark_ner.py [--title "History of the United States"] [--file article.txt]
+       [--repeat 1] [--workers 4]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import nltk
+from source.services.NERStatementDerivation import NERStatementDerivation, filter_factual_sentences
+from source.services.lib.Logger import Logger
+from source.services.lib.readProperties import PropertiesReader
+
+def legacy_filter(sentences):
+    # The filter as derive_nltk_statements ran it before filter_factual_sentences
+    factual_statements = []
+    for sentence in sentences:
+        if len(sentence.split()) < 3:
+            continue
+        if not any(char.isalpha() for char in sentence):
+            continue
+        sentence = re.sub(r"\[\d+\]", "", sentence).replace("\n", "")
+        tagged_words = nltk.tag.pos_tag(nltk.tokenize.word_tokenize(sentence))
+        is_factual = False
+        has_noun = has_verb = has_cardinal = has_symbol = False
+        for word, tag in tagged_words:
+            if tag.startswith('NN'):
+                has_noun = True
+            elif tag.startswith('VB'):
+                has_verb = True
+            elif tag in ['CD']:
+                is_factual = True
+                has_cardinal = True
+            elif tag in ['SYM']:
+                has_symbol = True
+            elif tag in ['JJ', 'JJR', 'JJS']:
+                is_factual = True
+        if has_noun and has_verb:
+            is_factual = True
+        if sentence.endswith('?') or sentence.endswith('!'):
+            is_factual = False
+        stop_words = set(nltk.corpus.stopwords.words('english'))
+        words = nltk.tokenize.word_tokenize(sentence)
+        filtered_words = [w for w in words if not w.lower() in stop_words]
+        if len(filtered_words) < 2:
+            is_factual = False
+        is_factual = has_cardinal or has_symbol
+        if is_factual:
+            factual_statements.append(sentence)
+    return factual_statements
+
+def load_article(title=None, file_path=None):
+    if file_path:
+        with open(file_path, encoding="utf-8") as article_file:
+            return article_file.read()
+    import wikipedia
+    return wikipedia.page(title, auto_suggest=False).content
+
+def time_call(function, *args, **kwargs):
+    start_time = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the NLTK statement filter before and after batching.")
+    parser.add_argument("--title", default="History of the United States", help="Wikipedia article to use")
+    parser.add_argument("--file", default=None, help="Read the article from a text file instead")
+    parser.add_argument("--repeat", type=int, default=1, help="Concatenate the article this many times")
+    parser.add_argument("--workers", type=int, default=4, help="Process pool size for the sharded run")
+    args = parser.parse_args()
+
+    text = "\n".join([load_article(args.title, args.file)] * args.repeat)
+    sentences = nltk.tokenize.sent_tokenize(text)
+
+    logger = Logger.get_logger()
+    properties = PropertiesReader(kwargs={"logger": logger})
+    ner = NERStatementDerivation(kwargs={"logger": logger, "properties": properties})
+    ner.parallel_min_sentences = 0
+
+    # Warm up: load the tagger and the tokenizer models once
+    filter_factual_sentences(sentences[:10])
+
+    legacy, legacy_seconds = time_call(legacy_filter, sentences)
+    batched, batched_seconds = time_call(filter_factual_sentences, sentences)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        # Start the workers before timing
+        list(executor.map(filter_factual_sentences, [sentences[:10]] * args.workers))
+        sharded, sharded_seconds = time_call(ner.derive_nltk_statements, text, executor=executor)
+
+    print(f"\n📊 {len(text)} chars, {len(sentences)} sentences, {len(batched)} statements")
+    for name, seconds in (("legacy per-sentence", legacy_seconds), ("batched", batched_seconds),
+                          (f"batched, {args.workers} processes", sharded_seconds)):
+        print(f"  {name:<26} {seconds:8.3f}s {len(sentences) / seconds:10.0f} sentences/s")
+    if legacy == batched == sharded:
+        print("✅ Identical statements")
+    else:
+        print("❌ The filters returned different statements")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
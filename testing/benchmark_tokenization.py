@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Extractive tokenization benchmark
+
+Times Utils.parallel_tokenization on a large transcript in every ParallelizationTypes mode
+(single, multithreading, multiprocessing and async) on the long-lived WorkerPool, and
+checks that every mode returns the same sentence groups as the single mode.
+Needs the NLTK punkt resource (setup_models.py).
+Usage: python testing/benchmark_tokenization.py [--file transcript.txt] [--chars 2000000]
+       [--shard-chars 100000] [--workers 4] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from source.services.lib.Logger import Logger
+from source.services.lib.readProperties import PropertiesReader
+from source.services.lib.utils import Utils, ParallelizationTypes, TokenizationType, WorkerPool
+
+def make_transcript(chars):
+    # Caption-like text: short sentences, numbers, a few abbreviations
+    random.seed(0)
+    subjects = ["The president", "Dr. Smith", "Our team", "The company", "Scientists", "The U.S. economy"]
+    verbs = ["said", "reported", "announced", "estimated", "confirmed", "denied"]
+    objects = ["that revenue grew by 12 percent", "a new study on climate", "the results of the 2020 census",
+               "that the bridge is 1,280 meters long", "nothing at all", "a plan worth $3 billion"]
+    sentences = []
+    length = 0
+    while length < chars:
+        sentence = f"{random.choice(subjects)} {random.choice(verbs)} {random.choice(objects)}{random.choice(['.', '.', '!', '?'])}"
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the parallel_tokenization modes on a large transcript.")
+    parser.add_argument("--file", default=None, help="Read the transcript from a text file")
+    parser.add_argument("--chars", type=int, default=2000000, help="Size of the generated transcript")
+    parser.add_argument("--shard-chars", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3, help="Best of n rounds per mode")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as transcript_file:
+            text = transcript_file.read()
+    else:
+        text = make_transcript(args.chars)
+
+    logger = Logger.get_logger()
+    utils = Utils(kwargs={"logger": logger, "properties": PropertiesReader(kwargs={"logger": logger})})
+    utils.tokenization_shard_chars = args.shard_chars
+    utils.tokenization_workers = args.workers
+
+    modes = [ParallelizationTypes.SINGLE, ParallelizationTypes.MULTI_THREADING,
+             ParallelizationTypes.MULTI_PROCESSING, ParallelizationTypes.ASYNC]
+    results = {}
+    timings = {}
+    for mode in modes:
+        # Start the pool (and load punkt in the workers) before timing
+        utils.parallel_tokenization(mode, TokenizationType.EXTRACTIVE_TOKENIZATION, text[:2 * args.shard_chars + 1000])
+        best = None
+        for _ in range(args.rounds):
+            start_time = time.perf_counter()
+            if mode == ParallelizationTypes.ASYNC:
+                results[mode] = asyncio.run(utils.parallel_tokenization_async(
+                    ParallelizationTypes.MULTI_PROCESSING, TokenizationType.EXTRACTIVE_TOKENIZATION, text))
+            else:
+                results[mode] = utils.parallel_tokenization(mode, TokenizationType.EXTRACTIVE_TOKENIZATION, text)
+            seconds = time.perf_counter() - start_time
+            best = seconds if best is None else min(best, seconds)
+        timings[mode] = best
+    WorkerPool.shutdown()
+
+    print(f"\n📊 {len(text)} chars, {sum(len(group) for group in results[ParallelizationTypes.SINGLE])} sentences, "
+          f"shards of {args.shard_chars} chars, {args.workers} workers")
+    for mode in modes:
+        speedup = timings[ParallelizationTypes.SINGLE] / timings[mode]
+        print(f"  {mode:<16} {timings[mode]:8.3f}s  {speedup:5.2f}x")
+
+    different = [mode for mode in modes if results[mode] != results[ParallelizationTypes.SINGLE]]
+    if different:
+        print(f"❌ Different sentence groups in: {', '.join(different)}")
+        sys.exit(1)
+    print("✅ Identical sentence groups in every mode")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Google Fact Check Tools claims:search API
+
+Used by the tests and for offline load tests of the external fact-check client. Point
+[api] fact_check_url at http://127.0.0.1:<port>/v1alpha1/claims:search.
+Usage: python testing/stub_fact_check_server.py [--port 8765] [--latency 0.05] [--failure-rate 0.1]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class StubFactCheckServer:
+    """
+        Threaded HTTP server answering claims:search requests.
+
+        ratings maps a query to the textual rating returned for it, other queries get no claims.
+        latency delays every response, failure_rate answers a random share of the requests
+        with fail_status (503) and fail_next answers the next n requests with it.
+    """
+
+    def __init__(self, port=0, ratings=None, latency=0.0, failure_rate=0.0):
+        self.ratings = ratings or {}
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.fail_next = 0
+        self.fail_status = 503
+        self.requests = []    # queries in the order they were received
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self.get_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    def __str__(self):
+        return f"{StubFactCheckServer.__name__}"
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1alpha1/claims:search"
+
+    def get_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"    # keep-alive
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query).get("query", [""])[0]
+                with stub._lock:
+                    stub.requests.append(query)
+                    fail = stub.fail_next > 0 or random.random() < stub.failure_rate
+                    if stub.fail_next > 0:
+                        stub.fail_next -= 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if not parsed.path.endswith("claims:search"):
+                    status, body = 404, {"error": "Not found"}
+                elif fail:
+                    status, body = stub.fail_status, {"error": "Failed request"}
+                elif query in stub.ratings:
+                    status, body = 200, {"claims": [{"text": query, "claimReview": [{"textualRating": stub.ratings[query]}]}]}
+                else:
+                    status, body = 200, {}
+
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def request_count(self, query=None):
+        with self._lock:
+            return len(self.requests) if query is None else self.requests.count(query)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Google Fact Check Tools API for offline load tests.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds to wait before every response")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    args = parser.parse_args()
+
+    stub = StubFactCheckServer(port=args.port, ratings={"The sky is green": "False"},
+                               latency=args.latency, failure_rate=args.failure_rate)
+    print(f"🚀 Stub fact-check API listening on {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.server.server_close()
+
+if __name__ == "__main__":
+    main()